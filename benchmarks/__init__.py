@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks in the airspeed velocity (asv) layout: bench_*.py modules with time_* functions or classes that have
+time_* methods, optional "params"/"param_names", and setup/teardown. Run them offline with run_benchmarks.
+"""
@@ -0,0 +1,64 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Times reading and writing CSV files with common. The row-by-row functions (lists of dicts) stop at 10^6 rows;
+at 10^7 rows they need several GB of memory, so only the columnar functions are timed there.
+"""
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import numpy as np
+from umich_che344.common import read_csv, iter_csv, write_csv, read_csv_columns, write_csv_columns
+
+__author__ = 'hbmayes'
+
+FIELDNAMES = ['time', 'conc_a', 'conc_b']
+
+
+def _columns(num_rows):
+    time = np.linspace(0.0, 100.0, num_rows)
+    return {'time': time, 'conc_a': np.exp(-time / 30.0), 'conc_b': 1.0 - np.exp(-time / 30.0)}
+
+
+class _CsvBench(object):
+    def setup(self, num_rows):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.in_fname = os.path.join(self.tmp_dir, 'data.csv')
+        self.out_fname = os.path.join(self.tmp_dir, 'out.csv')
+        self.columns = _columns(num_rows)
+        write_csv_columns(self.columns, self.in_fname, FIELDNAMES, print_message=False)
+
+    def teardown(self, num_rows):
+        shutil.rmtree(self.tmp_dir)
+
+
+class TimeCsvRows(_CsvBench):
+    params = [10 ** 4, 10 ** 5, 10 ** 6]
+    param_names = ['num_rows']
+
+    def setup(self, num_rows):
+        super(TimeCsvRows, self).setup(num_rows)
+        self.rows = [dict(zip(FIELDNAMES, row)) for row in zip(*[self.columns[name].tolist() for name in FIELDNAMES])]
+
+    def time_read_csv(self, num_rows):
+        read_csv(self.in_fname, all_conv=float)
+
+    def time_iter_csv(self, num_rows):
+        for _ in iter_csv(self.in_fname, all_conv=float):
+            pass
+
+    def time_write_csv(self, num_rows):
+        write_csv(self.rows, self.out_fname, FIELDNAMES, print_message=False)
+
+
+class TimeCsvColumns(_CsvBench):
+    timeout = 300  # seconds; asv's default of 60 is too short for writing 10^7 rows
+    params = [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+    param_names = ['num_rows']
+
+    def time_read_csv_columns(self, num_rows):
+        read_csv_columns(self.in_fname, all_conv=float)
+
+    def time_write_csv_columns(self, num_rows):
+        write_csv_columns(self.columns, self.out_fname, FIELDNAMES, print_message=False)
@@ -0,0 +1,48 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Times equilibrium conversions for 2A <--> B: one fsolve call per case, as lect4 and lect5 used to, against the
+vectorized closed form and bracketed Newton solver
+"""
+from __future__ import print_function
+import numpy as np
+from scipy.optimize import fsolve
+from umich_che344 import lect5_graphs
+from umich_che344.vec_solvers import x_eq_2a_to_b, equilibrium_conversion
+
+__author__ = 'hbmayes'
+
+
+def _cases(num_cases):
+    rng = np.random.RandomState(0)
+    return 10 ** rng.uniform(-1.0, 3.0, num_cases), 10 ** rng.uniform(-2.0, 0.0, num_cases)
+
+
+def _rate(x, k_c, cao):
+    return lect5_graphs.ode(x, 0.0, 1.0, k_c, cao, 1.0)
+
+
+class TimeFsolveEquilibrium(object):
+    params = [10, 1000]
+    param_names = ['num_cases']
+
+    def setup(self, num_cases):
+        self.k_c, self.cao = _cases(num_cases)
+
+    def time_fsolve_loop(self, num_cases):
+        for k_c, cao in zip(self.k_c, self.cao):
+            fsolve(lect5_graphs.ode, 0.5, args=(0.0, 1.0, k_c, cao, 1.0), fprime=lect5_graphs.ode_jac)
+
+
+class TimeVectorEquilibrium(object):
+    params = [1000, 1000000]
+    param_names = ['num_cases']
+
+    def setup(self, num_cases):
+        self.k_c, self.cao = _cases(num_cases)
+
+    def time_closed_form(self, num_cases):
+        x_eq_2a_to_b(self.k_c, self.cao)
+
+    def time_bracketed_newton(self, num_cases):
+        equilibrium_conversion(_rate, args=(self.k_c, self.cao))
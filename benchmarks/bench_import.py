@@ -0,0 +1,49 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Times importing each layer of common in a fresh interpreter, with matplotlib.pyplot for reference. Each
+benchmark includes interpreter startup; import_times gives the per-module breakdown from "python -X importtime".
+"""
+from __future__ import print_function
+import os
+import subprocess
+import sys
+
+__author__ = 'hbmayes'
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['umich_che344.constants', 'umich_che344.kinetics', 'umich_che344.csv_io', 'umich_che344.plotting',
+           'umich_che344.common', 'matplotlib.pyplot']
+
+
+def _run(statement, *options):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([REPO_DIR, os.environ.get('PYTHONPATH', '')]))
+    return subprocess.run([sys.executable] + list(options) + ['-c', statement], env=env, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+
+def import_times(statement):
+    """
+    Runs a statement in a fresh interpreter with "-X importtime"
+    :param statement: Python code, such as "import umich_che344.common"
+    :return: dict from each module imported to its cumulative import time in microseconds
+    """
+    times = {}
+    for line in _run(statement, '-X', 'importtime').stderr.splitlines():
+        # e.g. "import time:       331 |     143854 | umich_che344.common"
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            try:
+                times[name.strip()] = int(cumulative)
+            except ValueError:
+                # the header line
+                continue
+    return times
+
+
+class TimeImport(object):
+    params = MODULES
+    param_names = ['module']
+
+    def time_import(self, module):
+        _run('import ' + module)
@@ -0,0 +1,42 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Times common.make_fig per saved figure in each text rendering mode, using labels like those in the lecture scripts.
+Modes that need LaTeX are skipped when it is not installed.
+"""
+from __future__ import print_function
+import shutil
+import tempfile
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from umich_che344.common import make_fig, TEXT_MODES, TEXT_MATHTEXT, mathtext_can_render
+
+__author__ = 'hbmayes'
+
+X_LABEL = r'conversion (X, unitless)'
+Y_LABELS = [r'$\frac{F_{A0}}{-r_A}$ (L)', r'$\displaystyle\frac{F_{A0}}{-r_A} \left(L\right)$']
+
+
+class TimeMakeFig(object):
+    params = list(TEXT_MODES)
+    param_names = ['text_mode']
+
+    def setup(self, text_mode):
+        needs_latex = text_mode != TEXT_MATHTEXT and not all(mathtext_can_render(label) for label in Y_LABELS)
+        if needs_latex and shutil.which('latex') is None:
+            # asv's convention for skipping a benchmark
+            raise NotImplementedError("latex not found")
+        self.fig_dir = tempfile.mkdtemp() + '/'
+        self.x = np.linspace(0.0, 0.7, 1001)
+        self.fig_id = 0
+
+    def teardown(self, text_mode):
+        shutil.rmtree(self.fig_dir)
+
+    def time_make_fig(self, text_mode):
+        self.fig_id += 1
+        make_fig('bench_{}_{}'.format(text_mode, self.fig_id), self.x, 1.0 / (1.0 - self.x),
+                 y1_label="$X_B$ batch", y2_array=2.0 / (1.0 - self.x), y2_label=r'X$_{eq}$',
+                 x_label=X_LABEL, y_label=Y_LABELS[self.fig_id % len(Y_LABELS)],
+                 fig_dir=self.fig_dir, text_mode=text_mode)
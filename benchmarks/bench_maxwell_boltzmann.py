@@ -0,0 +1,34 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Times the Maxwell-Boltzmann functions from common on large (temperature x energy) grids
+"""
+from __future__ import print_function
+import numpy as np
+from umich_che344.common import eq_3_20, log_eq_3_20, eq_3_20integrated, mb_energy_fraction
+
+__author__ = 'hbmayes'
+
+NUM_TEMPS = 100
+
+
+class TimeMaxwellBoltzmann(object):
+    params = [10 ** 6, 10 ** 7]
+    param_names = ['grid_size']
+
+    def setup(self, grid_size):
+        self.temps = np.linspace(200.0, 2000.0, NUM_TEMPS)[:, None]
+        self.energy = np.linspace(0.0, 60.0, grid_size // NUM_TEMPS)
+        self.out = np.empty((NUM_TEMPS, len(self.energy)))
+
+    def time_eq_3_20(self, grid_size):
+        eq_3_20(self.energy, self.temps, out=self.out)
+
+    def time_log_eq_3_20(self, grid_size):
+        log_eq_3_20(self.energy, self.temps, out=self.out)
+
+    def time_eq_3_20integrated(self, grid_size):
+        eq_3_20integrated(self.temps, self.energy, out=self.out)
+
+    def time_mb_energy_fraction(self, grid_size):
+        mb_energy_fraction(self.energy, self.energy + 1.0, self.temps)
@@ -0,0 +1,73 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Times the ODE solves from the lecture scripts, without their figures or the on-disk solution cache
+"""
+from __future__ import print_function
+import numpy as np
+from scipy.integrate import odeint
+from umich_che344 import lect4_graphs, lect5_graphs, lect9, lect11_semibatch
+
+__author__ = 'hbmayes'
+
+LECT4_ARGS = (0.2, 20.0, 0.2)  # k, k_c, cao
+LECT5_ARGS = (0.2, 20.0, 0.2, 1.0)  # k, k_c, cao, nu_0
+LECT9_Y0 = [5.0, 0.0, 0.0, 1.0]
+LECT9_ARGS = (2.0, 0.004, 8.0, 0.015, 0.2, 5.0)  # ka, keq, kc, alpha, cto, fto
+LECT11_ARGS = (5.0, 0.05, 0.025)  # vol_0, nu_in, ca_in for part A
+LECT11_N0 = [0.0, 0.25, 0.0, 0.0]
+
+
+class TimeLectureOdes(object):
+    def setup(self):
+        self.grid = np.linspace(0.0, 60.0, 1001)
+        self.w_cat = np.linspace(0.0, 30.0, 1001)
+        self.t_semibatch = np.linspace(0.0, 400.0, 1001)
+
+    def time_lect4(self):
+        odeint(lect4_graphs.ode, 0.0, self.grid, args=LECT4_ARGS, Dfun=lect4_graphs.ode_jac)
+
+    def time_lect5_gas(self):
+        odeint(lect5_graphs.ode, 0.0, self.grid, args=LECT5_ARGS, Dfun=lect5_graphs.ode_jac)
+
+    def time_lect5_liquid(self):
+        odeint(lect5_graphs.ode, 0.0, self.grid, args=LECT5_ARGS + (False,), Dfun=lect5_graphs.ode_jac)
+
+    def time_lect9(self):
+        odeint(lect9.sys_odes, LECT9_Y0, self.w_cat, args=LECT9_ARGS, Dfun=lect9.sys_odes_jac)
+
+    def time_lect11(self):
+        odeint(lect11_semibatch.sys_odes_na, LECT11_N0, self.t_semibatch, args=LECT11_ARGS,
+               Dfun=lect11_semibatch.jac_na)
+
+
+class TimeLect9Sweep(object):
+    params = [10, 100, 1000]
+    param_names = ['num_cases']
+
+    def setup(self, num_cases):
+        rng = np.random.RandomState(0)
+        self.ka = rng.uniform(1.0, 3.0, num_cases)
+        self.y0 = np.tile(LECT9_Y0, (num_cases, 1))
+        self.w_cat = np.linspace(0.0, 30.0, 101)
+
+    def time_solve_ode_sweep(self, num_cases):
+        lect9.solve_ode_sweep(self.ka, *(LECT9_ARGS[1:] + (self.y0, self.w_cat)))
+
+
+class TimeLect11Sweep(object):
+    params = [10, 100, 1000]
+    param_names = ['num_cases']
+
+    def setup(self, num_cases):
+        rng = np.random.RandomState(0)
+        self.nu_in = rng.uniform(0.01, 0.1, num_cases)
+        self.time = np.linspace(0.0, 400.0, 101)
+
+    def time_solve_semibatch_sweep(self, num_cases):
+        lect11_semibatch.solve_semibatch_sweep(5.0, 0.0, 0.05, 0.025, self.nu_in, self.time)
+
+    def time_single_solves(self, num_cases):
+        for nu_in in self.nu_in:
+            odeint(lect11_semibatch.sys_odes_na, LECT11_N0, self.time, args=(5.0, nu_in, 0.025),
+                   Dfun=lect11_semibatch.jac_na)
@@ -0,0 +1,46 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Times the compiled right-hand side and Jacobians of random mass-action networks of increasing size
+"""
+from __future__ import print_function
+import numpy as np
+from umich_che344.reaction_network import ReactionNetwork, BATCH
+
+__author__ = 'hbmayes'
+
+
+def random_network(num_species, num_reactions, seed=0):
+    """
+    :return: ReactionNetwork of reactions like A + 2B <--> C + 2D among randomly picked species
+    """
+    rng = np.random.RandomState(seed)
+    species = ['S{}'.format(idx) for idx in range(num_species)]
+    reactions = []
+    for _ in range(num_reactions):
+        picked = rng.choice(species, 4, replace=False)
+        reactions.append({'stoich': {picked[0]: -1, picked[1]: -2, picked[2]: 1, picked[3]: 2},
+                          'k': rng.uniform(0.1, 2.0), 'k_rev': rng.uniform(0.01, 0.5)})
+    return ReactionNetwork(species, reactions)
+
+
+class TimeReactionNetwork(object):
+    params = [10, 100, 500]
+    param_names = ['num_species']
+
+    def setup(self, num_species):
+        self.reactor = random_network(num_species, 2 * num_species).compile(BATCH)
+        self.conc = np.random.RandomState(1).uniform(0.0, 1.0, num_species)
+        self.out = np.empty(num_species)
+
+    def time_compile(self, num_species):
+        random_network(num_species, 2 * num_species).compile(BATCH)
+
+    def time_rhs(self, num_species):
+        self.reactor.rhs(self.conc, 0.0, out=self.out)
+
+    def time_jac_sparse(self, num_species):
+        self.reactor.jac_sparse(self.conc, 0.0)
+
+    def time_jac(self, num_species):
+        self.reactor.jac(self.conc, 0.0)
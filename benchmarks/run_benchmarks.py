@@ -0,0 +1,261 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Runs the asv-style benchmarks in this folder without asv, saves the timings as JSON, and compares them with an
+earlier results file to flag regressions, e.g.
+    python -m benchmarks.run_benchmarks -b csv -o before.json
+    (change the code)
+    python -m benchmarks.run_benchmarks -b csv -o after.json -c before.json
+Each benchmark is timed "repeat" times after one warm-up call, running it enough times per sample to take at
+least min_time seconds; the minimum is used for comparisons.
+"""
+from __future__ import print_function
+import argparse
+import datetime
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import re
+import subprocess
+import sys
+import timeit
+import traceback
+from importlib import import_module
+
+__author__ = 'hbmayes'
+
+GOOD_RET = 0
+REGRESSION_RET = 2
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+PKG_DIR = os.path.join(REPO_DIR, 'umich_che344')
+BENCH_PREFIX = 'bench_'
+TIME_PREFIX = 'time_'
+DEF_RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEF_REPEAT = 3
+DEF_MIN_TIME = 0.1  # seconds per sample
+DEF_THRESHOLD = 0.2  # flag changes of more than 20%
+MAX_NUMBER = 100000
+
+SKIPPED = 'skipped'
+FAILED = 'failed'
+REGRESSED = 'REGRESSED'
+IMPROVED = 'improved'
+UNCHANGED = 'same'
+
+
+def _setup_paths():
+    """
+    Lecture scripts import "common" as a top-level module, as when run from their folder (as tox sets up)
+    """
+    for path in (REPO_DIR, PKG_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def find_benchmarks(pattern=None):
+    """
+    :param pattern: optional regular expression; only benchmarks whose full name matches are returned
+    :return: list of dicts with the benchmark name, the class (None for module-level functions), the function
+             or method name, and the parameter combinations
+    """
+    benchmarks = []
+    for _, module_name, _ in pkgutil.iter_modules([BENCH_DIR]):
+        if not module_name.startswith(BENCH_PREFIX):
+            continue
+        module = import_module('benchmarks.' + module_name)
+        for attr_name in sorted(vars(module)):
+            attr = getattr(module, attr_name)
+            if attr_name.startswith(TIME_PREFIX) and callable(attr):
+                benchmarks.append({'name': '{}.{}'.format(module_name, attr_name), 'cls': None, 'func': attr,
+                                   'param_names': [], 'params': [()]})
+            elif isinstance(attr, type) and attr.__module__ == module.__name__ and not attr_name.startswith('_'):
+                params = getattr(attr, 'params', [])
+                # asv allows a single list for one parameter, or a list of lists for several
+                if params and not isinstance(params[0], (list, tuple)):
+                    params = [params]
+                combos = list(itertools.product(*params)) if params else [()]
+                for method_name in sorted(name for name in dir(attr) if name.startswith(TIME_PREFIX)):
+                    benchmarks.append({'name': '{}.{}.{}'.format(module_name, attr_name, method_name), 'cls': attr,
+                                       'func': method_name, 'param_names': list(getattr(attr, 'param_names', [])),
+                                       'params': combos})
+    if pattern:
+        benchmarks = [bench for bench in benchmarks if re.search(pattern, bench['name'])]
+    return benchmarks
+
+
+def param_key(params):
+    return ', '.join(repr(param) for param in params)
+
+
+def _time_samples(func, args, repeat, min_time):
+    """
+    :return: list of seconds per call, one per sample
+    """
+    first = timeit.default_timer()
+    func(*args)
+    first = timeit.default_timer() - first
+    if repeat < 1:
+        # quick mode: the first call is the only sample
+        return [first]
+    number = int(min(MAX_NUMBER, max(1, min_time / max(first, 1e-9))))
+    samples = []
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        for _ in range(number):
+            func(*args)
+        samples.append((timeit.default_timer() - start) / number)
+    return samples
+
+
+def run_benchmark(bench, repeat=DEF_REPEAT, min_time=DEF_MIN_TIME):
+    """
+    Times one benchmark for each of its parameter combinations
+    :param bench: dict from find_benchmarks
+    :param repeat: number of samples; 0 to time a single call
+    :param min_time: minimum seconds per sample
+    :return: dict from the parameter key to a dict of timings (min, median, samples) or status ("skipped" when
+             setup raises NotImplementedError, as in asv, or "failed" with the traceback)
+    """
+    results = {}
+    for params in bench['params']:
+        key = param_key(params)
+        instance = None
+        try:
+            if bench['cls'] is None:
+                func = bench['func']
+            else:
+                instance = bench['cls']()
+                if hasattr(instance, 'setup'):
+                    instance.setup(*params)
+                func = getattr(instance, bench['func'])
+            samples = sorted(_time_samples(func, params, repeat, min_time))
+            results[key] = {'min': samples[0], 'median': samples[len(samples) // 2], 'samples': samples}
+        except NotImplementedError as e:
+            instance = None
+            results[key] = {'status': SKIPPED, 'reason': str(e)}
+        except Exception:
+            results[key] = {'status': FAILED, 'error': traceback.format_exc()}
+        finally:
+            if instance is not None and hasattr(instance, 'teardown'):
+                instance.teardown(*params)
+    return results
+
+
+def compare_results(old_results, new_results, threshold=DEF_THRESHOLD):
+    """
+    :param old_results: "results" dict from an earlier run
+    :param new_results: "results" dict from this run
+    :param threshold: fractional change in the minimum time that counts as a regression or an improvement
+    :return: list of (benchmark name, parameter key, old seconds, new seconds, ratio, status) for the
+             benchmarks timed in both runs
+    """
+    rows = []
+    for name in sorted(set(old_results) & set(new_results)):
+        for key in sorted(set(old_results[name]) & set(new_results[name])):
+            old, new = old_results[name][key], new_results[name][key]
+            if 'min' not in old or 'min' not in new:
+                continue
+            ratio = new['min'] / old['min'] if old['min'] > 0 else float('inf')
+            if ratio > 1.0 + threshold:
+                status = REGRESSED
+            elif ratio < 1.0 / (1.0 + threshold):
+                status = IMPROVED
+            else:
+                status = UNCHANGED
+            rows.append((name, key, old['min'], new['min'], ratio, status))
+    return rows
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                       stderr=subprocess.STDOUT).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _machine_info():
+    import numpy
+    import scipy
+    import matplotlib
+    return {'python': platform.python_version(), 'numpy': numpy.__version__, 'scipy': scipy.__version__,
+            'matplotlib': matplotlib.__version__, 'machine': platform.node(), 'platform': platform.platform()}
+
+
+def _format_time(seconds):
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return '{:.3g} {}'.format(seconds / scale, unit)
+    return '{:.3g} ns'.format(seconds * 1e9)
+
+
+def parse_cmdline(argv=None):
+    parser = argparse.ArgumentParser(description='Runs the asv-style benchmarks offline and flags regressions.')
+    parser.add_argument('-b', '--bench', default=None,
+                        help='Regular expression; only run benchmarks whose names match it.')
+    parser.add_argument('-o', '--out_file', default=None,
+                        help='JSON file for the results (default: {}/<commit>.json).'.format(DEF_RESULTS_DIR))
+    parser.add_argument('-c', '--compare', default=None,
+                        help='Earlier results file to compare against.')
+    parser.add_argument('-t', '--threshold', type=float, default=DEF_THRESHOLD,
+                        help='Fractional slowdown flagged as a regression (default: {}).'.format(DEF_THRESHOLD))
+    parser.add_argument('-r', '--repeat', type=int, default=DEF_REPEAT,
+                        help='Samples per benchmark (default: {}).'.format(DEF_REPEAT))
+    parser.add_argument('-q', '--quick', action='store_true',
+                        help='Time a single call of each benchmark, without warm-up.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """ Runs the main program.
+    """
+    args = parse_cmdline(argv)
+    _setup_paths()
+    commit = _git_commit()
+    results = {}
+    for bench in find_benchmarks(args.bench):
+        results[bench['name']] = run_benchmark(bench, repeat=0 if args.quick else args.repeat)
+        for key, result in sorted(results[bench['name']].items()):
+            label = '{}({})'.format(bench['name'], key) if key else bench['name']
+            if 'min' in result:
+                print('{:<70} {:>10}'.format(label, _format_time(result['min'])))
+            else:
+                print('{:<70} {:>10}'.format(label, result['status']))
+                if result['status'] == FAILED:
+                    print(result['error'], file=sys.stderr)
+
+    out_file = args.out_file
+    if out_file is None:
+        if not os.path.isdir(DEF_RESULTS_DIR):
+            os.makedirs(DEF_RESULTS_DIR)
+        out_file = os.path.join(DEF_RESULTS_DIR, '{}.json'.format(
+            commit or datetime.datetime.now().strftime('%Y%m%d_%H%M%S')))
+    meta = {'commit': commit, 'date': datetime.datetime.now().isoformat(), 'quick': args.quick}
+    meta.update(_machine_info())
+    with open(out_file, 'w') as json_file:
+        json.dump({'meta': meta, 'results': results}, json_file, indent=2, sort_keys=True)
+    print("Wrote {}".format(out_file))
+
+    if args.compare:
+        with open(args.compare) as json_file:
+            old = json.load(json_file)
+        rows = compare_results(old['results'], results, args.threshold)
+        print("\nCompared with {} (commit {}):".format(args.compare, old['meta'].get('commit')))
+        for name, key, old_min, new_min, ratio, status in rows:
+            label = '{}({})'.format(name, key) if key else name
+            print('{:<70} {:>10} -> {:>10} {:6.2f}x  {}'.format(label, _format_time(old_min), _format_time(new_min),
+                                                                 ratio, status))
+        if any(row[-1] == REGRESSED for row in rows):
+            return REGRESSION_RET
+    return GOOD_RET  # success
+
+
+if __name__ == '__main__':
+    status = main()
+    sys.exit(status)
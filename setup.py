@@ -32,6 +32,11 @@ setup(
                  'umich_che344'},
     include_package_data=True,
     install_requires=requirements,
+    entry_points={
+        'console_scripts': [
+            'che344_scenarios=umich_che344.scenario_worker:main',
+        ],
+    },
     license="BSD license",
     zip_safe=False,
     keywords='umich_che344',
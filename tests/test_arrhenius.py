@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.arrhenius`
+"""
+
+import unittest
+
+import numpy as np
+
+from umich_che344.arrhenius import ArrheniusTable
+from umich_che344.common import InvalidDataError, R_KCAL, R_KJ, k_at_new_temp, k_from_a_ea
+
+K_REF = np.array([0.07, 1.5, 30.0])
+E_A = np.array([20.0, 12.0, 35.0])  # kcal/mol
+T_REF = 573.15
+TEMPS = np.linspace(350.0, 800.0, 37)
+
+
+class TestArrheniusTable(unittest.TestCase):
+
+    def test_matches_common_functions(self):
+        rxns = ArrheniusTable.from_ref(K_REF, E_A, R_KCAL, T_REF)
+        k_vals = rxns.k(TEMPS)
+        self.assertEqual(k_vals.shape, (3, len(TEMPS)))
+        for i in range(3):
+            expected = k_at_new_temp(K_REF[i], E_A[i], R_KCAL, T_REF, TEMPS)
+            self.assertTrue(np.allclose(k_vals[i], expected, rtol=1e-13))
+        rxns = ArrheniusTable(7.27e-11, 29.25, R_KJ)
+        self.assertAlmostEqual(rxns.k(898.15)[0] / k_from_a_ea(7.27e-11, 29.25, 898.15, R_KJ), 1.0, places=13)
+
+    def test_modified_arrhenius_ref(self):
+        rxns = ArrheniusTable.from_ref(K_REF, E_A, R_KCAL, T_REF, temp_exp=[0.5, -1.0, 2.0])
+        self.assertTrue(np.allclose(rxns.k(T_REF), K_REF, rtol=1e-13))
+        out = np.empty((3, len(TEMPS)))
+        rxns.k(TEMPS, out=out)
+        expected = K_REF[:, None] * (TEMPS / T_REF) ** np.array([0.5, -1.0, 2.0])[:, None] * \
+            np.exp(-E_A[:, None] / R_KCAL * (1.0 / TEMPS - 1.0 / T_REF))
+        self.assertTrue(np.allclose(out, expected, rtol=1e-12))
+
+    def test_table_error_bound(self):
+        rxns = ArrheniusTable.from_ref(K_REF, E_A, R_KCAL, T_REF, temp_exp=[0.5, -1.0, 2.0])
+        rxns.build_table(300.0, 900.0, ln_tol=1e-8)
+        self.assertLessEqual(rxns.max_ln_error, 1e-8)
+        temps = np.random.RandomState(0).uniform(300.0, 900.0, 20000)
+        ln_err = np.abs(np.log(rxns.k_interp(temps) / rxns.k(temps)))
+        self.assertLessEqual(ln_err.max(), 1e-8 * (1 + 1e-6))
+        self.assertEqual((rxns.hits, rxns.misses), (20000, 0))
+
+    def test_table_exact_without_temp_exp(self):
+        rxns = ArrheniusTable.from_ref(K_REF, E_A, R_KCAL, T_REF)
+        self.assertEqual(rxns.build_table(300.0, 900.0), 2)
+        self.assertTrue(np.allclose(rxns.k_interp(TEMPS), rxns.k(TEMPS), rtol=1e-12))
+
+    def test_out_of_range_misses(self):
+        rxns = ArrheniusTable.from_ref(K_REF, E_A, R_KCAL, T_REF, temp_exp=1.0)
+        rxns.build_table(400.0, 600.0)
+        temps = np.array([300.0, 450.0, 500.0, 700.0])
+        self.assertTrue(np.allclose(rxns.k_interp(temps), rxns.k(temps), rtol=1e-9))
+        self.assertEqual((rxns.hits, rxns.misses), (2, 2))
+        self.assertEqual(rxns.k_interp(500.0).shape, (3,))
+        rxns.reset_counters()
+        self.assertEqual((rxns.hits, rxns.misses), (0, 0))
+
+    def test_errors(self):
+        rxns = ArrheniusTable(1.0, 10.0, R_KCAL)
+        with self.assertRaises(InvalidDataError):
+            rxns.k_interp(300.0)
+        with self.assertRaises(InvalidDataError):
+            rxns.build_table(500.0, 300.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `benchmarks.run_benchmarks`
+"""
+
+import unittest
+
+from benchmarks import run_benchmarks
+from benchmarks.run_benchmarks import REGRESSED, IMPROVED, UNCHANGED, SKIPPED
+
+
+class _ParamBench(object):
+    params = [[1, 2], ['a', 'b']]
+    param_names = ['num', 'letter']
+
+    def setup(self, num, letter):
+        if letter == 'b':
+            raise NotImplementedError("no b")
+        self.calls = []
+
+    def teardown(self, num, letter):
+        self.calls = None
+
+    def time_append(self, num, letter):
+        self.calls.append(num)
+
+
+class TestRunBenchmarks(unittest.TestCase):
+
+    def test_find_benchmarks(self):
+        benchmarks = run_benchmarks.find_benchmarks()
+        names = [bench['name'] for bench in benchmarks]
+        self.assertIn('bench_odes.TimeLectureOdes.time_lect9', names)
+        self.assertIn('bench_make_fig.TimeMakeFig.time_make_fig', names)
+        sweep = [bench for bench in benchmarks if bench['name'] == 'bench_odes.TimeLect9Sweep.time_solve_ode_sweep']
+        self.assertEqual(sweep[0]['params'], [(10,), (100,), (1000,)])
+        self.assertTrue(all('csv' in bench['name'] for bench in run_benchmarks.find_benchmarks('csv')))
+
+    def test_run_param_class(self):
+        bench = {'name': 'test', 'cls': _ParamBench, 'func': 'time_append', 'param_names': ['num', 'letter'],
+                 'params': [(1, 'a'), (2, 'b')]}
+        results = run_benchmarks.run_benchmark(bench, repeat=2, min_time=1e-4)
+        self.assertEqual(sorted(results), ["1, 'a'", "2, 'b'"])
+        self.assertEqual(len(results["1, 'a'"]['samples']), 2)
+        self.assertLessEqual(results["1, 'a'"]['min'], results["1, 'a'"]['median'])
+        self.assertEqual(results["2, 'b'"]['status'], SKIPPED)
+
+    def test_compare_results(self):
+        old = {'a': {'': {'min': 1.0}}, 'b': {'1': {'min': 1.0}, '2': {'min': 1.0}}, 'gone': {'': {'min': 1.0}}}
+        new = {'a': {'': {'min': 1.5}}, 'b': {'1': {'min': 0.5}, '2': {'min': 1.1}}, 'c': {'': {'min': 1.0}}}
+        rows = run_benchmarks.compare_results(old, new, threshold=0.2)
+        self.assertEqual([(row[0], row[1], row[-1]) for row in rows],
+                         [('a', '', REGRESSED), ('b', '1', IMPROVED), ('b', '2', UNCHANGED)])
+        self.assertAlmostEqual(rows[0][4], 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
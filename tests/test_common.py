@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.common`
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import unittest
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+from benchmarks.bench_import import import_times
+from umich_che344 import common, constants, csv_io, kinetics, plotting
+from umich_che344.common import (TEXT_AUTO, TEXT_MATHTEXT, TEXT_USETEX, InvalidDataError, FigureTemplate,
+                                 make_fig, text_for_mode, read_csv, iter_csv, read_csv_columns, write_csv,
+                                 write_csv_columns, CsvColumnWriter, R_KCAL, eq_3_20, eq_3_23, eq_3_20integrated,
+                                 log_eq_3_20, log_eq_3_23, log_eq_3_20integrated, mb_energy_cdf,
+                                 mb_energy_fraction)
+
+DISPLAY_LABEL = r'$\displaystyle\frac{F_{A0}}{-r_A} \left(L\right)$'
+CSV_TEXT = 'time,conc,label\n0.0,1.5,a\n1.0,oops,b\n2.0,0.5,c\n'
+NUM_MEMORY_FIGS = 1000
+RSS_BUDGET_MB = 50.0
+
+
+class TestImportLayers(unittest.TestCase):
+
+    def test_facade(self):
+        self.assertIs(common.InvalidDataError, constants.InvalidDataError)
+        self.assertIs(common.k_at_new_temp, kinetics.k_at_new_temp)
+        self.assertIs(common.read_csv_columns, csv_io.read_csv_columns)
+        self.assertIs(common.make_fig, plotting.make_fig)
+
+    def test_compute_only_imports(self):
+        # regression check: matplotlib and scipy load on first use, not with common
+        times = import_times('import umich_che344.common; umich_che344.common.k_at_new_temp(1.0, 10.0, 0.008, '
+                             '300.0, 310.0); umich_che344.common.eq_3_20(1.0, 300.0)')
+        self.assertIn('umich_che344.common', times)
+        self.assertEqual([name for name in times if name.split('.')[0] in ('matplotlib', 'scipy')], [])
+        times = import_times('import umich_che344.constants')
+        self.assertEqual([name for name in times if name.split('.')[0] == 'numpy'], [])
+        times = import_times('import umich_che344.common; umich_che344.common.mb_energy_cdf(1.0, 300.0)')
+        self.assertTrue(any(name.startswith('scipy.special') for name in times))
+
+
+class TestTextModes(unittest.TestCase):
+
+    def setUp(self):
+        self.fig_dir = tempfile.mkdtemp() + '/'
+
+    def tearDown(self):
+        shutil.rmtree(self.fig_dir)
+
+    def test_text_for_mode(self):
+        self.assertEqual(text_for_mode('$C_A$', TEXT_USETEX), ('$C_A$', True))
+        self.assertEqual(text_for_mode('$C_A$', TEXT_AUTO), ('$C_A$', False))
+        self.assertEqual(text_for_mode(DISPLAY_LABEL, TEXT_AUTO), (DISPLAY_LABEL, True))
+        self.assertEqual(text_for_mode(DISPLAY_LABEL, TEXT_MATHTEXT),
+                         (r'$\frac{F_{A0}}{-r_A} \left(L\right)$', False))
+
+    def test_make_fig_mathtext(self):
+        x = np.linspace(0.0, 0.7, 11)
+        make_fig('mathtext_fig', x, x, y1_label='$X_B$', x_label='conversion', y_label=DISPLAY_LABEL,
+                 fig_dir=self.fig_dir, text_mode=TEXT_MATHTEXT)
+        self.assertTrue(os.path.exists(os.path.join(self.fig_dir, 'mathtext_fig.png')))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(InvalidDataError):
+            make_fig('bad', [0, 1], [0, 1], fig_dir=self.fig_dir, text_mode='latex')
+        self.assertIn(TEXT_USETEX, common.TEXT_MODES)
+
+
+class TestFigureLifecycle(unittest.TestCase):
+
+    def setUp(self):
+        self.fig_dir = tempfile.mkdtemp() + '/'
+
+    def tearDown(self):
+        shutil.rmtree(self.fig_dir)
+        plt.close('all')
+
+    @unittest.skipIf(resource is None, "needs the resource module")
+    def test_make_fig_memory(self):
+        x = np.linspace(0.0, 1.0, 1001)
+        fig_dir = os.path.join(self.fig_dir, 'unsaved') + '/'
+        # warm up fonts and caches before taking the baseline
+        for _ in range(20):
+            make_fig('mem', x, x, y1_label='$X$', x_label='x', save_fig=False, text_mode=TEXT_MATHTEXT,
+                     fig_dir=fig_dir)
+        start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        for _ in range(NUM_MEMORY_FIGS):
+            make_fig('mem', x, x, y1_label='$X$', x_label='x', save_fig=False, text_mode=TEXT_MATHTEXT,
+                     fig_dir=fig_dir)
+        # ru_maxrss is in bytes on macOS and kB elsewhere
+        growth_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_rss) / 1024.0
+        if sys.platform == 'darwin':
+            growth_mb /= 1024.0
+        self.assertEqual(plt.get_fignums(), [])
+        self.assertLess(growth_mb, RSS_BUDGET_MB)
+        # nothing saved, so no folder made
+        self.assertFalse(os.path.exists(fig_dir))
+
+    def test_template_updates_in_place(self):
+        x = np.linspace(0.0, 1.0, 11)
+        with FigureTemplate(x, x, y2_array=x, x_label='x', fig_dir=self.fig_dir, text_mode=TEXT_MATHTEXT) as template:
+            for case in range(3):
+                template.plot('case_{}'.format(case), x, [x * case, x + case])
+                self.assertEqual(len(plt.get_fignums()), 1)
+            self.assertTrue(np.allclose(template.lines[1].get_ydata(), x + 2))
+            with self.assertRaises(InvalidDataError):
+                template.plot('bad', x, [x])
+        self.assertEqual(plt.get_fignums(), [])
+        for case in range(3):
+            self.assertTrue(os.path.exists(os.path.join(self.fig_dir, 'case_{}.png'.format(case))))
+
+
+class TestMaxwellBoltzmann(unittest.TestCase):
+
+    def test_broadcast_matches_loop(self):
+        energy = np.linspace(0.0, 10.0, 201)
+        temps = np.array([300.0, 600.0, 1000.0])
+        table = eq_3_20(energy, temps[:, None])
+        self.assertEqual(table.shape, (3, 201))
+        for row, temp in zip(table, temps):
+            expected = 2.0 * np.pi * np.power(1 / (np.pi * R_KCAL * temp), 1.5) * np.sqrt(energy) * np.exp(
+                -energy / (R_KCAL * temp))
+            self.assertTrue(np.allclose(row, expected, rtol=1e-12, atol=0))
+        self.assertIsInstance(eq_3_20(5.0, 300.0), np.floating)
+
+    def test_chunked_out(self):
+        energy = np.linspace(0.0, 20.0, 50)
+        temps = np.linspace(100.0, 2000.0, 400)[:, None]
+        out = np.empty((400, 50))
+        # a budget of a few rows forces many blocks
+        result = eq_3_20(energy, temps, out=out, max_bytes=4096)
+        self.assertIs(result, out)
+        self.assertTrue(np.array_equal(out, eq_3_20(energy, temps, max_bytes=None)))
+        tail = eq_3_20integrated(temps, 4.0, max_bytes=64)
+        self.assertTrue(np.allclose(tail, eq_3_20integrated(temps, 4.0), rtol=1e-14))
+        with self.assertRaises(InvalidDataError):
+            eq_3_20(energy, temps, out=np.empty(50))
+
+    def test_chunked_2d_memory(self):
+        # two long rows: each row is larger than the budget, so the rows must be split too
+        energy = np.linspace(0.0, 50.0, 500000)
+        temps = np.array([300.0, 600.0])[:, None]
+        out = np.empty((2, len(energy)))
+        max_bytes = 1 << 20
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            eq_3_20(energy, temps, out=out, max_bytes=max_bytes)
+            peak = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 2 * max_bytes)
+        self.assertTrue(np.array_equal(out, eq_3_20(energy, temps, max_bytes=None)))
+        self.assertTrue(np.array_equal(log_eq_3_20(energy, temps, max_bytes=4096),
+                                       log_eq_3_20(energy, temps, max_bytes=None)))
+
+    def test_log_space_tails(self):
+        # the fractions underflow to zero here, while their logs stay finite
+        self.assertEqual(eq_3_20(500.0, 10.0), 0.0)
+        self.assertAlmostEqual(log_eq_3_20(500.0, 10.0), np.log(2.0 * np.pi) - 1.5 * np.log(np.pi * R_KCAL * 10.0) +
+                               0.5 * np.log(500.0) - 500.0 / (R_KCAL * 10.0), places=8)
+        gamma = 500.0 / (R_KCAL * 10.0)
+        self.assertEqual(eq_3_20integrated(10.0, 500.0), 0.0)
+        # for large gamma, the tail is about sqrt(4 gamma / pi) exp(-gamma) (1 + 1/(2 gamma))
+        self.assertAlmostEqual(log_eq_3_20integrated(10.0, 500.0),
+                               log_eq_3_23(10.0, 500.0) + np.log1p(0.5 / gamma), places=6)
+        self.assertAlmostEqual(np.exp(log_eq_3_23(800.0, 4.0)), eq_3_23(800.0, 4.0), places=14)
+
+    def test_window_fraction_matches_quadrature(self):
+        from scipy.integrate import quad
+        for e_low, e_high, temp in [(0.0, 2.0, 300.0), (4.0, 60.0, 600.0), (1.0, 1.5, 1000.0)]:
+            expected = quad(eq_3_20, e_low, e_high, args=(temp,), epsabs=1e-14, epsrel=1e-12)[0]
+            self.assertAlmostEqual(mb_energy_fraction(e_low, e_high, temp), expected, places=11)
+        self.assertAlmostEqual(mb_energy_cdf(3.0, 500.0), quad(eq_3_20, 0.0, 3.0, args=(500.0,))[0], places=11)
+        self.assertEqual(mb_energy_cdf(np.inf, 500.0), 1.0)
+
+    def test_window_fraction_arrays_and_tails(self):
+        temps = np.linspace(200.0, 1200.0, 11)
+        windows = np.array([[0.0, 1.0], [1.0, 4.0], [4.0, np.inf]])
+        fracs = mb_energy_fraction(windows[:, :1], windows[:, 1:], temps)
+        self.assertEqual(fracs.shape, (3, 11))
+        self.assertTrue(np.allclose(fracs.sum(axis=0), 1.0, rtol=1e-14))
+        self.assertTrue(np.allclose(fracs[2], eq_3_20integrated(temps, 4.0), rtol=1e-12))
+        # deep in the tail, relative precision is kept
+        self.assertAlmostEqual(np.log(mb_energy_fraction(60.0, np.inf, 300.0)),
+                               log_eq_3_20integrated(300.0, 60.0), places=8)
+
+
+class TestReadCsv(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_fname = os.path.join(self.tmp_dir, 'data.csv')
+        with open(self.csv_fname, 'w') as csv_file:
+            csv_file.write(CSV_TEXT)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_iter_matches_read(self):
+        rows = read_csv(self.csv_fname, data_conv={'time': float, 'conc': float})
+        self.assertEqual(rows, list(iter_csv(self.csv_fname, data_conv={'time': float, 'conc': float})))
+        self.assertEqual(rows[1], {'time': 1.0, 'conc': 'oops', 'label': 'b'})
+
+    def test_columns(self):
+        # use small chunks so that the failed value is in a different chunk than most others
+        columns = read_csv_columns(self.csv_fname, data_conv={'time': float, 'conc': float}, chunk_rows=1)
+        self.assertEqual(list(columns), ['time', 'conc', 'label'])
+        self.assertEqual(columns['time'].dtype, np.float64)
+        self.assertTrue(np.array_equal(columns['time'], [0.0, 1.0, 2.0]))
+        self.assertEqual(columns['conc'].dtype, object)
+        self.assertEqual(list(columns['conc']), [1.5, 'oops', 0.5])
+        self.assertEqual(list(columns['label']), ['a', 'b', 'c'])
+
+    def test_numeric_columns(self):
+        with open(self.csv_fname, 'w') as csv_file:
+            csv_file.write('"time","count"\n0.0,1\n1.5,2\n\n3.0,3\n')
+        columns = read_csv_columns(self.csv_fname, data_conv={'count': int}, all_conv=float)
+        self.assertTrue(np.array_equal(columns['time'], [0.0, 1.5, 3.0]))
+        self.assertEqual(columns['count'].dtype.kind, 'i')
+        self.assertTrue(np.array_equal(columns['count'], [1, 2, 3]))
+
+    def test_structured(self):
+        result = read_csv_columns(self.csv_fname, data_conv={'time': int}, all_conv=float, structured=True)
+        self.assertEqual(result.dtype.names, ('time', 'conc', 'label'))
+        self.assertEqual(result['time'].dtype, object)
+        self.assertEqual(result['label'][2], 'c')
+
+    def test_short_row(self):
+        with open(self.csv_fname, 'w') as csv_file:
+            csv_file.write('a,b,c\n1,2,3\n4,5\n7,8,9\n')
+        for structured in [False, True]:
+            with self.assertRaises(InvalidDataError):
+                read_csv_columns(self.csv_fname, all_conv=float, structured=structured)
+
+    def test_hash_is_data(self):
+        with open(self.csv_fname, 'w') as csv_file:
+            csv_file.write('a,b\n1,2\n#3,4\n5,6\n')
+        columns = read_csv_columns(self.csv_fname, all_conv=float)
+        self.assertEqual(len(columns['b']), len(read_csv(self.csv_fname, all_conv=float)))
+        self.assertEqual(list(columns['a']), [1.0, '#3', 5.0])
+        self.assertTrue(np.array_equal(columns['b'], [2.0, 4.0, 6.0]))
+
+    def test_multiline_field_across_chunks(self):
+        with open(self.csv_fname, 'w') as csv_file:
+            csv_file.write('time,note\n0.0,"first\nsecond"\n1.0,plain\n2.0,"x\ny\nz"\n')
+        columns = read_csv_columns(self.csv_fname, data_conv={'time': float}, chunk_rows=1)
+        self.assertTrue(np.array_equal(columns['time'], [0.0, 1.0, 2.0]))
+        self.assertEqual(list(columns['note']), ['first\nsecond', 'plain', 'x\ny\nz'])
+        self.assertEqual(list(columns['note']), [row['note'] for row in read_csv(self.csv_fname)])
+
+
+class TestWriteCsv(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dict_fname = os.path.join(self.tmp_dir, 'dicts.csv')
+        self.col_fname = os.path.join(self.tmp_dir, 'columns.csv')
+        self.fieldnames = ['w', 'fa', 'label']
+        self.columns = {'w': np.linspace(0.0, 1.0, 7), 'fa': np.arange(7) / 3.0,
+                        'label': np.array(['a', 'b"c', 'd', 'e', 'f', 'g', 'h'])}
+        self.rows = [{'w': float(w), 'fa': float(fa), 'label': str(label)}
+                     for w, fa, label in zip(self.columns['w'], self.columns['fa'], self.columns['label'])]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assert_same_files(self):
+        with open(self.dict_fname, 'rb') as dict_file, open(self.col_fname, 'rb') as col_file:
+            self.assertEqual(dict_file.read(), col_file.read())
+
+    def test_columns_match_write_csv(self):
+        write_csv(self.rows, self.dict_fname, self.fieldnames, print_message=False, round_digits=3)
+        write_csv_columns(self.columns, self.col_fname, self.fieldnames, print_message=False, round_digits=3,
+                          chunk_rows=3)
+        self.assert_same_files()
+        # rounding works on copies
+        self.assertAlmostEqual(self.rows[1]['fa'], 1.0 / 3.0)
+        self.assertAlmostEqual(self.columns['fa'][1], 1.0 / 3.0)
+
+    def test_streamed_matrix(self):
+        sol = np.column_stack((self.columns['w'], self.columns['fa']))
+        write_csv(self.rows, self.dict_fname, self.fieldnames[:2], extrasaction='ignore', print_message=False)
+        with CsvColumnWriter(self.col_fname, self.fieldnames[:2], print_message=False) as writer:
+            writer.write(sol[:4])
+            writer.write(sol[4:])
+        self.assert_same_files()
+        with self.assertRaises(InvalidDataError):
+            write_csv_columns(sol, self.col_fname, self.fieldnames, print_message=False)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.cstr_cascade`
+"""
+
+import unittest
+
+import numpy as np
+
+from umich_che344.cstr_cascade import cascade_conversions, tanks_for_conversion
+from umich_che344.lect6_alt import r_dis_a
+
+
+def first_order(x, k, cao):
+    return k * cao * (1.0 - x)
+
+
+def first_order_deriv(x, k, cao):
+    return -k * cao + 0.0 * x
+
+
+class TestCstrCascade(unittest.TestCase):
+
+    def test_first_order_closed_form(self):
+        tau = np.linspace(0.5, 20.0, 40)
+        for drate_func in (None, first_order_deriv):
+            x_tanks, converged = cascade_conversions(first_order, 6, tau, 2.0, args=(0.0281, 2.0),
+                                                     drate_func=drate_func)
+            self.assertEqual(x_tanks.shape, (7, 40))
+            self.assertTrue(converged.all())
+            for num_tanks in range(7):
+                expected = 1.0 - 1.0 / (1.0 + tau * 0.0281) ** num_tanks
+                self.assertTrue(np.allclose(x_tanks[num_tanks], expected, atol=1e-11))
+
+    def test_many_tanks_approach_equilibrium_pfr(self):
+        # reversible 2A <--> B from lect6_alt: each tank satisfies its design equation
+        def rate(x, k, cao, k_equil):
+            return r_dis_a(k, cao, x, k_equil)
+        cao = np.array([0.1, 0.2, 0.5])
+        x_tanks, converged = cascade_conversions(rate, 200, 0.05, cao, args=(0.2, cao, 20.0))
+        self.assertTrue(converged.all())
+        residual = cao * np.diff(x_tanks, axis=0) - 0.05 * rate(x_tanks[1:], 0.2, cao, 20.0)
+        self.assertTrue(np.allclose(residual, 0.0, atol=1e-12))
+        self.assertTrue(np.all(np.diff(x_tanks, axis=0) > 0))
+
+    def test_tanks_for_conversion(self):
+        total_tau = np.array([1.0, 1.5, 2.0, 5.0])
+        num_tanks, found = tanks_for_conversion(first_order, 0.75, total_tau, 1.0, args=(1.0, 1.0),
+                                                max_tanks=2000)
+        # the PFR limit 1 - exp(-1) is below the target for the first case
+        self.assertEqual(found.tolist(), [False, True, True, True])
+        for n_tanks, tau in zip(num_tanks[found], total_tau[found]):
+            self.assertGreaterEqual(1.0 - (1.0 + tau / n_tanks) ** -n_tanks, 0.75)
+            if n_tanks > 1:
+                self.assertLess(1.0 - (1.0 + tau / (n_tanks - 1)) ** -(n_tanks - 1), 0.75)
+        self.assertEqual(num_tanks[1], 9)
+        # already at the target
+        self.assertEqual(tanks_for_conversion(first_order, 0.5, 1.0, 1.0, args=(1.0, 1.0), x_feed=0.6)[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
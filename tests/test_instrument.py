@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.instrument`
+"""
+
+import unittest
+
+import numpy as np
+from scipy.integrate import odeint as scipy_odeint
+
+from umich_che344 import instrument, lect9
+
+Y0 = [5.0, 0.0, 0.0, 1.0]
+W_CAT = np.linspace(0.0, 30.0, 101)
+ARGS = (2.0, 0.004, 8.0, 0.015, 0.2, 5.0)
+
+
+def stiff(y, t):
+    # Robertson's problem, for which LSODA switches to its stiff method
+    return [-0.04 * y[0] + 1e4 * y[1] * y[2], 0.04 * y[0] - 1e4 * y[1] * y[2] - 3e7 * y[1] ** 2, 3e7 * y[1] ** 2]
+
+
+class TestInstrument(unittest.TestCase):
+
+    def setUp(self):
+        instrument.enable()
+        instrument.reset()
+
+    def tearDown(self):
+        instrument.disable()
+        instrument.reset()
+
+    def test_odeint_records_counts(self):
+        sol = instrument.odeint(lect9.sys_odes, Y0, W_CAT, args=ARGS, Dfun=lect9.sys_odes_jac)
+        self.assertTrue(np.allclose(sol, scipy_odeint(lect9.sys_odes, Y0, W_CAT, args=ARGS, Dfun=lect9.sys_odes_jac)))
+        sol, info = instrument.odeint(stiff, [1.0, 0.0, 0.0], np.logspace(-5, 5, 50), label='robertson',
+                                      full_output=True)
+        self.assertEqual(sol.shape, (50, 3))
+        self.assertIn('mused', info)
+
+        report = instrument.report('test')
+        first, second = report['solves']
+        self.assertEqual((first['solver'], first['label'], second['label']), ('odeint', 'sys_odes', 'robertson'))
+        # the RHS calls we count are the evaluations LSODA reports
+        self.assertEqual(first['rhs_calls'], first['nfe'])
+        self.assertEqual(first['jac_calls'], first['nje'])
+        self.assertGreater(first['nst'], 0)
+        self.assertEqual(first['failures'], 0)
+        self.assertGreaterEqual(second['method_switches'], 1)
+        self.assertEqual(second['final_method'], 'bdf')
+        self.assertEqual(report['totals']['odeint']['solves'], 2)
+        self.assertEqual(report['totals']['odeint']['nfe'], first['nfe'] + second['nfe'])
+        self.assertEqual(report['phases']['odeint']['calls'], 2)
+
+    def test_fsolve(self):
+        root = instrument.fsolve(lambda x, a: x ** 2 - a, 1.0, args=(4.0,), label='sqrt')
+        self.assertAlmostEqual(root[0], 2.0)
+        record = instrument.report()['solves'][0]
+        self.assertEqual((record['solver'], record['label'], record['failures']), ('fsolve', 'sqrt', 0))
+        self.assertEqual(record['rhs_calls'], record['nfe'])
+
+    def test_nested_phases_and_aggregate(self):
+        @instrument.timed('outer')
+        def outer():
+            with instrument.phase('inner'):
+                instrument.odeint(lect9.sys_odes, Y0, W_CAT, args=ARGS)
+
+        reports = []
+        for _ in range(3):
+            instrument.reset()
+            outer()
+            reports.append(instrument.report())
+        phases = reports[0]['phases']
+        self.assertAlmostEqual(phases['outer']['self_seconds'], phases['outer']['seconds'] - phases['inner']['seconds'])
+        self.assertAlmostEqual(phases['inner']['self_seconds'],
+                               phases['inner']['seconds'] - phases['odeint']['seconds'])
+
+        total = instrument.aggregate(reports)
+        self.assertEqual(total['reports'], 3)
+        self.assertEqual(total['phases']['inner']['calls'], 3)
+        self.assertEqual(total['by_label']['sys_odes']['solves'], 3)
+        self.assertEqual(total['totals']['odeint']['nfe'], sum(report['solves'][0]['nfe'] for report in reports))
+        self.assertIn('sys_odes', instrument.format_report(total))
+
+    def test_disabled_records_nothing(self):
+        instrument.disable()
+        instrument.odeint(lect9.sys_odes, Y0, W_CAT, args=ARGS)
+        with instrument.phase('ignored'):
+            pass
+        report = instrument.report()
+        self.assertEqual((report['solves'], dict(report['phases'])), ([], {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
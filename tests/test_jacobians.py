@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Checks the analytical Jacobians of the lecture ODE systems against finite differences
+"""
+
+import unittest
+
+import numpy as np
+from scipy.integrate import odeint
+
+from umich_che344.common import numerical_jacobian
+from umich_che344 import lect4_graphs, lect5_graphs, lect9, lect11_semibatch
+
+LECT9_ARGS = (2.0, 0.004, 8.0, 0.015, 0.2, 5.0)
+SEMIBATCH_ARGS = (5.0, 0.05, 0.025)
+
+
+class TestJacobians(unittest.TestCase):
+
+    def assert_jac_close(self, func, jac, y, t, args):
+        y = np.array(y)
+        expected = numerical_jacobian(func, y, t, args)
+        self.assertTrue(np.allclose(jac(y, t, *args), expected, rtol=1e-5, atol=1e-7))
+
+    def test_lect4(self):
+        for y in [0.0, 0.3, 0.8]:
+            self.assert_jac_close(lect4_graphs.ode, lect4_graphs.ode_jac, [y], 0.0, (0.2, 20.0, 0.2))
+
+    def test_lect5(self):
+        for gas in [True, False]:
+            for y in [0.0, 0.3, 0.8]:
+                self.assert_jac_close(lect5_graphs.ode, lect5_graphs.ode_jac, [y], 0.0, (0.2, 20.0, 0.2, 1.0, gas))
+
+    def test_lect9(self):
+        for y in [[5.0, 0.1, 0.05, 1.0], [2.0, 1.5, 1.0, 0.6]]:
+            self.assert_jac_close(lect9.sys_odes, lect9.sys_odes_jac, y, 0.0, LECT9_ARGS)
+
+    def test_lect11(self):
+        y = [0.02, 0.03, 0.01, 0.01]
+        self.assert_jac_close(lect11_semibatch.sys_odes_ca, lect11_semibatch.jac_ca, y, 10.0, SEMIBATCH_ARGS)
+        self.assert_jac_close(lect11_semibatch.sys_odes_na, lect11_semibatch.jac_na, y, 10.0, SEMIBATCH_ARGS)
+
+    def test_lect9_fewer_rhs_calls(self):
+        # a large ka makes LSODA switch to its stiff method, which is when the Jacobian is used
+        stiff_args = (2000.0,) + LECT9_ARGS[1:]
+        w_cat = np.linspace(0.0, 30.0, 1001)
+        y0 = [5.0, 0.0, 0.0, 1.0]
+        sol_fd, info_fd = odeint(lect9.sys_odes, y0, w_cat, args=stiff_args, full_output=True)
+        sol_jac, info_jac = odeint(lect9.sys_odes, y0, w_cat, args=stiff_args, Dfun=lect9.sys_odes_jac,
+                                   full_output=True)
+        self.assertGreater(info_jac['nje'][-1], 0)
+        self.assertTrue(np.allclose(sol_fd, sol_jac, rtol=1e-4, atol=1e-5))
+        self.assertLess(info_jac['nfe'][-1], info_fd['nfe'][-1])
+
+    def test_lect9_sweep_banded_jac(self):
+        w_cat = np.linspace(0.0, 30.0, 201)
+        ka = np.array([2.0, 2000.0])
+        with_jac = lect9.solve_ode_sweep(ka, 0.004, 8.0, 0.015, 0.2, 5.0, [5.0, 0.0, 0.0, 1.0], w_cat)
+        without_jac = lect9.solve_ode_sweep(ka, 0.004, 8.0, 0.015, 0.2, 5.0, [5.0, 0.0, 0.0, 1.0], w_cat,
+                                            use_jac=False)
+        self.assertTrue(np.allclose(with_jac, without_jac, rtol=1e-4, atol=1e-5))
+
+    def test_lect11_sweep_banded_jac(self):
+        # unpack the band into a dense matrix and compare with finite differences of the stacked right-hand side
+        n_cases = 3
+        n_flat = np.array([0.02, 0.2, 0.01, 0.01, 0.1, 0.05, 0.0, 0.0, 0.0, 0.3, 0.0, 0.0])
+        args = (n_cases, np.array([5.0, 15.0, 10.0]), np.array([0.05, 0.0, 0.05]), np.array([0.025, 0.0, 0.05]),
+                2.2, np.empty((n_cases, lect11_semibatch.N_STATES)))
+        band = lect11_semibatch._jac_na_flat(n_flat, 10.0, *args)
+        mu = lect11_semibatch.MU
+        dense = np.zeros((len(n_flat), len(n_flat)))
+        for i in range(len(n_flat)):
+            for j in range(max(0, i - lect11_semibatch.ML), min(len(n_flat), i + mu + 1)):
+                dense[i, j] = band[i - j + mu, j]
+        expected = numerical_jacobian(lambda y, t, *f_args: lect11_semibatch._sys_odes_na_flat(y, t, *f_args).copy(),
+                                      n_flat, 10.0, args)
+        self.assertTrue(np.allclose(dense, expected, rtol=1e-5, atol=1e-7))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.lect11_semibatch`
+"""
+
+import unittest
+
+import numpy as np
+from scipy.integrate import odeint
+
+from umich_che344 import lect11_semibatch
+
+TIME = np.linspace(0.0, 400.0, 401)
+
+
+class TestSweep(unittest.TestCase):
+
+    def test_sweep_matches_single_solves(self):
+        vol_0 = np.array([5.0, 15.0, 10.0, 2.0])
+        ca_0 = np.array([0.0, 0.25 / 15.0, 0.0, 0.01])
+        cb_0 = np.array([0.05, 0.25 / 15.0, 0.025, 0.1])
+        ca_in = np.array([0.025, 0.0, 0.05, 0.2])
+        nu_in = np.array([0.05, 0.0, 0.05, 0.01])
+        sweep = lect11_semibatch.solve_semibatch_sweep(vol_0, ca_0, cb_0, ca_in, nu_in, TIME, chunk_size=3)
+        self.assertEqual(sweep.shape, (4, len(TIME), lect11_semibatch.N_STATES))
+        for case in range(4):
+            n_0 = [ca_0[case] * vol_0[case], cb_0[case] * vol_0[case], 0.0, 0.0]
+            single = odeint(lect11_semibatch.sys_odes_na, n_0, TIME,
+                            args=(vol_0[case], nu_in[case], ca_in[case]))
+            self.assertTrue(np.allclose(sweep[case], single, rtol=1e-5, atol=1e-7))
+
+    def test_sweep_broadcasts_and_matches_model(self):
+        nu_in = np.array([0.02, 0.05, 0.1])
+        sweep = lect11_semibatch.solve_semibatch_sweep(5.0, 0.0, 0.05, 0.025, nu_in, TIME, use_jac=False)
+        for case in range(3):
+            model = lect11_semibatch.semibatch_model(nu_in=nu_in[case], num_points=len(TIME))
+            self.assertTrue(np.allclose(sweep[case, :, 1], model['n_b'], rtol=1e-5, atol=1e-7))
+
+    def test_vec_rhs_matches_scalar(self):
+        n_matrix = np.array([[0.1, 0.02], [0.2, 0.05], [0.03, 0.0], [0.03, 0.0]])
+        dn_dt = lect11_semibatch.sys_odes_na_vec(n_matrix, 10.0, 5.0, np.array([0.05, 0.0]), 0.025)
+        for case in range(2):
+            expected = lect11_semibatch.sys_odes_na(n_matrix[:, case], 10.0, 5.0, [0.05, 0.0][case], 0.025)
+            self.assertTrue(np.allclose(dn_dt[:, case], expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the batched design-equation solvers in `umich_che344.lect6_alt`
+"""
+
+import unittest
+
+import numpy as np
+from scipy.optimize import fsolve
+
+from umich_che344 import lect6_alt
+
+
+class TestDesignEqSolver(unittest.TestCase):
+
+    def test_matches_fsolve(self):
+        for design_eq, solver in [(lect6_alt.pfr_design_eq, lect6_alt.pfr_outlet_conversion),
+                                  (lect6_alt.cstr_design_eq, lect6_alt.cstr_outlet_conversion)]:
+            vol = np.array([5.0, 20.0, 50.0])
+            x_out, converged = solver(0.1, vol, 10.0, 0.5)
+            self.assertTrue(converged.all())
+            for x_val, vol_val in zip(x_out, vol):
+                expected = fsolve(design_eq, x_val + 0.05, args=(0.1, vol_val, 10.0, 0.5), xtol=1e-12)[0]
+                self.assertAlmostEqual(x_val, expected, places=10)
+
+    def test_sweep_with_warm_start(self):
+        vol = np.linspace(1.0, 100.0, 2001)
+        k = np.linspace(0.1, 1.0, 2001)
+        for design_eq, solver in [(lect6_alt.pfr_design_eq, lect6_alt.pfr_outlet_conversion),
+                                  (lect6_alt.cstr_design_eq, lect6_alt.cstr_outlet_conversion)]:
+            x_out, converged = solver(0.2, vol, 10.0, k)
+            self.assertTrue(converged.all())
+            self.assertTrue(np.all((x_out > 0.2) & (x_out < 1.0)))
+            self.assertTrue(np.allclose(design_eq(x_out, 0.2, vol, 10.0, k), 0.0, atol=1e-6))
+            x_cold, _ = solver(0.2, vol, 10.0, k, warm_start_stride=0)
+            self.assertTrue(np.allclose(x_out, x_cold, atol=1e-10))
+
+    def test_broadcast_shape(self):
+        x_in = np.array([0.0, 0.3])[:, None]
+        vol = np.array([10.0, 100.0, 1000.0])[None, :]
+        x_out, converged = lect6_alt.cstr_outlet_conversion(x_in, vol, 10.0, 0.5)
+        self.assertEqual(x_out.shape, (2, 3))
+        self.assertTrue(converged.all())
+        # more volume, more conversion
+        self.assertTrue(np.all(np.diff(x_out, axis=1) > 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.lect9`
+"""
+
+import unittest
+
+import numpy as np
+from scipy.integrate import odeint
+
+from umich_che344 import lect9
+
+Y0 = [5.0, 0.0, 0.0, 1.0]
+W_CAT = np.linspace(0.0, 30.0, 201)
+
+
+class TestSweep(unittest.TestCase):
+
+    def test_sweep_matches_single_solves(self):
+        ka = np.array([1.0, 2.0, 3.0])
+        kc = np.array([8.0, 4.0, 6.0])
+        sweep = lect9.solve_ode_sweep(ka, 0.004, kc, 0.015, 0.2, 5.0, Y0, W_CAT, chunk_size=2)
+        self.assertEqual(sweep.shape, (3, len(W_CAT), lect9.N_STATES))
+        for case in range(3):
+            single = odeint(lect9.sys_odes, Y0, W_CAT, args=(ka[case], 0.004, kc[case], 0.015, 0.2, 5.0))
+            self.assertTrue(np.allclose(sweep[case], single, rtol=1e-5, atol=1e-6))
+
+    def test_vec_rhs_matches_scalar(self):
+        y_matrix = np.array([[4.0, 3.0], [0.5, 1.0], [0.2, 0.4], [0.9, 0.7]])
+        dy_dw = lect9.sys_odes_vec(y_matrix, 0.0, 2.0, 0.004, 8.0, 0.015, 0.2, 5.0)
+        for case in range(2):
+            expected = lect9.sys_odes(y_matrix[:, case], 0.0, 2.0, 0.004, 8.0, 0.015, 0.2, 5.0)
+            self.assertTrue(np.allclose(dy_dw[:, case], expected))
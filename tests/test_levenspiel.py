@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.levenspiel`
+"""
+
+import unittest
+
+import numpy as np
+from scipy.integrate import quad
+
+from umich_che344.common import InvalidDataError
+from umich_che344.lect6_alt import r_dis_a
+from umich_che344.levenspiel import LevenspielCurve
+from umich_che344.vec_solvers import x_eq_2a_to_b
+
+
+def first_order(x, k):
+    return k * (1.0 - x)
+
+
+def reversible(x, k, cao, k_equil):
+    return r_dis_a(k, cao, x, k_equil)
+
+
+class TestLevenspielCurve(unittest.TestCase):
+
+    def test_first_order_analytical(self):
+        curve = LevenspielCurve(first_order, 2.0, 0.999, args=(0.5,))
+        self.assertTrue(curve.converged)
+        x_vals = np.random.RandomState(0).uniform(0.0, 0.999, (20, 5))
+        volumes = curve.pfr_volume(x_vals)
+        self.assertEqual(volumes.shape, (20, 5))
+        # V = F_A0 / k ln(1 / (1 - X))
+        self.assertTrue(np.allclose(volumes, -4.0 * np.log(1.0 - x_vals), rtol=1e-9, atol=0))
+        self.assertAlmostEqual(curve.pfr_volume(0.9, x_in=0.5), 4.0 * np.log(5.0), places=9)
+        self.assertAlmostEqual(curve.cstr_volume(0.5), 4.0, places=12)
+
+    def test_refines_near_equilibrium(self):
+        args = (0.2, 0.2, 20.0)
+        x_eq = x_eq_2a_to_b(20.0, 0.2, gas=False)
+        far = LevenspielCurve(reversible, 2.0, 0.5, args=args)
+        near = LevenspielCurve(reversible, 2.0, x_eq - 1e-6, args=args)
+        self.assertGreater(near.num_panels, far.num_panels)
+        for x_out in [0.3, 0.65, x_eq - 1e-4, x_eq - 1e-6]:
+            expected = quad(near, 0.0, x_out, epsrel=1e-13, epsabs=0, limit=1000)[0]
+            self.assertAlmostEqual(near.pfr_volume(x_out) / expected, 1.0, places=9)
+
+    def test_errors(self):
+        with self.assertRaises(InvalidDataError):
+            # past the equilibrium conversion, the rate changes sign
+            LevenspielCurve(reversible, 2.0, 0.8, args=(0.2, 0.2, 20.0))
+        curve = LevenspielCurve(first_order, 1.0, 0.5, args=(1.0,))
+        with self.assertRaises(InvalidDataError):
+            curve.pfr_volume(0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.make_all_figs`
+"""
+
+import unittest
+
+from umich_che344 import make_all_figs
+
+
+class TestMakeAllFigs(unittest.TestCase):
+
+    def test_find_lecture_modules(self):
+        module_names = make_all_figs.find_lecture_modules()
+        self.assertIn('lect9', module_names)
+        self.assertIn('lect11_semibatch', module_names)
+        self.assertNotIn('common', module_names)
+
+    def test_find_jobs_uses_figure_jobs(self):
+        jobs = make_all_figs.find_jobs(['lect3_graphs', 'lect9', 'lect9_sys_ode'])
+        self.assertEqual(jobs, [('lect3_graphs', 'graph_alg_eq'), ('lect3_graphs', 'graph_int'), ('lect9', 'main')])
+
+    def test_failed_job_is_reported(self):
+        result = make_all_figs.run_job('lect9', 'no_such_function')
+        self.assertEqual(result['module'], 'lect9')
+        self.assertIn('AttributeError', result['error'])
+
+    def test_import_error_is_reported(self):
+        jobs = make_all_figs.find_jobs(['lect_no_such_module', 'lect9'])
+        self.assertEqual(jobs, [('lect_no_such_module', 'main'), ('lect9', 'main')])
+        result = make_all_figs.run_job(*jobs[0])
+        self.assertIn('ModuleNotFoundError', result['error'])
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.ode_cache`
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from umich_che344 import lect9
+from umich_che344.ode_cache import cached_odeint, cache_key, evict
+
+Y0 = [5.0, 0.0, 0.0, 1.0]
+W_CAT = np.linspace(0.0, 30.0, 101)
+ARGS = (2.0, 0.004, 8.0, 0.015, 0.2, 5.0)
+
+
+class TestOdeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def num_cached(self):
+        return len([fname for fname in os.listdir(self.cache_dir) if fname.endswith('.npz')])
+
+    def test_hit_returns_stored_solution(self):
+        first = cached_odeint(lect9.sys_odes, Y0, W_CAT, args=ARGS, cache_dir=self.cache_dir)
+        self.assertEqual(self.num_cached(), 1)
+        second = cached_odeint(lect9.sys_odes, Y0, W_CAT, args=ARGS, cache_dir=self.cache_dir)
+        self.assertEqual(self.num_cached(), 1)
+        self.assertTrue(np.array_equal(first, second))
+
+    def test_key_depends_on_inputs(self):
+        base = cache_key(lect9.sys_odes, Y0, W_CAT, ARGS)
+        self.assertEqual(base, cache_key(lect9.sys_odes, np.array(Y0), W_CAT, ARGS))
+        self.assertNotEqual(base, cache_key(lect9.sys_odes, Y0, W_CAT, (2.5,) + ARGS[1:]))
+        self.assertNotEqual(base, cache_key(lect9.sys_odes, Y0, W_CAT[:-1], ARGS))
+        self.assertNotEqual(base, cache_key(lect9.sys_odes, Y0, W_CAT, ARGS, rtol=1e-8))
+        self.assertNotEqual(base, cache_key(lect9.sys_odes_vec, Y0, W_CAT, ARGS))
+
+    def test_key_depends_on_defaults(self):
+        def decay(y, t, k=1.0):
+            return -k * y
+
+        base = cache_key(decay, [1.0], W_CAT)
+        decay.__defaults__ = (2.0,)
+        self.assertNotEqual(base, cache_key(decay, [1.0], W_CAT))
+
+    def test_lru_eviction(self):
+        for ka in [1.0, 2.0, 3.0]:
+            cached_odeint(lect9.sys_odes, Y0, W_CAT, args=(ka,) + ARGS[1:], cache_dir=self.cache_dir)
+        self.assertEqual(self.num_cached(), 3)
+        sizes = [os.path.getsize(os.path.join(self.cache_dir, fname)) for fname in os.listdir(self.cache_dir)]
+        self.assertEqual(evict(self.cache_dir, max_bytes=max(sizes)), 2)
+        self.assertEqual(self.num_cached(), 1)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.ode_events`
+"""
+
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from scipy.integrate import odeint
+
+from umich_che344 import lect9, lect11_semibatch, ode_events
+from umich_che344.constants import InvalidDataError
+from umich_che344.ode_events import integrate_to_event, conversion_event, state_event, independent_var_event
+
+Y0 = [5.0, 0.0, 0.0, 1.0]
+ARGS = (2.0, 0.004, 8.0, 0.015, 0.2, 5.0)
+
+
+class TestOdeEvents(unittest.TestCase):
+
+    def test_conversion_target(self):
+        result = integrate_to_event(lect9.sys_odes, Y0, (0.0, 100.0), conversion_event(0, Y0[0], 0.5), args=ARGS,
+                                    jac=lect9.sys_odes_jac)
+        self.assertTrue(result.found)
+        self.assertAlmostEqual((Y0[0] - result.y_event[0]) / Y0[0], 0.5, places=10)
+        self.assertEqual(result.t[-1], result.t_event)
+        # agrees with the solution from odeint at that weight
+        check = odeint(lect9.sys_odes, Y0, [0.0, result.t_event], args=ARGS, rtol=1e-10, atol=1e-10)
+        self.assertTrue(np.allclose(check[-1], result.y_event, rtol=1e-6))
+
+    def test_pressure_target_and_grid(self):
+        result = integrate_to_event(lect9.sys_odes, Y0, (0.0, 100.0), state_event(3, 0.8, direction=-1),
+                                    args=ARGS, num_points=11)
+        self.assertAlmostEqual(result.y_event[3], 0.8, places=10)
+        self.assertEqual(result.y.shape, (11, 4))
+        self.assertAlmostEqual(result.t[-1], result.t_event)
+
+    def test_semibatch_volume(self):
+        vol_0, nu_in, ca_in = 5.0, 0.05, 0.025
+        result = integrate_to_event(lect11_semibatch.sys_odes_na, [0.0, 0.25, 0.0, 0.0], (0.0, 400.0),
+                                    independent_var_event(lambda t: vol_0 + nu_in * t, 15.0),
+                                    args=(vol_0, nu_in, ca_in))
+        self.assertAlmostEqual(result.t_event, 200.0, places=8)
+
+    def test_not_reached(self):
+        result = integrate_to_event(lect9.sys_odes, Y0, (0.0, 1.0), conversion_event(0, Y0[0], 0.99), args=ARGS)
+        self.assertFalse(result.found)
+        self.assertIsNone(result.t_event)
+        self.assertAlmostEqual(result.t[-1], 1.0)
+
+    def test_failure_raises_invalid_data(self):
+        failed = SimpleNamespace(status=-1, message='Required step size is less than spacing between numbers.')
+        with mock.patch.object(ode_events, 'solve_ivp', return_value=failed):
+            with self.assertRaises(InvalidDataError):
+                integrate_to_event(lect9.sys_odes, Y0, (0.0, 1.0), state_event(3, 0.8), args=ARGS)
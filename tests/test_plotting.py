@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the figure modes of `umich_che344.plotting`
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from umich_che344 import plotting
+from umich_che344.common import InvalidDataError, FigureTemplate, make_fig, save_figure
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# runs every lecture figure job in record mode and reports the jobs and which matplotlib modules were imported
+RECORD_ALL_JOBS = """
+import json, sys
+from umich_che344 import make_all_figs, plotting
+make_all_figs._init_worker(plotting.FIG_RECORD)
+jobs = make_all_figs.find_jobs(make_all_figs.find_lecture_modules())
+results = [make_all_figs.run_job(*job) for job in jobs]
+print(json.dumps({'results': results, 'mpl': [name for name in sys.modules if name.startswith('matplotlib')]}))
+"""
+
+
+class TestFigModes(unittest.TestCase):
+
+    def setUp(self):
+        self.fig_dir = tempfile.mkdtemp() + '/'
+        plotting.clear_recorded_figures()
+        plotting.set_fig_mode(plotting.FIG_RECORD)
+
+    def tearDown(self):
+        plotting.set_fig_mode(plotting.DEF_FIG_MODE)
+        plotting.clear_recorded_figures()
+        shutil.rmtree(self.fig_dir)
+
+    def test_record_mode(self):
+        x_vals = np.linspace(0.0, 1.0, 11)
+        self.assertEqual(make_fig('conv', x_vals, x_vals ** 2, y1_label='a', y2_array=x_vals, y2_label='b',
+                                  x3_array=x_vals[:5], y3_array=x_vals[:5], x_label='X', fig_dir=self.fig_dir),
+                         (None, None))
+        save_figure('direct', save_fig=False, fig_dir=self.fig_dir)
+        with FigureTemplate(x_vals, x_vals, y1_label='first', y2_array=x_vals, fig_dir=self.fig_dir) as template:
+            template.plot('templ', x_vals, [x_vals, 2.0 * x_vals], x_arrays=[None, x_vals[::-1]])
+            with self.assertRaises(InvalidDataError):
+                template.plot('bad', x_vals, [x_vals])
+
+        first, second, third = plotting.recorded_figures()
+        self.assertEqual((first['name'], first['saved'], first['x_label']), ('conv', True, 'X'))
+        self.assertEqual([curve[0] for curve in first['curves']], ['a', 'b', ''])
+        self.assertEqual(len(first['curves'][2][1]), 5)
+        self.assertEqual((second['name'], second['saved']), ('direct', False))
+        self.assertEqual(third['name'], 'templ')
+        self.assertEqual([curve[0] for curve in third['curves']], ['first', ''])
+        self.assertTrue(np.array_equal(third['curves'][1][1], x_vals[::-1]))
+        # nothing written
+        self.assertEqual(os.listdir(self.fig_dir), [])
+
+    def test_bad_mode(self):
+        with self.assertRaises(InvalidDataError):
+            plotting.set_fig_mode('svg')
+
+    def test_agg_mode(self):
+        plotting.set_fig_mode(plotting.FIG_AGG)
+        make_fig('agg_fig', [0.0, 1.0], [1.0, 2.0], fig_dir=self.fig_dir, text_mode=plotting.TEXT_MATHTEXT)
+        self.assertTrue(os.path.isfile(os.path.join(self.fig_dir, 'agg_fig.png')))
+        import matplotlib
+        self.assertEqual(matplotlib.get_backend().lower(), 'agg')
+
+    def test_lecture_jobs_never_import_matplotlib(self):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([REPO_DIR, os.path.join(REPO_DIR, 'umich_che344')]),
+                   CHE344_ODE_CACHE_DIR=os.path.join(self.fig_dir, 'cache'))
+        out = subprocess.check_output([sys.executable, '-c', RECORD_ALL_JOBS], cwd=self.fig_dir, env=env,
+                                      universal_newlines=True)
+        summary = json.loads(out.splitlines()[-1])
+        self.assertEqual(summary['mpl'], [])
+        self.assertEqual([result['error'] for result in summary['results'] if result['error']], [])
+        figures = [name for result in summary['results'] for name in result['figures']]
+        self.assertIn('lecture_9flows', figures)
+        self.assertFalse(os.path.isdir(os.path.join(self.fig_dir, 'figs')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.rate_data`
+"""
+
+import unittest
+
+import numpy as np
+from scipy import interpolate
+from scipy.integrate import quad
+
+from umich_che344 import rate_data
+from umich_che344.common import InvalidDataError
+from umich_che344.rate_data import RateDataModel, SPLINE_CUBIC, SPLINE_QUADRATIC, SPLINE_PCHIP
+
+# lect2 isomerization example
+X_DATA = np.array([0.0, 0.2, 0.4, 0.6, 0.65])
+RATES = np.array([39.0, 53.0, 59.0, 38.0, 25.0])
+LEVEN = 50.0 / RATES
+
+
+class TestRateDataModel(unittest.TestCase):
+
+    def setUp(self):
+        rate_data.clear_fit_cache()
+
+    def test_matches_scipy_interpolants(self):
+        x_new = np.linspace(0.0, 0.7, 101)
+        cubic = RateDataModel(X_DATA, LEVEN, kind=SPLINE_CUBIC, extrapolate=True)
+        self.assertTrue(np.allclose(cubic(x_new), interpolate.splev(x_new, interpolate.splrep(X_DATA, LEVEN, s=0)),
+                                    atol=1e-13))
+        quadratic = RateDataModel.from_rates(X_DATA, RATES, 50.0, kind=SPLINE_QUADRATIC, extrapolate=True)
+        expected = interpolate.interp1d(X_DATA, LEVEN, kind='quadratic', fill_value='extrapolate')(x_new)
+        self.assertTrue(np.allclose(quadratic(x_new), expected, atol=1e-13))
+        self.assertTrue(np.isnan(RateDataModel(X_DATA, LEVEN)(0.7)))
+
+    def test_exact_volumes(self):
+        for kind in (SPLINE_CUBIC, SPLINE_QUADRATIC, SPLINE_PCHIP):
+            model = RateDataModel(X_DATA, LEVEN, kind=kind)
+            x_out = np.array([[0.1, 0.3], [0.5, 0.65]])
+            volumes = model.pfr_volume(x_out)
+            self.assertEqual(volumes.shape, (2, 2))
+            for vol, x_val in zip(volumes.ravel(), x_out.ravel()):
+                breaks = X_DATA[(X_DATA > 0.0) & (X_DATA < x_val)]
+                self.assertAlmostEqual(vol, quad(model, 0.0, x_val, points=breaks, epsabs=1e-14)[0], places=12)
+            self.assertAlmostEqual(model.pfr_volume(0.6, x_in=0.2), model.integral(0.2, 0.6), places=14)
+            self.assertAlmostEqual(model.cstr_volume(0.6), 0.6 * 50.0 / 38.0, places=12)
+
+    def test_pchip_is_monotone_between_points(self):
+        x_vals = np.array([0.0, 0.2, 0.4, 0.6, 0.8])
+        rising = np.array([1.0, 1.1, 1.3, 4.0, 12.0])
+        fine = RateDataModel(x_vals, rising, kind=SPLINE_PCHIP)(np.linspace(0.0, 0.8, 801))
+        self.assertTrue(np.all(np.diff(fine) >= 0))
+
+    def test_fit_cache(self):
+        first = RateDataModel(X_DATA, LEVEN)
+        second = RateDataModel(X_DATA.tolist(), LEVEN.tolist())
+        self.assertIs(first.spline, second.spline)
+        RateDataModel(X_DATA, LEVEN, kind=SPLINE_PCHIP)
+        info = rate_data.fit_cache_info()
+        self.assertEqual((info['size'], info['hits'], info['misses']), (2, 1, 2))
+
+    def test_bad_data(self):
+        with self.assertRaises(InvalidDataError):
+            RateDataModel([0.0, 0.4, 0.2], [1.0, 2.0, 3.0])
+        with self.assertRaises(InvalidDataError):
+            RateDataModel(X_DATA, LEVEN[:-1])
+        with self.assertRaises(InvalidDataError):
+            RateDataModel(X_DATA, LEVEN, kind='linear')
+
+
+if __name__ == '__main__':
+    unittest.main()
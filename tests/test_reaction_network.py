@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.reaction_network`
+"""
+
+import unittest
+
+import numpy as np
+from scipy import sparse
+from scipy.integrate import odeint
+
+from umich_che344 import lect9, lect11_semibatch
+from umich_che344.constants import InvalidDataError
+from umich_che344.kinetics import numerical_jacobian
+from umich_che344.reaction_network import (ReactionNetwork, BATCH, SEMIBATCH, PBR, MEMBRANE)
+
+# A + B --> C + D, as in lect11_semibatch
+SEMIBATCH_NETWORK = ReactionNetwork('ABCD', [{'stoich': {'A': -1, 'B': -1, 'C': 1, 'D': 1},
+                                              'k': lect11_semibatch.K_RXN}])
+# A <--> 3B + C, as in lect9
+MEMBRANE_NETWORK = ReactionNetwork('ABC', [{'stoich': {'A': -1, 'B': 3, 'C': 1}, 'k': 2.0, 'keq': 0.004}])
+MEMBRANE_PARAMS = dict(cto=0.2, fto=5.0, kc={'B': 8.0})
+
+
+def random_network(num_species, num_reactions, seed=0):
+    rng = np.random.RandomState(seed)
+    species = ['S{}'.format(idx) for idx in range(num_species)]
+    reactions = []
+    for _ in range(num_reactions):
+        picked = rng.choice(species, 4, replace=False)
+        reaction = {'stoich': {picked[0]: -1, picked[1]: -int(rng.randint(1, 3)), picked[2]: 1, picked[3]: 2},
+                    'k': rng.uniform(0.1, 2.0)}
+        if rng.rand() < 0.5:
+            reaction['k_rev'] = rng.uniform(0.01, 0.5)
+        reactions.append(reaction)
+    return ReactionNetwork(species, reactions)
+
+
+class TestReactionNetwork(unittest.TestCase):
+
+    def assert_jac_matches(self, reactor, y, x):
+        expected = numerical_jacobian(reactor.rhs, y, x)
+        self.assertTrue(np.allclose(reactor.jac(y, x), expected, rtol=1e-5, atol=1e-7))
+        self.assertTrue(np.allclose(reactor.jac_sparse(y, x).toarray(), expected, rtol=1e-5, atol=1e-7))
+
+    def test_stoichiometry(self):
+        self.assertTrue(np.array_equal(MEMBRANE_NETWORK.stoich.toarray(), [[-1.], [3.], [1.]]))
+        conc = np.array([0.1, 0.05, 0.02])
+        self.assertAlmostEqual(MEMBRANE_NETWORK.rates(conc)[0], 2.0 * (0.1 - 0.05 ** 3 * 0.02 / 0.004))
+
+    def test_semibatch_matches_lect11(self):
+        args = (5.0, 0.05, 0.025)
+        reactor = SEMIBATCH_NETWORK.compile(SEMIBATCH, vol_0=5.0, nu_in=0.05, c_in={'A': 0.025})
+        y = np.array([0.02, 0.2, 0.03, 0.03])
+        self.assertTrue(np.allclose(reactor.rhs(y, 10.0), lect11_semibatch.sys_odes_na(y, 10.0, *args)))
+        self.assertTrue(np.allclose(reactor.jac(y, 10.0), lect11_semibatch.jac_na(y, 10.0, *args)))
+        self.assertTrue(sparse.issparse(reactor.jac_sparse(y, 10.0)))
+
+        time = np.linspace(0.0, 400.0, 201)
+        sol = odeint(reactor.rhs, [0.0, 0.25, 0.0, 0.0], time, Dfun=reactor.jac)
+        model = lect11_semibatch.semibatch_model(num_points=len(time))
+        self.assertTrue(np.allclose(sol[:, 1], model['n_b'], rtol=1e-5, atol=1e-7))
+
+    def test_membrane_matches_lect9(self):
+        # lect9 leaves the pressure ratio out of the concentrations, so compare without pressure drop
+        args = (2.0, 0.004, 8.0, 0.0, 0.2, 5.0)
+        reactor = MEMBRANE_NETWORK.compile(MEMBRANE, alpha=0.0, **MEMBRANE_PARAMS)
+        self.assertEqual(reactor.state_names, ['A', 'B', 'C', 'p'])
+        y = np.array([4.0, 0.5, 0.2, 1.0])
+        self.assertTrue(np.allclose(reactor.rhs(y, 0.0), lect9.sys_odes(y, 0.0, *args)))
+        # the pressure column differs, since here the concentrations depend on the pressure ratio
+        self.assertTrue(np.allclose(reactor.jac(y, 0.0)[:, :3], lect9.sys_odes_jac(y, 0.0, *args)[:, :3]))
+
+        w_cat = np.linspace(0.0, 30.0, 201)
+        sol = odeint(reactor.rhs, [5.0, 0.0, 0.0, 1.0], w_cat, Dfun=reactor.jac)
+        expected = odeint(lect9.sys_odes, [5.0, 0.0, 0.0, 1.0], w_cat, args=args)
+        self.assertTrue(np.allclose(sol, expected, rtol=1e-5, atol=1e-6))
+
+    def test_flow_reactor_jacobians(self):
+        y = np.array([4.0, 0.5, 0.2, 0.8])
+        self.assert_jac_matches(MEMBRANE_NETWORK.compile(MEMBRANE, alpha=0.015, **MEMBRANE_PARAMS), y, 1.0)
+        self.assert_jac_matches(MEMBRANE_NETWORK.compile(PBR, cto=0.2), y[:3], 1.0)
+        self.assert_jac_matches(MEMBRANE_NETWORK.compile(PBR, nu_0=2.0), y[:3], 1.0)
+
+    def test_large_network_sparse_jacobian(self):
+        network = random_network(200, 250)
+        reactor = network.compile(BATCH)
+        conc = np.random.RandomState(1).uniform(0.0, 1.0, network.num_species)
+        self.assert_jac_matches(reactor, conc, 0.0)
+        # only species that share a reaction are coupled
+        jac = reactor.jac_sparse(conc, 0.0)
+        self.assertLess(jac.nnz, 0.1 * network.num_species ** 2)
+
+    def test_bad_input(self):
+        with self.assertRaises(InvalidDataError):
+            ReactionNetwork('AB', [{'stoich': {'A': -1, 'Z': 1}, 'k': 1.0}])
+        with self.assertRaises(InvalidDataError):
+            ReactionNetwork('AB', [{'stoich': {'A': -1, 'B': 1}}])
+        with self.assertRaises(InvalidDataError):
+            SEMIBATCH_NETWORK.compile('cstr')
+        with self.assertRaises(InvalidDataError):
+            SEMIBATCH_NETWORK.compile(BATCH, vol_0=5.0)
+        with self.assertRaises(InvalidDataError):
+            MEMBRANE_NETWORK.compile(PBR, cto=0.2, nu_0=1.0)
+        with self.assertRaises(InvalidDataError):
+            MEMBRANE_NETWORK.compile(PBR, cto=0.2, alpha=0.015)
+
+
+if __name__ == '__main__':
+    unittest.main()
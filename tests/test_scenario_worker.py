@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.scenario_worker`
+"""
+
+import json
+import unittest
+
+import numpy as np
+import six
+from scipy.integrate import odeint
+
+from umich_che344 import lect5_graphs, lect9, lect11_semibatch, scenario_worker
+
+SCENARIOS = """
+# comments and blank lines are skipped
+
+{"id": "pbr", "model": "lect9", "params": {"ka": 1.0, "w_max": 20.0, "num_points": 201}}
+{"model": "lect9", "params": {"ka": 1.0, "w_max": 20.0, "num_points": 201}, "outputs": ["p"], "final": true}
+{"model": "lect11", "params": {"nu_in": 0.05}, "outputs": ["t_target", "xb_target"]}
+{"model": "lect5", "params": {"no_such_param": 1.0}}
+[1, 2]
+{"model": "lect4", "params": {"k": 0.4}, "outputs": ["x_eq", "conversion"], "final": true}
+"""
+
+
+class TestScenarioWorker(unittest.TestCase):
+
+    def run_stream(self, text):
+        out_stream = six.StringIO()
+        num_failed = scenario_worker.run_stream(six.StringIO(text), out_stream)
+        return num_failed, [json.loads(line) for line in out_stream.getvalue().splitlines()]
+
+    def test_stream(self):
+        num_failed, results = self.run_stream(SCENARIOS)
+        self.assertEqual(num_failed, 2)
+        self.assertEqual([result['status'] for result in results], ['ok', 'ok', 'ok', 'error', 'error', 'ok'])
+        self.assertEqual([result['id'] for result in results], ['pbr', 5, 6, 7, None, 9])
+
+        full, final = results[0]['results'], results[1]['results']
+        self.assertEqual(sorted(full), ['f_a', 'f_b', 'f_c', 'p', 'w_cat'])
+        w_cat = np.linspace(0.0, 20.0, 201)
+        expected = odeint(lect9.sys_odes, [5.0, 0.0, 0.0, 1.0], w_cat, args=(1.0, 0.004, 8.0, 0.015, 0.2, 5.0))
+        self.assertTrue(np.allclose(full['p'], expected[:, 3], rtol=1e-6))
+        self.assertEqual(final, {'p': full['p'][-1]})
+
+        # the original semibatch reaches 15 L at 200 s
+        self.assertAlmostEqual(results[2]['results']['t_target'], 200.0, places=6)
+        self.assertIn('no_such_param', results[3]['error'])
+        self.assertEqual(results[5]['results']['x_eq'], lect5_graphs.x_eq_2a_to_b(20.0, 0.2, gas=False))
+
+    def test_models_match_lecture_setup(self):
+        model = lect11_semibatch.semibatch_model(vol_0=15.0, ca_0=0.25 / 15.0, cb_0=0.25 / 15.0, ca_in=0.0,
+                                                 nu_in=0.0)
+        self.assertIsNone(model['t_target'])
+        self.assertTrue(np.allclose(model['vol'], 15.0))
+        self.assertTrue(np.allclose(model['n_a'] + model['n_c'], 0.25))
+        # no initial B: the conversion of B is undefined
+        model = lect11_semibatch.semibatch_model(cb_0=0.0, ca_0=0.05)
+        self.assertIsNone(model['x_b'])
+        self.assertIsNone(model['xb_target'])
+        self.assertAlmostEqual(model['t_target'], 200.0)
+        gas = lect5_graphs.pfr_model(num_points=11)
+        self.assertTrue(np.allclose(gas['c_a'], 0.2 * (1.0 - gas['conversion']) / (1.0 - 0.5 * gas['conversion'])))
+
+    def test_json_is_strict(self):
+        self.assertEqual(scenario_worker._to_json(np.array([1.0, np.nan, np.inf])), [1.0, None, None])
+        self.assertEqual(scenario_worker._to_json(np.array([1.0, np.nan]), final=True), None)
+        self.assertIsNone(scenario_worker._to_json(float('nan')))
+        self.assertEqual(scenario_worker._to_json(np.float64(2.5)), 2.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
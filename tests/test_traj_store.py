@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.traj_store`
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from multiprocessing import Pool
+
+import numpy as np
+
+from umich_che344 import lect9
+from umich_che344.common import InvalidDataError
+from umich_che344.traj_store import TrajectoryStore
+
+NUM_POINTS = 5
+NUM_STATES = 3
+
+
+def _append_cases(args):
+    base_name, worker_id = args
+    store = TrajectoryStore(base_name, NUM_POINTS, NUM_STATES)
+    for case in range(10):
+        value = worker_id * 100 + case
+        store.append(np.full((NUM_POINTS, NUM_STATES), value), {'value': value})
+
+
+class TestTrajectoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.base_name = os.path.join(self.tmp_dir, 'sweep')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_append_and_slice(self):
+        store = TrajectoryStore(self.base_name, NUM_POINTS, NUM_STATES, state_names=['a', 'b', 'c'])
+        data = np.arange(2 * NUM_POINTS * NUM_STATES, dtype=float).reshape(2, NUM_POINTS, NUM_STATES)
+        self.assertEqual(store.append(data, [{'k': 1.0}, {'k': np.float64(2.0)}]), [0, 1])
+        self.assertEqual(store.append(data[0]), [2])
+
+        reopened = TrajectoryStore(self.base_name)
+        self.assertEqual(reopened.num_cases, 3)
+        self.assertTrue(np.array_equal(reopened.state('b'), np.concatenate((data, data[:1]))[:, :, 1]))
+        self.assertTrue(np.array_equal(reopened.state(np.int64(1)), reopened.state('b')))
+        self.assertEqual(reopened.params(), [{'k': 1.0}, {'k': 2.0}, None])
+        with self.assertRaises(InvalidDataError):
+            TrajectoryStore(self.base_name, NUM_POINTS + 1, NUM_STATES)
+        with self.assertRaises(InvalidDataError):
+            reopened.append(np.zeros((NUM_POINTS, NUM_STATES + 1)))
+
+    def test_concurrent_appends(self):
+        TrajectoryStore(self.base_name, NUM_POINTS, NUM_STATES)
+        pool = Pool(4)
+        try:
+            pool.map(_append_cases, [(self.base_name, worker_id) for worker_id in range(4)])
+        finally:
+            pool.close()
+            pool.join()
+        store = TrajectoryStore(self.base_name)
+        self.assertEqual(store.num_cases, 40)
+        trajectories = store.trajectories()
+        for case_id, case_params in enumerate(store.params()):
+            self.assertTrue(np.all(trajectories[case_id] == case_params['value']))
+
+    def test_concurrent_create(self):
+        # every worker creates the store (in a new folder) and appends at once; none may see it half-created
+        base_name = os.path.join(self.tmp_dir, 'new', 'sweep')
+        pool = Pool(4)
+        try:
+            pool.map(_append_cases, [(base_name, worker_id) for worker_id in range(8)])
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(TrajectoryStore(base_name).num_cases, 80)
+        self.assertEqual([fname for fname in os.listdir(os.path.dirname(base_name)) if fname.endswith('.tmp')], [])
+
+    def test_sweep_to_store(self):
+        w_cat = np.linspace(0.0, 30.0, 51)
+        store = TrajectoryStore(self.base_name, len(w_cat), lect9.N_STATES)
+        ka = np.array([1.0, 2.0, 3.0])
+        case_ids = lect9.solve_ode_sweep(ka, 0.004, 8.0, 0.015, 0.2, 5.0, [5.0, 0.0, 0.0, 1.0], w_cat,
+                                         chunk_size=2, store=store)
+        self.assertEqual(case_ids, [0, 1, 2])
+        in_memory = lect9.solve_ode_sweep(ka, 0.004, 8.0, 0.015, 0.2, 5.0, [5.0, 0.0, 0.0, 1.0], w_cat,
+                                          chunk_size=2)
+        self.assertTrue(np.array_equal(store.trajectories(), in_memory))
+        self.assertEqual(store.params()[2]['ka'], 3.0)
+        self.assertEqual(store.params()[2]['y0'], [5.0, 0.0, 0.0, 1.0])
@@ -12,7 +12,7 @@ Tests for `umich_che344` module.
 import sys
 import unittest
 
-from umich_che344 import umich_che344
+import umich_che344
 
 
 class TestUmich_che344(unittest.TestCase):
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for `umich_che344.vec_solvers`
+"""
+
+import unittest
+
+import numpy as np
+from scipy.optimize import fsolve
+
+from umich_che344 import lect5_graphs
+from umich_che344.vec_solvers import safeguarded_newton, x_eq_2a_to_b, equilibrium_conversion
+
+
+def rate_2a_to_b(x, k_c, cao, gas):
+    vol_change = np.where(gas, 1.0 - 0.5 * x, 1.0)
+    return cao * np.square((1.0 - x) / vol_change) - x * 0.5 / k_c / vol_change
+
+
+class TestVecSolvers(unittest.TestCase):
+
+    def test_closed_form_matches_fsolve(self):
+        for k_c, cao in [(20.0, 0.2), (0.01, 0.5), (1000.0, 2.0)]:
+            for gas in (True, False):
+                expected = fsolve(lect5_graphs.ode, 0.5, args=(0.0, 1.0, k_c, cao, 1.0, gas), xtol=1e-12)[0]
+                self.assertAlmostEqual(x_eq_2a_to_b(k_c, cao, gas), expected, places=10)
+
+    def test_closed_form_broadcasts(self):
+        k_c = np.logspace(-3, 4, 50)[:, None]
+        cao = np.logspace(-3, 1, 40)[None, :]
+        x_eq = x_eq_2a_to_b(k_c, cao, gas=True)
+        self.assertEqual(x_eq.shape, (50, 40))
+        self.assertTrue(np.all((x_eq > 0) & (x_eq < 1)))
+        self.assertTrue(np.allclose(rate_2a_to_b(x_eq, k_c, cao, True), 0.0, atol=1e-12))
+
+    def test_newton_matches_closed_form(self):
+        rng = np.random.RandomState(0)
+        k_c = 10 ** rng.uniform(-3, 4, 5000)
+        cao = 10 ** rng.uniform(-3, 1, 5000)
+        gas = rng.rand(5000) < 0.5
+        x_eq, converged = equilibrium_conversion(rate_2a_to_b, args=(k_c, cao, gas))
+        self.assertTrue(converged.all())
+        self.assertTrue(np.allclose(x_eq, x_eq_2a_to_b(k_c, cao, gas), atol=1e-10))
+
+    def test_newton_with_derivative_and_guess(self):
+        targets = np.linspace(0.1, 3.0, 30)
+        roots, converged = safeguarded_newton(lambda x, c: x ** 3 - c, 0.0, 2.0, args=(targets,),
+                                              dfunc=lambda x, c: 3.0 * x ** 2, x0=np.cbrt(targets) * 1.1)
+        self.assertTrue(converged.all())
+        self.assertTrue(np.allclose(roots, np.cbrt(targets), atol=1e-12))
+
+    def test_no_sign_change_flagged(self):
+        # an irreversible reaction has no equilibrium conversion below 1
+        x_eq, converged = equilibrium_conversion(lambda x, cao: cao * np.square(1.0 - x) + 0.0 * x,
+                                                 args=(np.array([0.1, 1.0]),), x_max=0.9)
+        self.assertFalse(converged.any())
+        self.assertEqual(x_eq.shape, (2,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Rate coefficients for a set of reactions over many temperatures at once, from the (modified) Arrhenius equation
+    k_i(T) = A_i (T / t_n_ref)^n_i exp(-E_i / (R T))
+evaluated as one (reactions x temperatures) broadcast. For repeated evaluation over a known temperature range,
+a table of ln k at evenly spaced values of 1/T can be built and interpolated linearly; ln k is linear in 1/T
+apart from the T^n factor, so the interpolation error has a known bound. With NumPy arrays the direct evaluation
+is already one exp per value and is usually at least as fast; the table is for when a bounded, precomputed
+surrogate is wanted, and its hit/miss counters show whether the temperatures stay within the tabulated range.
+"""
+from __future__ import print_function
+import numpy as np
+from umich_che344.common import InvalidDataError
+
+__author__ = 'hbmayes'
+
+DEF_LN_TOL = 1e-10  # max abs error in ln k, which is also the max relative error in k
+MAX_TABLE_NODES = 1000000
+
+
+class ArrheniusTable(object):
+    """
+    Rate coefficients for one or more reactions. k(temp) evaluates them directly; after build_table,
+    k_interp(temp) uses the interpolation table where the temperatures are in its range (counted as hits) and
+    evaluates the rest directly (counted as misses).
+    """
+    def __init__(self, a, e_a, r_gas, temp_exp=0.0, t_n_ref=1.0):
+        """
+        :param a: pre-exponential factors, one per reaction (scalar for a single reaction)
+        :param e_a: activation energies, with units consistent with r_gas
+        :param r_gas: universal gas constant in units consistent with e_a and temps
+        :param temp_exp: optional temperature exponents n of the modified Arrhenius equation
+        :param t_n_ref: reference temperature (K) for the T^n factor
+        """
+        a, e_a, temp_exp = np.broadcast_arrays(*[np.atleast_1d(np.asarray(val, dtype=float))
+                                                 for val in (a, e_a, temp_exp)])
+        if a.ndim != 1:
+            raise InvalidDataError("Expected one value per reaction for the Arrhenius parameters")
+        self.ln_a = np.log(a)
+        self.e_over_r = e_a / r_gas
+        self.temp_exp = temp_exp.copy()
+        self.t_n_ref = t_n_ref
+        self.num_rxns = len(self.ln_a)
+        self.hits = 0
+        self.misses = 0
+        self.table = None
+        self.inv_t_min = None
+        self.inv_t_step = None
+        self.max_ln_error = None
+
+    @classmethod
+    def from_ref(cls, k_ref, e_a, r_gas, t_ref, temp_exp=0.0):
+        """
+        Creates a table from rate coefficients known at a reference temperature ("alternate" form of the
+        Arrhenius equation, as in common.k_at_new_temp)
+        :param k_ref: rate coefficients at t_ref, one per reaction
+        :param e_a: activation energies, with units consistent with r_gas
+        :param r_gas: universal gas constant in units consistent with e_a and temps
+        :param t_ref: reference temperature(s) in K
+        :param temp_exp: optional temperature exponents n, with t_ref also the reference for T^n
+        :return: ArrheniusTable
+        """
+        k_ref, e_a, t_ref = np.broadcast_arrays(*[np.atleast_1d(np.asarray(val, dtype=float))
+                                                  for val in (k_ref, e_a, t_ref)])
+        rxn_table = cls(1.0, e_a, r_gas, temp_exp=temp_exp)
+        # A (T/t_ref)^n exp(-E/RT) = k_ref at T = t_ref, with the T^n reference moved to 1 K
+        rxn_table.ln_a = np.log(k_ref) + rxn_table.e_over_r / t_ref - rxn_table.temp_exp * np.log(t_ref)
+        return rxn_table
+
+    def ln_k(self, temp):
+        """
+        :param temp: temperature(s) in K
+        :return: ln k with shape [num_rxns, len(temp)], or [num_rxns] for a scalar temp
+        """
+        temp = np.asarray(temp, dtype=float)
+        inv_t = 1.0 / np.atleast_1d(temp)
+        ln_k = np.multiply.outer(-self.e_over_r, inv_t)
+        ln_k += self.ln_a[:, None]
+        if np.any(self.temp_exp):
+            ln_k += np.multiply.outer(self.temp_exp, np.log(np.atleast_1d(temp) / self.t_n_ref))
+        return ln_k[:, 0] if temp.ndim == 0 else ln_k
+
+    def k(self, temp, out=None):
+        """
+        :param temp: temperature(s) in K
+        :param out: optional array of shape [num_rxns, len(temp)] for the result
+        :return: rate coefficients with shape [num_rxns, len(temp)], or [num_rxns] for a scalar temp
+        """
+        return np.exp(self.ln_k(temp), out=out)
+
+    def build_table(self, t_min, t_max, ln_tol=DEF_LN_TOL):
+        """
+        Tabulates ln k at evenly spaced 1/T between t_min and t_max. The linear interpolation error in ln k is at
+        most h^2/8 * max|n| * t_max^2 for a spacing h in 1/T (the second derivative of n ln T with respect to 1/T
+        is n T^2), so the spacing is chosen to keep that below ln_tol. Without a T^n term, the interpolation is
+        exact and two nodes suffice.
+        :param t_min: lowest temperature in K to tabulate
+        :param t_max: highest temperature in K to tabulate
+        :param ln_tol: maximum absolute error in ln k, i.e. about the maximum relative error in k
+        :return: the number of nodes in the table
+        """
+        if not 0 < t_min < t_max:
+            raise InvalidDataError("Expected 0 < t_min < t_max, but found t_min = {} and t_max = {}".format(
+                t_min, t_max))
+        inv_t_min = 1.0 / t_max
+        inv_t_span = 1.0 / t_min - inv_t_min
+        curvature = np.max(np.abs(self.temp_exp)) * t_max ** 2
+        num_nodes = 2
+        if curvature > 0:
+            num_nodes = max(2, int(np.ceil(inv_t_span / np.sqrt(8.0 * ln_tol / curvature))) + 1)
+        if num_nodes > MAX_TABLE_NODES:
+            raise InvalidDataError("A table from {} K to {} K with ln_tol = {} needs {} nodes (max {})".format(
+                t_min, t_max, ln_tol, num_nodes, MAX_TABLE_NODES))
+        self.inv_t_min = inv_t_min
+        self.inv_t_step = inv_t_span / (num_nodes - 1)
+        self.table = self.ln_k(1.0 / (inv_t_min + self.inv_t_step * np.arange(num_nodes)))
+        self.max_ln_error = self.inv_t_step ** 2 / 8.0 * curvature
+        return num_nodes
+
+    def k_interp(self, temp, out=None):
+        """
+        Rate coefficients from the table built with build_table, with the relative error bounded by its ln_tol;
+        temperatures outside the table range are evaluated directly
+        :param temp: temperature(s) in K
+        :param out: optional array of shape [num_rxns, len(temp)] for the result
+        :return: rate coefficients with shape [num_rxns, len(temp)], or [num_rxns] for a scalar temp
+        """
+        if self.table is None:
+            raise InvalidDataError("Call build_table before k_interp")
+        temp = np.asarray(temp, dtype=float)
+        temps = np.atleast_1d(temp)
+        pos = (1.0 / temps - self.inv_t_min) / self.inv_t_step
+        last = self.table.shape[1] - 1
+        in_range = (pos >= 0) & (pos <= last)
+        num_hits = int(np.count_nonzero(in_range))
+        self.hits += num_hits
+        self.misses += len(temps) - num_hits
+
+        if out is None:
+            out = np.empty((self.num_rxns, len(temps)))
+        if num_hits == len(temps):
+            idx = np.minimum(pos.astype(np.intp), last - 1)
+            frac = pos - idx
+            lower = self.table[:, idx]
+            np.exp(lower + frac * (self.table[:, idx + 1] - lower), out=out)
+        else:
+            pos_hit = pos[in_range]
+            idx = np.minimum(pos_hit.astype(np.intp), last - 1)
+            lower = self.table[:, idx]
+            out[:, in_range] = np.exp(lower + (pos_hit - idx) * (self.table[:, idx + 1] - lower))
+            out[:, ~in_range] = self.k(temps[~in_range])
+        return out[:, 0] if temp.ndim == 0 else out
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
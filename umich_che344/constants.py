@@ -0,0 +1,108 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Constants, unit conversions, the package's exception, and other small helpers used by every script; only
+the standard library is imported, so this is cheap to import anywhere
+"""
+from __future__ import print_function
+import sys
+from contextlib import contextmanager
+import six
+
+__author__ = 'hbmayes'
+
+"""
+Exit Codes:
+0 = Success
+1 = Invalid input
+2 = One or more scenarios failed (che344_scenarios)
+2 = One or more figure jobs failed (make_all_figs)
+"""
+# The good status code
+GOOD_RET = 0
+INPUT_ERROR = 1
+SCENARIO_ERROR = 2
+JOB_ERROR = 2
+
+# physical constants
+J_IN_CAL = 4.184  # conversion factor J/cal = kJ/kcal
+R_J = 8.314472  # J / K mol
+R_KJ = 0.001 * R_J  # kJ / K mol
+R_CAL = R_J / J_IN_CAL
+R_KCAL = R_CAL * 0.001
+R_BAR = R_J * 0.001 # bar-L / mol-K
+R_ATM = 0.082057338  # atm-L / mol-K
+K_0C = 273.15  # Temp in Kelvin at 0 degrees C
+AVO = 6.022140857e23 # avogadro's number, mol-1, from NIST on 2018-01-15
+
+
+class InvalidDataError(Exception):
+    pass
+
+
+def warning(*objs):
+    """Writes a message to stderr."""
+    print("WARNING: ", *objs, file=sys.stderr)
+
+
+# For tests
+
+# From http://schinckel.net/2013/04/15/capture-and-test-sys.stdout-sys.stderr-in-unittest.testcase/
+@contextmanager
+def capture_stdout(command, *args, **kwargs):
+    # pycharm doesn't know six very well, so ignore the false warning
+    # noinspection PyCallingNonCallable
+    out, sys.stdout = sys.stdout, six.StringIO()
+    command(*args, **kwargs)
+    sys.stdout.seek(0)
+    yield sys.stdout.read()
+    sys.stdout = out
+
+
+@contextmanager
+def capture_stderr(command, *args, **kwargs):
+    # pycharm doesn't know six very well, so ignore the false warning
+    # noinspection PyCallingNonCallable
+    err, sys.stderr = sys.stderr, six.StringIO()
+    command(*args, **kwargs)
+    sys.stderr.seek(0)
+    yield sys.stderr.read()
+    sys.stderr = err
+
+
+# Conversions
+
+def temp_c_to_k(temp_in_c):
+    """
+    simple conversion
+    :param temp_in_c: temp in Celsius
+    :return: temp in K
+    """
+    return temp_in_c + K_0C
+
+
+def temp_k_to_c(temp_in_k):
+    """
+    simple conversion
+    :param temp_in_k: temp in Kelvin
+    :return: temp in Celsius
+    """
+    return temp_in_k - K_0C
+
+
+def j_to_cal(energy_joules):
+    """
+    simple conversion
+    :param energy_joules: energy in joules
+    :return: energy in calories
+    """
+    return energy_joules / J_IN_CAL
+
+
+def cal_to_j(energy_cal):
+    """
+    simple conversion
+    :param energy_cal: energy in calories
+    :return: energy in Joules
+    """
+    return energy_cal * J_IN_CAL
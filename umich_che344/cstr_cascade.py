@@ -0,0 +1,147 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Conversions through a series of equal CSTRs (constant density) for any rate law, solving each tank for many feed
+conditions at once. Tank i satisfies the design equation
+    cao (X_i - X_{i-1}) = tau_tank * (-r_A(X_i))
+which is solved on [X_{i-1}, 1] with the vectorized bracketed Newton iteration from vec_solvers. With enough
+tanks the cascade approaches a PFR of the same total volume.
+The rate law is a function of conversion first, rate_func(x, *args) = -r_A; e.g. for lect6_alt.r_dis_a use
+    lambda x, k, cao, k_equil: r_dis_a(k, cao, x, k_equil)
+"""
+from __future__ import print_function
+import numpy as np
+from umich_che344.common import InvalidDataError
+from umich_che344.vec_solvers import safeguarded_newton, DEF_XTOL
+
+__author__ = 'hbmayes'
+
+MAX_TANKS = 10000
+
+
+def _broadcast_cases(tau, cao, args, x_feed):
+    """
+    :return: case shape, and flattened tau, cao, args, and feed conversions
+    """
+    arrays = np.broadcast_arrays(*[np.asarray(val, dtype=float) for val in [tau, cao, x_feed] + list(args)])
+    flat = [array.ravel() for array in arrays]
+    return arrays[0].shape, flat[0], flat[1], flat[3:], flat[2].copy()
+
+
+def _solve_tank(rate_func, drate_func, x_prev, x_guess, tau, cao, args, xtol):
+    """
+    Outlet conversion of one tank for each case, given the inlet conversions x_prev
+    """
+    def residual(x, x_in, tau_tank, ca0, *rate_args):
+        return ca0 * (x - x_in) - tau_tank * rate_func(x, *rate_args)
+
+    dresidual = None
+    if drate_func is not None:
+        def dresidual(x, x_in, tau_tank, ca0, *rate_args):
+            return ca0 - tau_tank * drate_func(x, *rate_args)
+
+    return safeguarded_newton(residual, x_prev, 1.0, args=[x_prev, tau, cao] + list(args), dfunc=dresidual,
+                              x0=x_guess, xtol=xtol)
+
+
+def cascade_conversions(rate_func, num_tanks, tau, cao, args=(), drate_func=None, x_feed=0.0, xtol=DEF_XTOL):
+    """
+    Conversion after each tank of a cascade of equal CSTRs, for many cases (feeds, rate parameters, tank sizes)
+    :param rate_func: vectorized rate of disappearance of A as a function of conversion, rate_func(x, *args)
+    :param num_tanks: number of tanks in series
+    :param tau: space time of each tank (tank volume / volumetric flow); scalar or array
+    :param cao: concentration of A at zero conversion; scalar or array
+    :param args: rate law parameters; scalars or arrays that broadcast with tau and cao
+    :param drate_func: optional derivative of rate_func with respect to x
+    :param x_feed: conversion of the feed to the first tank
+    :param xtol: absolute tolerance on the conversions
+    :return: conversions with shape [num_tanks + 1] + case shape (the first row is the feed), and a boolean array
+             with the case shape that is False where any tank solve did not converge
+    """
+    shape, tau, cao, args, x = _broadcast_cases(tau, cao, args, x_feed)
+    conversions = np.empty((num_tanks + 1, len(x)))
+    conversions[0] = x
+    converged = np.ones(len(x), dtype=bool)
+    step = np.zeros(len(x))
+    for tank in range(1, num_tanks + 1):
+        # the change in conversion across the last tank is a good first guess for the next
+        x_new, tank_converged = _solve_tank(rate_func, drate_func, x, x + step, tau, cao, args, xtol)
+        step = x_new - x
+        x = x_new
+        conversions[tank] = x
+        converged &= tank_converged
+    return conversions.reshape((num_tanks + 1,) + shape), converged.reshape(shape)
+
+
+def _outlet_conversion(rate_func, num_tanks, total_tau, cao, args, drate_func, x_feed, xtol):
+    """
+    Outlet conversions for a different number of tanks in each case, splitting total_tau equally among them;
+    all inputs are flat arrays of the same length
+    """
+    x = x_feed.copy()
+    converged = np.ones(len(x), dtype=bool)
+    step = np.zeros(len(x))
+    tau = total_tau / np.maximum(num_tanks, 1)
+    for tank in range(1, int(num_tanks.max(initial=0)) + 1):
+        active = np.flatnonzero(num_tanks >= tank)
+        x_new, tank_converged = _solve_tank(rate_func, drate_func, x[active], x[active] + step[active],
+                                            tau[active], cao[active], [arg[active] for arg in args], xtol)
+        step[active] = x_new - x[active]
+        x[active] = x_new
+        converged[active] &= tank_converged
+    return x, converged
+
+
+def tanks_for_conversion(rate_func, x_target, total_tau, cao, args=(), drate_func=None, x_feed=0.0,
+                         max_tanks=MAX_TANKS, xtol=DEF_XTOL):
+    """
+    Smallest number of equal CSTRs, splitting a fixed total space time, that reaches a target conversion. The
+    outlet conversion rises with the number of tanks toward the PFR value (for rate laws that decrease with
+    conversion), so for each case the count is bracketed by doubling and then found by bisection, costing about
+    2 log2(N) cascade solves instead of N.
+    :param rate_func: vectorized rate of disappearance of A as a function of conversion, rate_func(x, *args)
+    :param x_target: conversion to reach; scalar or array
+    :param total_tau: total volume of the cascade / volumetric flow; scalar or array
+    :param cao: concentration of A at zero conversion; scalar or array
+    :param args: rate law parameters; scalars or arrays that broadcast with the others
+    :param drate_func: optional derivative of rate_func with respect to x
+    :param x_feed: conversion of the feed to the first tank
+    :param max_tanks: largest number of tanks to consider
+    :param xtol: absolute tolerance on the conversions
+    :return: number of tanks (integer array with the case shape), and a boolean array that is False where the
+             target is not reached with max_tanks tanks (e.g. it is beyond the PFR conversion)
+    """
+    if max_tanks < 1:
+        raise InvalidDataError("Expected max_tanks >= 1, but found {}".format(max_tanks))
+    x_target = np.asarray(x_target, dtype=float)
+    shape, total_tau, cao, args, x_feed = _broadcast_cases(total_tau, cao, list(args) + [x_target], x_feed)
+    x_target = args.pop()
+
+    def reaches(num_tanks, cases):
+        x_out, _ = _outlet_conversion(rate_func, num_tanks, total_tau[cases], cao[cases],
+                                      [arg[cases] for arg in args], drate_func, x_feed[cases], xtol)
+        return x_out >= x_target[cases]
+
+    num_cases = len(total_tau)
+    n_lo = np.zeros(num_cases, dtype=int)  # largest count known to fall short
+    n_hi = np.ones(num_cases, dtype=int)  # smallest count known (or hoped) to reach the target
+    found = x_feed >= x_target
+    n_hi[found] = 0
+    searching = np.flatnonzero(~found)
+    while len(searching):
+        ok = reaches(n_hi[searching], searching)
+        found[searching[ok]] = True
+        short = searching[~ok]
+        n_lo[short] = n_hi[short]
+        n_hi[short] = np.minimum(2 * n_hi[short], max_tanks)
+        # stop once max_tanks itself has been tried
+        searching = short[n_lo[short] < max_tanks]
+
+    bisecting = np.flatnonzero(found & (n_hi - n_lo > 1))
+    while len(bisecting):
+        n_mid = (n_lo[bisecting] + n_hi[bisecting]) // 2
+        ok = reaches(n_mid, bisecting)
+        n_hi[bisecting[ok]] = n_mid[ok]
+        n_lo[bisecting[~ok]] = n_mid[~ok]
+        bisecting = bisecting[n_hi[bisecting] - n_lo[bisecting] > 1]
+    return n_hi.reshape(shape), found.reshape(shape)
@@ -0,0 +1,439 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Reading and writing CSV files, row by row (lists of dicts) or by columns (NumPy arrays), and file name helpers
+"""
+from __future__ import print_function
+import csv
+import errno
+import os
+from collections import OrderedDict
+from itertools import chain, islice
+import numpy as np
+from umich_che344.constants import InvalidDataError, warning
+
+__author__ = 'hbmayes'
+
+# for CSV files
+DEF_CSV_CHUNK_ROWS = 65536
+CSV_LINE_END = '\r\n'  # as written by the csv module
+# conversion functions that read_csv_columns can hand to NumPy's own parsing
+NUMPY_CONV_TYPES = {float: float, int: int}
+
+
+def silent_remove(filename, disable=False):
+    """
+    Removes the target file name, catching and ignoring errors that indicate that the
+    file does not exist.
+
+    @param filename: The file to remove.
+    @param disable: boolean to flag if want to disable removal
+    """
+    if not disable:
+        try:
+            os.remove(filename)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+
+# LOGIC
+
+def create_out_fname(src_file, prefix='', suffix='', remove_prefix=None, base_dir=None, ext=None):
+    """Creates an outfile name for the given source file.
+
+    @param remove_prefix: string to remove at the beginning of file name
+    @param src_file: The file to process.
+    @param prefix: The file prefix to add, if specified.
+    @param suffix: The file suffix to append, if specified.
+    @param base_dir: The base directory to use; defaults to `src_file`'s directory.
+    @param ext: The extension to use instead of the source file's extension;
+        defaults to the `scr_file`'s extension.
+    @return: The output file name.
+    """
+
+    if base_dir is None:
+        base_dir = os.path.dirname(src_file)
+
+    file_name = os.path.basename(src_file)
+    if remove_prefix is not None and file_name.startswith(remove_prefix):
+        base_name = file_name[len(remove_prefix):]
+    else:
+        base_name = os.path.splitext(file_name)[0]
+
+    if ext is None:
+        ext = os.path.splitext(file_name)[1]
+
+    return os.path.abspath(os.path.join(base_dir, prefix + base_name + suffix + ext))
+
+
+def convert_dict_line(all_conv, data_conv, line):
+    s_dict = {}
+    for s_key, s_val in line.items():
+        if data_conv and s_key in data_conv:
+            try:
+                s_dict[s_key] = data_conv[s_key](s_val)
+            except ValueError as e:
+                warning("Could not convert value '{}' from column '{}': '{}'.  Leaving as str".format(s_val, s_key, e))
+                s_dict[s_key] = s_val
+        elif all_conv:
+            try:
+                s_dict[s_key] = all_conv(s_val)
+            except ValueError as e:
+                warning("Could not convert value '{}' from column '{}': '{}'.  Leaving as str".format(s_val, s_key, e))
+                s_dict[s_key] = s_val
+        else:
+            s_dict[s_key] = s_val
+    return s_dict
+
+
+def utf_8_encoder(unicode_csv_data):
+    for line in unicode_csv_data:
+        yield line.encode('utf-8')
+
+
+# CSV #
+
+def read_csv_header(src_file):
+    """Returns a list containing the values from the first row of the given CSV
+    file or None if the file is empty.
+
+    @param src_file: The CSV file to read.
+    @return: The first row or None if empty.
+    """
+    with open(src_file) as csv_file:
+        for row in csv.reader(csv_file):
+            return list(row)
+
+
+def _resolve_converters(fieldnames, data_conv, all_conv):
+    """
+    Looks up the conversion function for each column once, rather than for every value
+    @param fieldnames: the header row
+    @param data_conv: A map of header keys to conversion functions (takes precedence)
+    @param all_conv: A function to apply to all other columns
+    @return: list of (key, conversion function or None) in column order
+    """
+    converters = []
+    for s_key in fieldnames:
+        if data_conv and s_key in data_conv:
+            converters.append((s_key, data_conv[s_key]))
+        else:
+            converters.append((s_key, all_conv))
+    return converters
+
+
+def _convert_value(conv, s_key, s_val):
+    """
+    @return: the converted value and a boolean that is False if it had to be left as str
+    """
+    try:
+        return conv(s_val), True
+    except ValueError as e:
+        warning("Could not convert value '{}' from column '{}': '{}'.  Leaving as str".format(s_val, s_key, e))
+        return s_val, False
+
+
+def iter_csv(src_file, data_conv=None, all_conv=None, quote_style=csv.QUOTE_MINIMAL):
+    """
+    Generator version of read_csv: yields one converted row dict at a time, so that files larger than memory
+    can be processed. The arguments and conversion rules are as for read_csv, including leaving values that
+    cannot be converted as str.
+
+    @param src_file: The CSV to read.
+    @param data_conv: A map of header keys to conversion functions.
+    @param all_conv: A function to apply to all values in the CSV.  A specified data_conv value
+        takes precedence.
+    @param quote_style: how to read the dictionary
+    @return: generator of dicts, one per row
+    """
+    with open(src_file, 'r') as csv_file:
+        csv_reader = csv.reader(csv_file, quoting=quote_style)
+        fieldnames = next(csv_reader, None)
+        if fieldnames is None:
+            return
+        converters = _resolve_converters(fieldnames, data_conv, all_conv)
+        num_fields = len(fieldnames)
+        for row in csv_reader:
+            if not row:
+                continue
+            s_dict = {}
+            for (s_key, conv), s_val in zip(converters, row):
+                s_dict[s_key] = s_val if conv is None else _convert_value(conv, s_key, s_val)[0]
+            # same handling of short and long rows as csv.DictReader
+            if len(row) < num_fields:
+                for s_key, _ in converters[len(row):]:
+                    s_dict[s_key] = None
+            elif len(row) > num_fields:
+                s_dict[None] = row[num_fields:]
+            yield s_dict
+
+
+def read_csv(src_file, data_conv=None, all_conv=None, quote_style=csv.QUOTE_MINIMAL):
+    """
+    Reads the given CSV (comma-separated with a first-line header row) and returns a list of
+    dicts where each dict contains a row's data keyed by the header row.
+
+    @param src_file: The CSV to read.
+    @param data_conv: A map of header keys to conversion functions.  Note that values
+        that throw a TypeError from an attempted conversion are left as strings in the result.
+    @param all_conv: A function to apply to all values in the CSV.  A specified data_conv value
+        takes precedence.
+    @param quote_style: how to read the dictionary
+    @return: A list of dicts containing the file's data.
+    """
+    return list(iter_csv(src_file, data_conv=data_conv, all_conv=all_conv, quote_style=quote_style))
+
+
+def _convert_column(values, s_key, conv):
+    """
+    Converts one chunk of a column to an array, using NumPy's own parsing for the common numeric types
+    @return: typed array, or an object array if some values had to be left as str
+    """
+    if conv is None:
+        return np.array(values, dtype=str)
+    if conv in NUMPY_CONV_TYPES:
+        try:
+            return np.array(values, dtype=NUMPY_CONV_TYPES[conv])
+        except (ValueError, TypeError):
+            # find (and warn about) the values that do not convert
+            pass
+    converted = [_convert_value(conv, s_key, s_val) for s_val in values]
+    if all(converted_ok for _, converted_ok in converted):
+        return np.array([val for val, _ in converted])
+    return np.array([val for val, _ in converted], dtype=object)
+
+
+def _iter_records(csv_file, quote_style=csv.QUOTE_MINIMAL):
+    """
+    Yields the text of one CSV record at a time: usually one line, but several when a quoted field holds line
+    breaks (while a record has an odd number of quote characters, a quoted field is still open)
+    """
+    for line in csv_file:
+        if quote_style != csv.QUOTE_NONE:
+            while line.count('"') % 2:
+                next_line = next(csv_file, None)
+                if next_line is None:
+                    break
+                line += next_line
+        yield line
+
+
+def read_csv_columns(src_file, data_conv=None, all_conv=None, quote_style=csv.QUOTE_MINIMAL, structured=False,
+                     chunk_rows=DEF_CSV_CHUNK_ROWS):
+    """
+    Columnar version of read_csv: returns the data as one NumPy array per column. The file is read and
+    converted chunk_rows rows at a time, and each column's conversion function is looked up once.
+    Columns with a conversion function that cannot convert every value become object arrays with the failed
+    values left as str, as in read_csv; columns without a conversion function are str arrays. Every row
+    must have one value per header column; otherwise InvalidDataError is raised.
+
+    @param src_file: The CSV to read.
+    @param data_conv: A map of header keys to conversion functions.
+    @param all_conv: A function to apply to all values in the CSV.  A specified data_conv value
+        takes precedence.
+    @param quote_style: how to read the dictionary
+    @param structured: boolean to return a NumPy structured array instead of a dict of arrays
+    @param chunk_rows: number of rows to convert at a time
+    @return: dict of arrays keyed by the header row (in column order), or a structured array
+    """
+    with open(src_file, 'r') as csv_file:
+        fieldnames = next(csv.reader(_iter_records(csv_file, quote_style), quoting=quote_style), None)
+        if fieldnames is None:
+            return {}
+        converters = _resolve_converters(fieldnames, data_conv, all_conv)
+        num_fields = len(fieldnames)
+        # when every column is numeric, NumPy's C parser can read a whole chunk at once
+        fast_dtype = None
+        if all(conv in NUMPY_CONV_TYPES for _, conv in converters):
+            fast_dtype = [('f{}'.format(col_id), NUMPY_CONV_TYPES[conv])
+                          for col_id, (_, conv) in enumerate(converters)]
+        chunks = [[] for _ in fieldnames]
+        num_records = 0
+        while True:
+            # whole records, so a quoted field with line breaks is never split between chunks
+            records = list(islice(_iter_records(csv_file, quote_style), chunk_rows))
+            if not records:
+                break
+            chunk_cols = None
+            if fast_dtype is not None and not any('\n' in record[:-1] for record in records):
+                try:
+                    # no comment character: a value starting with "#" is data, as in read_csv
+                    table = np.loadtxt(records, delimiter=',', quotechar='"', comments=None, dtype=fast_dtype,
+                                       ndmin=1)
+                    chunk_cols = [table[name] for name, _ in fast_dtype]
+                except ValueError:
+                    # a value that does not convert (or a malformed row): use the general path for this chunk
+                    pass
+            if chunk_cols is None:
+                rows = list(csv.reader(records, quoting=quote_style))
+                for record_id, row in enumerate(rows, num_records + 1):
+                    if row and len(row) != num_fields:
+                        raise InvalidDataError("File '{}' data row {}: expected {} values but found {}".format(
+                            src_file, record_id, num_fields, len(row)))
+                rows = [row for row in rows if row]
+                if rows:
+                    chunk_cols = [_convert_column(list(values), s_key, conv)
+                                  for (s_key, conv), values in zip(converters, zip(*rows))]
+            num_records += len(records)
+            if chunk_cols is not None:
+                for col_id, col in enumerate(chunk_cols):
+                    chunks[col_id].append(col)
+
+    columns = OrderedDict()
+    for (s_key, conv), col_chunks in zip(converters, chunks):
+        if not col_chunks:
+            columns[s_key] = _convert_column([], s_key, conv)
+        elif any(chunk.dtype == object for chunk in col_chunks):
+            columns[s_key] = np.concatenate([chunk.astype(object) for chunk in col_chunks])
+        else:
+            columns[s_key] = np.concatenate(col_chunks)
+    if not structured:
+        return columns
+    result = np.empty(len(columns[fieldnames[0]]), dtype=[(s_key, col.dtype) for s_key, col in columns.items()])
+    for s_key, col in columns.items():
+        result[s_key] = col
+    return result
+
+
+def write_csv(data, out_fname, fieldnames, extrasaction="raise", mode='w', quote_style=csv.QUOTE_NONNUMERIC,
+              print_message=True, round_digits=False):
+    """
+    Writes the given data to the given file location.
+
+    @param round_digits: if desired, provide decimal number for rounding
+    @param data: The data to write (list of dicts).
+    @param out_fname: The name of the file to write to.
+    @param fieldnames: The sequence of field names to use for the header.
+    @param extrasaction: What to do when there are extra keys.  Acceptable
+        values are "raise" or "ignore".
+    @param mode: default mode is to overwrite file
+    @param print_message: boolean to flag whether to note that file written or appended
+    @param quote_style: dictates csv output style
+    """
+    with open(out_fname, mode) as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames, extrasaction=extrasaction, quoting=quote_style)
+        if mode == 'w':
+            writer.writeheader()
+        if round_digits:
+            # round copies of the rows, leaving the caller's data unchanged
+            data = [dict((key, round(val, round_digits) if isinstance(val, float) else val)
+                         for key, val in row.items()) for row in data]
+        writer.writerows(data)
+    _print_csv_message(out_fname, mode, print_message)
+
+
+def _print_csv_message(out_fname, mode, print_message):
+    if print_message:
+        if mode == 'a':
+            print("  Appended: {}".format(out_fname))
+        elif mode == 'w':
+            print("Wrote file: {}".format(out_fname))
+
+
+def _csv_quote(val):
+    """
+    Formats a value as csv.QUOTE_NONNUMERIC does: numbers as is, anything else quoted
+    """
+    if isinstance(val, np.generic):
+        val = val.item()
+    if val is None:
+        return '""'
+    if isinstance(val, (int, float)):
+        return repr(val)
+    return '"' + str(val).replace('"', '""') + '"'
+
+
+class CsvColumnWriter(object):
+    """
+    Writes column data (NumPy arrays, or an ODE solution matrix) to a CSV file, formatting and writing each chunk
+    of rows with a single write call. The output matches write_csv with its default csv.QUOTE_NONNUMERIC style.
+    Call "write" as often as needed to stream results to the file as they are produced; the file stays open
+    until "close" (or the end of a "with" block).
+    """
+    def __init__(self, out_fname, fieldnames, mode='w', round_digits=False, chunk_rows=DEF_CSV_CHUNK_ROWS,
+                 print_message=True):
+        """
+        @param out_fname: The name of the file to write to.
+        @param fieldnames: The sequence of field names, in column order.
+        @param mode: 'w' to overwrite the file and write a header row, 'a' to append
+        @param round_digits: if desired, provide decimal number for rounding floats
+        @param chunk_rows: number of rows to format per write call
+        @param print_message: boolean to flag whether to note that file written or appended
+        """
+        self.out_fname = out_fname
+        self.fieldnames = list(fieldnames)
+        self.mode = mode
+        self.round_digits = round_digits
+        self.chunk_rows = chunk_rows
+        self.print_message = print_message
+        self.csv_file = open(out_fname, mode)
+        if mode == 'w':
+            self.csv_file.write(','.join(_csv_quote(name) for name in self.fieldnames) + CSV_LINE_END)
+
+    def _columns(self, data):
+        if isinstance(data, dict):
+            columns = [np.asarray(data[name]) for name in self.fieldnames]
+        else:
+            data = np.asarray(data)
+            if data.ndim != 2 or data.shape[1] != len(self.fieldnames):
+                raise InvalidDataError("Expected an array with shape [num_rows, {}] but found shape {}"
+                                       "".format(len(self.fieldnames), data.shape))
+            columns = list(data.T)
+        if len(set(len(col) for col in columns)) > 1:
+            raise InvalidDataError("Columns for file '{}' differ in length".format(self.out_fname))
+        if self.round_digits:
+            columns = [np.round(col, self.round_digits) if col.dtype.kind == 'f' else col for col in columns]
+        return columns
+
+    def write(self, data):
+        """
+        @param data: dict of arrays keyed by the field names, or an array with shape [num_rows, num_fields]
+        """
+        columns = self._columns(data)
+        num_rows = len(columns[0]) if columns else 0
+        # numeric columns are formatted by the string % operator; others are converted value by value
+        col_formats = []
+        for col in columns:
+            col_formats.append('%r' if col.dtype.kind in 'fiub' else '%s')
+        row_format = ','.join(col_formats) + CSV_LINE_END
+        for start in range(0, num_rows, self.chunk_rows):
+            chunk = []
+            for col in columns:
+                col_chunk = col[start:start + self.chunk_rows]
+                if col.dtype.kind in 'fiub':
+                    chunk.append(col_chunk.tolist())
+                else:
+                    chunk.append([_csv_quote(val) for val in col_chunk])
+            values = tuple(chain.from_iterable(zip(*chunk)))
+            self.csv_file.write(row_format * len(chunk[0]) % values)
+
+    def close(self):
+        if not self.csv_file.closed:
+            self.csv_file.close()
+            _print_csv_message(self.out_fname, self.mode, self.print_message)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+def write_csv_columns(data, out_fname, fieldnames, mode='w', round_digits=False, chunk_rows=DEF_CSV_CHUNK_ROWS,
+                      print_message=True):
+    """
+    Writes column data to the given file location; see CsvColumnWriter
+
+    @param data: dict of arrays keyed by the field names, or an array with shape [num_rows, num_fields], such as
+        an odeint solution
+    @param out_fname: The name of the file to write to.
+    @param fieldnames: The sequence of field names, in column order.
+    @param mode: default mode is to overwrite file
+    @param round_digits: if desired, provide decimal number for rounding
+    @param chunk_rows: number of rows to format per write call
+    @param print_message: boolean to flag whether to note that file written or appended
+    """
+    with CsvColumnWriter(out_fname, fieldnames, mode=mode, round_digits=round_digits, chunk_rows=chunk_rows,
+                         print_message=print_message) as writer:
+        writer.write(data)
@@ -6,7 +6,9 @@ Calcs for HW2
 from __future__ import print_function
 
 import sys
-from umich_che344.common import GOOD_RET, R_KCAL, temp_c_to_k, k_at_new_temp
+import numpy as np
+from umich_che344.common import GOOD_RET, R_KCAL, temp_c_to_k
+from umich_che344.arrhenius import ArrheniusTable
 
 __author__ = 'hbmayes'
 
@@ -22,9 +24,12 @@ def main():
     common_constant = c_initial**2 * (1-x)  # M^2
 
     # temp in C, vol in L
-    for temp, vol in zip([500.0, 200.0, 350.0, 200.0, 100.0], [100.0, 250.0, 500.0, 5000.0, 10000.0]):
+    temps = np.array([500.0, 200.0, 350.0, 200.0, 100.0])
+    vols = [100.0, 250.0, 500.0, 5000.0, 10000.0]
+    # all the rate coefficients at once
+    k_vals = ArrheniusTable.from_ref(k_ref, e_a, R_KCAL, t_ref).k(temp_c_to_k(temps))[0]
+    for temp, vol, k in zip(temps, vols, k_vals):
         temp_k = temp_c_to_k(temp)
-        k = k_at_new_temp(k_ref, e_a, R_KCAL, t_ref, temp_k)
         print("At {}C ({}K), k = {:0.2E}".format(temp, temp_k, k))
         intermed = k*vol
         print("  kV = {:0.2E} L/mol/min*{:0.0f} L = {:0.3f} L^2/mol/min".format(k, vol, intermed))
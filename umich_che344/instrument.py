@@ -0,0 +1,278 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Opt-in instrumentation of the solver and plotting calls, to see where a slow script spends its time. When
+enabled (with the CHE344_INSTRUMENT environment variable or enable()):
+  - odeint and fsolve, drop-in replacements for the scipy functions, record for each solve the wall time, the
+    number of and time spent in right-hand side (RHS) and Jacobian calls, and the counts the solver reports in
+    its full_output infodict: for odeint the steps, function and Jacobian evaluations and LSODA's switches
+    between its non-stiff (Adams) and stiff (BDF) methods; for fsolve the evaluations and exit status
+  - functions decorated with timed, and blocks in a phase context, record their calls and wall time. Phases
+    may nest; each phase also records its "self" time, excluding the phases inside it (e.g. the make_fig self
+    time is building the figure and the save_figure time is rendering and writing it).
+report() returns everything recorded since the last reset() as a dict, e.g. for one script run, and
+aggregate() combines such reports, e.g. across the jobs of make_all_figs or the cases of a sweep.
+When disabled, the wrappers call straight through to scipy.
+"""
+from __future__ import print_function
+import os
+import timeit
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+import numpy as np
+
+__author__ = 'hbmayes'
+
+ENV_VAR = 'CHE344_INSTRUMENT'
+TRUE_STRINGS = ('1', 'true', 'yes', 'on')
+
+ODEINT = 'odeint'
+FSOLVE = 'fsolve'
+LSODA_METHODS = {1: 'adams', 2: 'bdf'}
+# totals summed over the solves of each solver
+SUM_KEYS = ('seconds', 'rhs_calls', 'rhs_seconds', 'jac_calls', 'jac_seconds', 'nst', 'nfe', 'nje',
+            'method_switches', 'failures')
+
+_STATE = {'enabled': os.environ.get(ENV_VAR, '').lower() in TRUE_STRINGS}
+_SOLVES = []
+# phase name -> dict of calls, seconds and self_seconds, in the order first seen
+_PHASES = OrderedDict()
+# seconds spent in the phases nested in each open phase
+_PHASE_STACK = []
+
+
+def enable():
+    _STATE['enabled'] = True
+
+
+def disable():
+    _STATE['enabled'] = False
+
+
+def is_enabled():
+    return _STATE['enabled']
+
+
+def reset():
+    """
+    Discards everything recorded so far
+    """
+    del _SOLVES[:]
+    _PHASES.clear()
+
+
+@contextmanager
+def phase(name):
+    """
+    Records the wall time of the enclosed block under the given phase name, if instrumentation is enabled
+    :param name: phase name
+    """
+    if not _STATE['enabled']:
+        yield
+        return
+    _PHASE_STACK.append(0.0)
+    start = timeit.default_timer()
+    try:
+        yield
+    finally:
+        seconds = timeit.default_timer() - start
+        nested = _PHASE_STACK.pop()
+        if _PHASE_STACK:
+            _PHASE_STACK[-1] += seconds
+        stats = _PHASES.setdefault(name, {'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0})
+        stats['calls'] += 1
+        stats['seconds'] += seconds
+        stats['self_seconds'] += seconds - nested
+
+
+def timed(name):
+    """
+    Decorator recording each call of the function as the given phase, if instrumentation is enabled
+    :param name: phase name
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _STATE['enabled']:
+                return func(*args, **kwargs)
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _counted(func, counts, key):
+    """
+    :return: func wrapped to add its number of calls and seconds to counts[key + '_calls'] and
+             counts[key + '_seconds']
+    """
+    if func is None:
+        return None
+    calls_key, seconds_key = key + '_calls', key + '_seconds'
+
+    def wrapper(*args):
+        start = timeit.default_timer()
+        try:
+            return func(*args)
+        finally:
+            counts[calls_key] += 1
+            counts[seconds_key] += timeit.default_timer() - start
+    return wrapper
+
+
+def _new_record(solver, func, label):
+    return {'solver': solver, 'label': label if label is not None else getattr(func, '__name__', repr(func)),
+            'seconds': 0.0, 'rhs_calls': 0, 'rhs_seconds': 0.0, 'jac_calls': 0, 'jac_seconds': 0.0}
+
+
+def odeint(func, y0, t, args=(), Dfun=None, label=None, **kwargs):
+    """
+    Drop-in replacement for scipy.integrate.odeint that, when instrumentation is enabled, records the solve:
+    its wall time, RHS and Jacobian calls and seconds, and from the infodict the number of steps (nst),
+    function evaluations (nfe, which includes those LSODA makes to estimate a Jacobian by finite differences)
+    and Jacobian evaluations (nje), the message, and the LSODA method switches. The infodict gives the method
+    in use only at each output point, so method_switches counts the output intervals in which the method
+    changed; more than one switch in an interval counts once.
+    :param func: right-hand side, with the odeint signature
+    :param y0: initial values
+    :param t: output grid
+    :param args: extra arguments for func (and Dfun)
+    :param Dfun: optional Jacobian
+    :param label: name for this solve in reports; defaults to the name of func
+    :param kwargs: other odeint keyword arguments
+    :return: as from odeint
+    """
+    from scipy import integrate
+    if not _STATE['enabled']:
+        return integrate.odeint(func, y0, t, args=tuple(args), Dfun=Dfun, **kwargs)
+
+    record = _new_record(ODEINT, func, label)
+    full_output = kwargs.pop('full_output', False)
+    with phase(ODEINT):
+        start = timeit.default_timer()
+        sol, info = integrate.odeint(_counted(func, record, 'rhs'), y0, t, args=tuple(args),
+                                     Dfun=_counted(Dfun, record, 'jac'), full_output=True, **kwargs)
+        record['seconds'] = timeit.default_timer() - start
+    mused = np.asarray(info['mused'], dtype=int)
+    if len(mused):
+        # LSODA starts with the Adams method
+        record['method_switches'] = int(np.count_nonzero(np.diff(np.concatenate(([1], mused)))))
+        record['final_method'] = LSODA_METHODS.get(int(mused[-1]))
+        for key in ('nst', 'nfe', 'nje'):
+            record[key] = int(info[key][-1])
+    else:
+        record.update(method_switches=0, final_method=None, nst=0, nfe=0, nje=0)
+    record['message'] = info['message']
+    record['failures'] = int(not info['message'].startswith('Integration successful'))
+    _SOLVES.append(record)
+    if full_output:
+        return sol, info
+    return sol
+
+
+def fsolve(func, x0, args=(), fprime=None, label=None, **kwargs):
+    """
+    Drop-in replacement for scipy.optimize.fsolve that, when instrumentation is enabled, records the solve:
+    its wall time, function and Jacobian calls and seconds, and from the infodict the evaluation counts (nfe,
+    nje) and whether it converged
+    :param func: function to find a root of, with the fsolve signature
+    :param x0: initial guess
+    :param args: extra arguments for func (and fprime)
+    :param fprime: optional Jacobian
+    :param label: name for this solve in reports; defaults to the name of func
+    :param kwargs: other fsolve keyword arguments
+    :return: as from fsolve
+    """
+    from scipy import optimize
+    if not _STATE['enabled']:
+        return optimize.fsolve(func, x0, args=args, fprime=fprime, **kwargs)
+
+    record = _new_record(FSOLVE, func, label)
+    full_output = kwargs.pop('full_output', False)
+    with phase(FSOLVE):
+        start = timeit.default_timer()
+        x, info, ier, message = optimize.fsolve(_counted(func, record, 'rhs'), x0, args=args,
+                                                fprime=_counted(fprime, record, 'jac'), full_output=True, **kwargs)
+        record['seconds'] = timeit.default_timer() - start
+    record['nfe'] = int(info['nfev'])
+    record['nje'] = int(info.get('njev', 0))
+    record['message'] = message
+    record['failures'] = int(ier != 1)
+    _SOLVES.append(record)
+    if full_output:
+        return x, info, ier, message
+    return x
+
+
+def _solver_totals(solves):
+    """
+    :return: dict from solver name to the number of solves and the sums of SUM_KEYS over them
+    """
+    totals = OrderedDict()
+    for record in solves:
+        stats = totals.setdefault(record['solver'], OrderedDict([('solves', 0)] + [(key, 0) for key in SUM_KEYS]))
+        stats['solves'] += record.get('solves', 1)
+        for key in SUM_KEYS:
+            stats[key] += record.get(key, 0)
+    return totals
+
+
+def report(label=None):
+    """
+    Everything recorded since the last reset
+    :param label: optional name for the run, e.g. the script or job
+    :return: dict with the label, the list of solve records, the phases (name -> calls, seconds and
+             self_seconds) and the totals for each solver
+    """
+    return {'label': label, 'solves': [dict(record) for record in _SOLVES],
+            'phases': OrderedDict((name, dict(stats)) for name, stats in _PHASES.items()),
+            'totals': _solver_totals(_SOLVES)}
+
+
+def aggregate(reports):
+    """
+    Combines reports, e.g. from the runs of a sweep
+    :param reports: list of dicts from report
+    :return: dict with the number of reports, the summed phases, the summed totals for each solver, and for
+             each solve label the summed totals plus the maximum seconds of any one solve
+    """
+    phases = OrderedDict()
+    by_label = OrderedDict()
+    for run_report in reports:
+        for name, stats in run_report['phases'].items():
+            total = phases.setdefault(name, {'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0})
+            for key in total:
+                total[key] += stats[key]
+        for record in run_report['solves']:
+            stats = by_label.setdefault(record['label'], {'solver': record['solver'], 'solves': 0,
+                                                          'max_seconds': 0.0})
+            stats['solves'] += 1
+            stats['max_seconds'] = max(stats['max_seconds'], record['seconds'])
+            for key in SUM_KEYS:
+                stats[key] = stats.get(key, 0) + record.get(key, 0)
+    return {'reports': len(reports), 'phases': phases, 'by_label': by_label,
+            'totals': _solver_totals(list(by_label.values()))}
+
+
+def format_report(run_report):
+    """
+    :param run_report: dict from report or aggregate
+    :return: multi-line string summarizing the phases and solves
+    """
+    lines = ['{:<32} {:>8} {:>10} {:>10}'.format('phase', 'calls', 'seconds', 'self')]
+    for name, stats in run_report['phases'].items():
+        lines.append('{:<32} {:>8} {:>10.4f} {:>10.4f}'.format(name, stats['calls'], stats['seconds'],
+                                                              stats['self_seconds']))
+    if 'by_label' in run_report:
+        rows = [(label, stats) for label, stats in run_report['by_label'].items()]
+    else:
+        rows = [(record['label'], record) for record in run_report['solves']]
+    if rows:
+        lines.append('{:<32} {:>8} {:>10} {:>10} {:>8} {:>8} {:>8} {:>8} {:>8}'.format(
+            'solve', 'solves', 'seconds', 'rhs sec', 'nst', 'nfe', 'nje', 'switch', 'failed'))
+    for label, stats in rows:
+        lines.append('{:<32} {:>8} {:>10.4f} {:>10.4f} {:>8} {:>8} {:>8} {:>8} {:>8}'.format(
+            label, stats.get('solves', 1), stats['seconds'], stats['rhs_seconds'], stats.get('nst', 0),
+            stats.get('nfe', 0), stats.get('nje', 0), stats.get('method_switches', 0), stats.get('failures', 0)))
+    return '\n'.join(lines)
@@ -0,0 +1,272 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Kinetics equations: Arrhenius temperature dependence and the kinetic theory (Maxwell-Boltzmann) functions,
+evaluated over grids in memory-bounded blocks, and an ODE Jacobian check. scipy is imported on first use, by
+the few functions that need its special functions.
+"""
+from __future__ import print_function
+import numpy as np
+from umich_che344.constants import R_KCAL, InvalidDataError
+
+__author__ = 'hbmayes'
+
+# for evaluating kinetic theory functions over large grids
+DEF_EVAL_MAX_BYTES = 64 * 1024 * 1024
+EVAL_NUM_TEMPS = 3  # temporaries the size of the output used by the eq_3_* functions
+
+
+# Kinetics equations
+
+def k_at_new_temp(k_ref, e_a, r_gas, t_ref, t_new):
+    """
+    convert using "alternate" form of Arrhenius eq
+    :param k_ref: reference rate coefficient at temp t_ref
+    :param e_a: activation energy with units consistent with given r_gas
+    :param r_gas: universal gas constant in units consistent with e_a and temps
+    :param t_ref: reference temp in K
+    :param t_new: new temp in K
+    :return: k at the "new' temperature, t_ref, in the same units as the given k_ref
+    """
+    return k_ref * np.exp((-e_a/r_gas)*(1/t_new - 1/t_ref))
+
+
+def k_from_a_ea(a, e_a, temp, r_gas):
+    """
+    convert using "alternate" form of Arrhenius eq
+    :param a: pre-exponential factor
+    :param e_a: activation energy with units consistent with given r_gas
+    :param temp: temperature in K
+    :param r_gas: universal gas constant in units consistent with e_a and temps
+    """
+    return a * np.exp(-e_a/(r_gas*temp))
+
+
+def _block_index(val, index):
+    """
+    Indexes an input that has been reshaped to the full broadcast rank, keeping its length-one (broadcast) axes
+    :param val: input array with the same number of dimensions as the broadcast shape
+    :param index: tuple of integers for the leading axes, then a slice of the split axis
+    :return: the part of val that broadcasts against out[index]
+    """
+    return val[tuple(idx if size > 1 else (0 if isinstance(idx, int) else slice(None))
+                     for idx, size in zip(index, val.shape))]
+
+
+def _chunked_eval(kernel, inputs, args=(), out=None, max_bytes=None):
+    """
+    Evaluates an elementwise kernel(*inputs, *args, out=block) over the broadcast shape of the inputs, in blocks
+    of at most max_bytes / EVAL_NUM_TEMPS elements: the grid is split along the last axis whose trailing
+    sub-array is too large for one block, looping over the axes before it, so a few long rows (e.g. temps[:, None]
+    against a long energy grid) are split too
+    :param kernel: function that writes its result into "out"
+    :param inputs: arrays (or scalars) that broadcast together
+    :param args: other arguments for the kernel
+    :param out: optional array with the broadcast shape for the result
+    :param max_bytes: approximate memory limit for the kernel's temporaries (not counting "out" or the inputs);
+                      None for no limit
+    :return: the filled "out" array (a NumPy scalar for scalar inputs)
+    """
+    inputs = [np.asarray(val, dtype=float) for val in inputs]
+    shape = np.broadcast(*inputs).shape
+    if out is None:
+        out = np.empty(shape)
+    elif out.shape != shape:
+        raise InvalidDataError("Expected 'out' with shape {} but found {}".format(shape, out.shape))
+    args = list(args)
+    block_size = out.size
+    if max_bytes:
+        block_size = max(1, int(max_bytes // (out.itemsize * EVAL_NUM_TEMPS)))
+    if out.size <= block_size:
+        kernel(*(inputs + args), out=out)
+        return out[()] if out.ndim == 0 else out
+    inputs = [val.reshape((1,) * (len(shape) - val.ndim) + val.shape) for val in inputs]
+    # find the axis to split: everything after it fits in one block
+    axis = len(shape) - 1
+    trailing_size = 1
+    while axis > 0 and trailing_size * shape[axis] <= block_size:
+        trailing_size *= shape[axis]
+        axis -= 1
+    step = max(1, block_size // trailing_size)
+    for lead in np.ndindex(*shape[:axis]):
+        for start in range(0, shape[axis], step):
+            index = lead + (slice(start, start + step),)
+            kernel(*([_block_index(val, index) for val in inputs] + args), out=out[index])
+    return out
+
+
+def _log_eq_3_20_kernel(energy, temp, gas_const, out):
+    with np.errstate(divide='ignore'):
+        np.log(energy, out=out)
+    out *= 0.5
+    out -= energy / (gas_const * temp)
+    out += np.log(2.0 * np.pi) - 1.5 * np.log(np.pi * gas_const * temp)
+
+
+def _eq_3_20_kernel(energy, temp, gas_const, out):
+    _log_eq_3_20_kernel(energy, temp, gas_const, out)
+    np.exp(out, out=out)
+
+
+def _log_eq_3_23_kernel(temp, ea, gas_const, out):
+    gamma = ea / (gas_const * temp)
+    with np.errstate(divide='ignore'):
+        np.log(4.0 / np.pi * gamma, out=out)
+    out *= 0.5
+    out -= gamma
+
+
+def _eq_3_23_kernel(temp, ea, gas_const, out):
+    _log_eq_3_23_kernel(temp, ea, gas_const, out)
+    np.exp(out, out=out)
+
+
+def _log_eq_3_20integrated_kernel(temp, ea, gas_const, out):
+    from scipy import special
+    # erfc(sqrt(gamma)) = erfcx(sqrt(gamma)) * exp(-gamma), so exp(-gamma) factors out of both terms
+    gamma = ea / (gas_const * temp)
+    root_gamma = np.sqrt(gamma)
+    np.log(2.0 / np.sqrt(np.pi) * root_gamma + special.erfcx(root_gamma), out=out)
+    out -= gamma
+
+
+def _eq_3_20integrated_kernel(temp, ea, gas_const, out):
+    _log_eq_3_20integrated_kernel(temp, ea, gas_const, out)
+    np.exp(out, out=out)
+
+
+def eq_3_20(energy, temp, gas_const=R_KCAL, out=None, max_bytes=DEF_EVAL_MAX_BYTES):
+    """
+    fraction of moles with energy specified at temperature specified
+    Evaluated as exp(log_eq_3_20), for any energy and temp arrays that broadcast together, e.g. temps[:, None]
+    with a 1D energy grid for a [temperatures, energies] table
+    :param energy: energy in kcal/mol unless other gas constant used
+    :param temp: temperature in K
+    :param gas_const: universal gas contanst in correct units (default is Kcal/mol)
+    :param out: optional array with the broadcast shape for the result
+    :param max_bytes: approximate memory limit for temporaries; larger grids are evaluated in blocks
+    :return fraction
+    """
+    return _chunked_eval(_eq_3_20_kernel, (energy, temp), (gas_const,), out=out, max_bytes=max_bytes)
+
+
+def log_eq_3_20(energy, temp, gas_const=R_KCAL, out=None, max_bytes=DEF_EVAL_MAX_BYTES):
+    """
+    natural log of eq_3_20, which stays finite where the fraction itself underflows to zero (low temperatures,
+    high energies); -inf at zero energy
+    :param energy: energy in kcal/mol unless other gas constant used
+    :param temp: temperature in K
+    :param gas_const: universal gas contanst in correct units (default is Kcal/mol)
+    :param out: optional array with the broadcast shape for the result
+    :param max_bytes: approximate memory limit for temporaries; larger grids are evaluated in blocks
+    :return ln(fraction)
+    """
+    return _chunked_eval(_log_eq_3_20_kernel, (energy, temp), (gas_const,), out=out, max_bytes=max_bytes)
+
+
+def eq_3_23(temp, ea, gas_const=R_KCAL, out=None, max_bytes=DEF_EVAL_MAX_BYTES):
+    """
+    fraction of moles with energy specified at temperature specified
+    :param temp: temperature in K
+    :param ea: activation energy in kcal/mol unless other gas constant used
+    :param gas_const: universal gas constant in correct units (default is Kcal/mol)
+    :param out: optional array with the broadcast shape of temp and ea for the result
+    :param max_bytes: approximate memory limit for temporaries; larger grids are evaluated in blocks
+    :return fraction
+    """
+    return _chunked_eval(_eq_3_23_kernel, (temp, ea), (gas_const,), out=out, max_bytes=max_bytes)
+
+
+def log_eq_3_23(temp, ea, gas_const=R_KCAL, out=None, max_bytes=DEF_EVAL_MAX_BYTES):
+    """
+    natural log of eq_3_23
+    :param temp: temperature in K
+    :param ea: activation energy in kcal/mol unless other gas constant used
+    :param gas_const: universal gas constant in correct units (default is Kcal/mol)
+    :param out: optional array with the broadcast shape of temp and ea for the result
+    :param max_bytes: approximate memory limit for temporaries; larger grids are evaluated in blocks
+    :return ln(fraction)
+    """
+    return _chunked_eval(_log_eq_3_23_kernel, (temp, ea), (gas_const,), out=out, max_bytes=max_bytes)
+
+
+def eq_3_20integrated(temp, ea, gas_const=R_KCAL, out=None, max_bytes=DEF_EVAL_MAX_BYTES):
+    """
+    fraction of moles with energy specified at temperature specified
+    :param temp: temperature in K
+    :param ea: activation energy in kcal/mol unless other gas constant used
+    :param gas_const: universal gas constant in correct units (default is Kcal/mol)
+    :param out: optional array with the broadcast shape of temp and ea for the result
+    :param max_bytes: approximate memory limit for temporaries; larger grids are evaluated in blocks
+    :return fraction
+    """
+    return _chunked_eval(_eq_3_20integrated_kernel, (temp, ea), (gas_const,), out=out, max_bytes=max_bytes)
+
+
+def log_eq_3_20integrated(temp, ea, gas_const=R_KCAL, out=None, max_bytes=DEF_EVAL_MAX_BYTES):
+    """
+    natural log of eq_3_20integrated, finite even where the fraction underflows
+    :param temp: temperature in K
+    :param ea: activation energy in kcal/mol unless other gas constant used
+    :param gas_const: universal gas constant in correct units (default is Kcal/mol)
+    :param out: optional array with the broadcast shape of temp and ea for the result
+    :param max_bytes: approximate memory limit for temporaries; larger grids are evaluated in blocks
+    :return ln(fraction)
+    """
+    return _chunked_eval(_log_eq_3_20integrated_kernel, (temp, ea), (gas_const,), out=out, max_bytes=max_bytes)
+
+
+def mb_energy_cdf(energy, temp, gas_const=R_KCAL):
+    """
+    fraction of moles with energy below that specified at temperature specified: the integral of eq_3_20 from 0,
+    which is the regularized lower incomplete gamma function P(3/2, E/RT)
+    :param energy: energy in kcal/mol unless other gas constant used
+    :param temp: temperature in K
+    :param gas_const: universal gas constant in correct units (default is Kcal/mol)
+    :return fraction
+    """
+    from scipy import special
+    return special.gammainc(1.5, np.asarray(energy, dtype=float) / (gas_const * np.asarray(temp, dtype=float)))
+
+
+def mb_energy_fraction(e_low, e_high, temp, gas_const=R_KCAL):
+    """
+    exact fraction of moles with energy between e_low and e_high at temperature specified, for any arrays that
+    broadcast together; e_high may be np.inf for an upper tail, as from eq_3_20integrated
+    :param e_low: lower energy of the window in kcal/mol unless other gas constant used
+    :param e_high: upper energy of the window
+    :param temp: temperature in K
+    :param gas_const: universal gas constant in correct units (default is Kcal/mol)
+    :return fraction
+    """
+    rt = gas_const * np.asarray(temp, dtype=float)
+    gamma_low = np.asarray(e_low, dtype=float) / rt
+    gamma_high = np.asarray(e_high, dtype=float) / rt
+    # above the mean energy (3/2 RT), the difference of upper tails (Q) keeps its precision; below it, use P
+    from scipy import special
+    return np.where(gamma_low > 1.5, special.gammaincc(1.5, gamma_low) - special.gammaincc(1.5, gamma_high),
+                    special.gammainc(1.5, gamma_high) - special.gammainc(1.5, gamma_low))
+
+
+# ODE helpers
+
+def numerical_jacobian(func, y, t, args=(), eps=1e-7):
+    """
+    Central finite-difference Jacobian of an odeint-style right-hand side, for checking analytical Jacobians
+    :param func: function with the odeint signature func(y, t, *args)
+    :param y: state vector at which to evaluate the Jacobian
+    :param t: independent variable value
+    :param args: extra arguments for func
+    :param eps: relative step size
+    :return: [len(y), len(y)] array of d func_i / d y_j
+    """
+    y = np.array(y, dtype=float, ndmin=1)
+    jac = np.empty((len(y), len(y)))
+    for j in range(len(y)):
+        step = eps * max(1.0, abs(y[j]))
+        y_plus = y.copy()
+        y_minus = y.copy()
+        y_plus[j] += step
+        y_minus[j] -= step
+        jac[:, j] = (np.asarray(func(y_plus, t, *args)) - np.asarray(func(y_minus, t, *args))) / (2.0 * step)
+    return jac
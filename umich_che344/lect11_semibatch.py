@@ -9,8 +9,9 @@ references:
 from __future__ import print_function
 import sys
 import numpy as np
-from scipy.integrate import odeint
 from common import make_fig, GOOD_RET
+from umich_che344.ode_cache import cached_odeint
+from umich_che344.instrument import odeint
 
 
 __author__ = 'hbmayes'
@@ -19,13 +20,21 @@ A = '_a'
 B = '_b'
 C = '_c'
 
+K_RXN = 2.2  # L/mol-s, rate coefficient for A + B --> C + D
+VOL_TARGET = 15.0  # L, volume at which the parts are compared
+N_STATES = 4  # na, nb, nc, nd
+# half-bandwidths of the stacked Jacobian: each case's rates depend only on its own na and nb
+ML = N_STATES - 1
+MU = 1
+SWEEP_PARAM_NAMES = ('vol_0', 'ca_0', 'cb_0', 'ca_in', 'nu_in', 'k_rxn')
 
-def sys_odes_ca(y_vector, time, vol_0, nu_in, ca_in):
+
+def sys_odes_ca(y_vector, time, vol_0, nu_in, ca_in, k_rxn=K_RXN):
     # put here any equations you need to calculate the differential equations (R.H.S.s of dy/dW)
     ca, cb, cc, cd = y_vector
 
     vol = vol_0 + nu_in * time
-    r = 2.2 * ca * cb
+    r = k_rxn * ca * cb
     dca_dt = nu_in * (ca_in - ca) / vol - r
     dcb_dt = - nu_in * cb / vol - r
     dcc_dt = - nu_in * cc / vol + r
@@ -34,14 +43,14 @@ def sys_odes_ca(y_vector, time, vol_0, nu_in, ca_in):
     return [dca_dt, dcb_dt, dcc_dt, dcd_dt]
 
 
-def sys_odes_na(y_vector, time, vol_0, nu_in, ca_in):
+def sys_odes_na(y_vector, time, vol_0, nu_in, ca_in, k_rxn=K_RXN):
     # put here any equations you need to calculate the differential equations (R.H.S.s of dy/dW)
     na, nb, nc, nd = y_vector
 
     vol = vol_0 + nu_in * time
     ca = na/vol
     cb = nb/vol
-    r = 2.2 * ca * cb
+    r = k_rxn * ca * cb
     fa_in = ca_in * nu_in  # mol/L * L/s = mol/s, good!
     dna_dt = fa_in - r * vol
     dnb_dt = -r * vol
@@ -51,83 +60,260 @@ def sys_odes_na(y_vector, time, vol_0, nu_in, ca_in):
     return [dna_dt, dnb_dt, dnc_dt, dnd_dt]
 
 
+# noinspection PyUnusedLocal
+def jac_ca(y_vector, time, vol_0, nu_in, ca_in, k_rxn=K_RXN):
+    """
+    Analytical Jacobian of sys_odes_ca, for use as the odeint "Dfun"
+    :return: [4, 4] array of d(dc_i/dt) / dc_j
+    """
+    ca, cb, cc, cd = y_vector
+    dilution = nu_in / (vol_0 + nu_in * time)
+    dr_dca = k_rxn * cb
+    dr_dcb = k_rxn * ca
+    return np.array([[-dilution - dr_dca, -dr_dcb, 0., 0.],
+                     [-dr_dca, -dilution - dr_dcb, 0., 0.],
+                     [dr_dca, dr_dcb, -dilution, 0.],
+                     [dr_dca, dr_dcb, 0., -dilution]])
+
+
+def jac_na(y_vector, time, vol_0, nu_in, ca_in, k_rxn=K_RXN):
+    """
+    Analytical Jacobian of sys_odes_na, for use as the odeint "Dfun"
+    :return: [4, 4] array of d(dn_i/dt) / dn_j
+    """
+    return jac_na_vec(np.asarray(y_vector, dtype=float).reshape(N_STATES, 1),
+                      time, vol_0, nu_in, ca_in, k_rxn)[:, :, 0]
+
+
+def sys_odes_na_vec(n_matrix, time, vol_0, nu_in, ca_in, k_rxn=K_RXN, out=None):
+    """
+    Vectorized form of sys_odes_na that evaluates many reactors in one call
+    :param n_matrix: moles with shape [n_states, n_cases], rows in the order na, nb, nc, nd
+    :param time: time, s
+    :param vol_0: initial volume, L; scalar or array of length n_cases (same for the other parameters)
+    :param nu_in: feed volumetric flow rate, L/s
+    :param ca_in: concentration of A in the feed, mol/L
+    :param k_rxn: rate coefficient, L/mol-s
+    :param out: optional array with shape [n_states, n_cases] to hold the result
+    :return: dn_dt with shape [n_states, n_cases]
+    """
+    na, nb = n_matrix[0], n_matrix[1]
+    # r * vol = k_rxn * na * nb / vol
+    rv = k_rxn * na * nb / (vol_0 + nu_in * time)
+    if out is None:
+        out = np.empty(np.shape(n_matrix))
+    out[0] = ca_in * nu_in - rv
+    out[1] = -rv
+    out[2] = rv
+    out[3] = rv
+    return out
+
+
+# noinspection PyUnusedLocal
+def jac_na_vec(n_matrix, time, vol_0, nu_in, ca_in, k_rxn=K_RXN):
+    """
+    Analytical Jacobian of sys_odes_na_vec for every case at once
+    Parameters are as for sys_odes_na_vec
+    :return: Jacobians with shape [n_states, n_states, n_cases]; only the na and nb columns are nonzero
+    """
+    na, nb = n_matrix[0], n_matrix[1]
+    vol = vol_0 + nu_in * time
+    drv_dn = (k_rxn * nb / vol, k_rxn * na / vol)
+    jac = np.zeros((N_STATES, N_STATES) + np.shape(na))
+    for j in range(2):
+        jac[0, j] = -drv_dn[j]
+        jac[1, j] = -drv_dn[j]
+        jac[2, j] = drv_dn[j]
+        jac[3, j] = drv_dn[j]
+    return jac
+
+
+def _sys_odes_na_flat(n_flat, time, n_cases, vol_0, nu_in, ca_in, k_rxn, out):
+    """
+    Adapter so odeint can integrate sys_odes_na_vec. The flat state vector is stored case by case
+    (na, nb, nc, nd for case 0, then case 1, ...), so the Jacobian is block diagonal. Within a block only the
+    na and nb columns are nonzero, so the bandwidths are ML below and MU above the diagonal.
+    """
+    sys_odes_na_vec(n_flat.reshape(n_cases, N_STATES).T, time, vol_0, nu_in, ca_in, k_rxn, out=out.T)
+    return out.ravel()
+
+
+def _jac_na_flat(n_flat, time, n_cases, vol_0, nu_in, ca_in, k_rxn, out):
+    """
+    Banded Jacobian of _sys_odes_na_flat in the layout odeint expects when ml and mu are given:
+    band[i - j + MU, j] holds d f_i / d n_j
+    """
+    jac = jac_na_vec(n_flat.reshape(n_cases, N_STATES).T, time, vol_0, nu_in, ca_in, k_rxn)
+    band = np.zeros((ML + MU + 1, n_cases * N_STATES))
+    for i in range(N_STATES):
+        for j in range(2):
+            band[i - j + MU, j::N_STATES] = jac[i, j]
+    return band
+
+
+def solve_semibatch_sweep(vol_0, ca_0, cb_0, ca_in, nu_in, time, k_rxn=K_RXN, chunk_size=None, rtol=None,
+                          atol=None, use_jac=True, store=None):
+    """
+    Integrates the mole balances of many semibatch (or, with nu_in = 0, batch) reactors at once, stacked into
+    one block-diagonal system with a single odeint call per chunk
+    :param vol_0: initial volume(s), L; all parameters are broadcast against each other
+    :param ca_0: initial concentration(s) of A, mol/L
+    :param cb_0: initial concentration(s) of B, mol/L
+    :param ca_in: concentration(s) of A in the feed, mol/L
+    :param nu_in: feed volumetric flow rate(s), L/s
+    :param time: times at which to report the solution, s
+    :param k_rxn: rate coefficient(s), L/mol-s
+    :param chunk_size: maximum number of cases per integrator call (default: all cases in one call). All
+                       cases in a call share step sizes, so chunking keeps one stiff case from slowing the rest
+    :param rtol: relative tolerance passed to odeint
+    :param atol: absolute tolerance passed to odeint
+    :param use_jac: flag to pass the analytical banded Jacobian to odeint instead of finite differences
+    :param store: optional traj_store.TrajectoryStore; if given, each chunk of solutions is appended to it (with
+                  its parameters) as soon as it is solved instead of being kept in memory
+    :return: moles with shape [n_cases, len(time), n_states], or the list of case ids in the store
+    """
+    params = np.broadcast_arrays(*[np.atleast_1d(np.asarray(param, dtype=float))
+                                   for param in (vol_0, ca_0, cb_0, ca_in, nu_in, k_rxn)])
+    n_cases = len(params[0])
+    vol_0, ca_0, cb_0 = params[:3]
+    n_0 = np.zeros((n_cases, N_STATES))
+    n_0[:, 0] = ca_0 * vol_0
+    n_0[:, 1] = cb_0 * vol_0
+    if chunk_size is None:
+        chunk_size = n_cases
+
+    if store is None:
+        result = np.empty((n_cases, len(time), N_STATES))
+    else:
+        result = []
+    for start in range(0, n_cases, chunk_size):
+        end = min(start + chunk_size, n_cases)
+        num = end - start
+        # sys_odes_na_vec parameter order: vol_0, nu_in, ca_in, k_rxn
+        args = tuple(params[col][start:end] for col in (0, 4, 3, 5))
+        sol = odeint(_sys_odes_na_flat, n_0[start:end].ravel(), time,
+                     args=(num,) + args + (np.empty((num, N_STATES)),),
+                     Dfun=_jac_na_flat if use_jac else None, ml=ML, mu=MU, rtol=rtol, atol=atol)
+        sol = sol.reshape(len(time), num, N_STATES).transpose(1, 0, 2)
+        if store is None:
+            result[start:end] = sol
+        else:
+            case_params = [dict(zip(SWEEP_PARAM_NAMES, [param[start + case_id] for param in params]))
+                           for case_id in range(num)]
+            result.extend(store.append(sol, case_params))
+    return result
+
+
+def semibatch_model(vol_0=5.0, ca_0=0.0, cb_0=0.05, ca_in=0.025, nu_in=0.05, k_rxn=K_RXN, t_max=400.0,
+                    num_points=1001, vol_target=VOL_TARGET):
+    """
+    Moles, concentrations and conversion of B over time in a semibatch reactor fed A (A + B --> C + D);
+    with nu_in = 0 it is a batch reactor
+    :param vol_0: initial volume, L
+    :param ca_0: initial concentration of A, mol/L
+    :param cb_0: initial concentration of B, mol/L
+    :param ca_in: concentration of A in the feed, mol/L
+    :param nu_in: feed volumetric flow rate, L/s
+    :param k_rxn: rate coefficient, L/mol-s
+    :param t_max: final time, s
+    :param num_points: number of output times
+    :param vol_target: volume at which to report the time and conversion of B, if it is reached by t_max
+    :return: dict with the time, vol, n_a to n_d, c_a to c_d and x_b arrays, and t_target and xb_target (None
+             if the reactor does not reach vol_target); x_b and xb_target are None if cb_0 is zero
+    """
+    time = np.linspace(0.0, t_max, num_points)
+    vol = vol_0 + nu_in * time
+    args = (vol_0, nu_in, ca_in, k_rxn)
+    na_initial_all = [ca_0 * vol_0, cb_0 * vol_0, 0., 0.]
+    t_target = None
+    solve_times = time
+    if nu_in > 0 and vol_0 < vol_target <= vol[-1]:
+        # the volume grows linearly, so the time the reactor holds the target volume is known; also report there
+        t_target = (vol_target - vol_0) / nu_in
+        solve_times = np.union1d(time, [t_target])
+    sol = cached_odeint(sys_odes_na, na_initial_all, solve_times, args=args, Dfun=jac_na)
+    result = {'time': time, 'vol': vol, 't_target': t_target, 'xb_target': None, 'x_b': None}
+    time_ids = np.searchsorted(solve_times, time)
+    for col, species in enumerate('abcd'):
+        result['n_' + species] = sol[time_ids, col]
+        result['c_' + species] = result['n_' + species] / vol
+    nb_0 = na_initial_all[1]
+    # the conversion of B is undefined without initial B
+    if nb_0 > 0:
+        result['x_b'] = (nb_0 - result['n_b']) / nb_0
+        if t_target is not None:
+            result['xb_target'] = (nb_0 - sol[np.searchsorted(solve_times, t_target), 1]) / nb_0
+    return result
+
+
 # noinspection PyTypeChecker
-def solve_original_semibatch():
-    # initial values
-    xb_parts = []
+def solve_original_semibatch(validate=False):
+    """
+    Solves the three parts of the problem as one stacked system and plots their concentrations and conversions
+    :param validate: flag to also solve part A with the concentration balances (sys_odes_ca) and plot them, to
+                     show that both forms yield the same solution
+    """
     name = 'lect_11_semibatch'
+    parts = [A, B, C]
+    # part A: the original semibatch; part B: batch with the same moles in the target volume; part C: semibatch
+    # with more concentrated A fed to less concentrated B
+    vol_0 = np.array([5., 15., 10.])  # L
+    ca_0 = np.array([0.0, 0.25 / 15., 0.0])  # mol/L
+    cb_0 = np.array([0.05, 0.25 / 15., 0.025])  # mol/L
+    ca_in = np.array([0.025, 0.0, 0.05])  # mol/L
+    nu_in = np.array([0.05, 0.0, 0.05])  # L/s
 
     # Give an initial independent variable through a final one. We don't know the final needed yet; if we guess
     # too small and we don't get the conversion we want, we can always increase it and run the program again
     t_min = 0
     t_max = 400.0
     time = np.linspace(t_min, t_max, 1001)
-    for part_id, part in enumerate([A, B, C]):
-        if part == A:
-            vol_0 = 5.  # L
-            cb_0 = 0.05  # mol/L
-            ca_0 = 0.0
-            ca_in = 0.025  # mol/L
-            nu_in = 0.05  # L/s
-        elif part == B:
-            vol_0 = 15.  # vol in L
-            na_0 = 0.25  # mol
-            nb_0 = 0.25  # mol
-            ca_0 = na_0 / vol_0
-            cb_0 = nb_0 / vol_0
-            nu_in = 0.0
-            ca_in = 0.0
+    # the volume grows linearly, so each semibatch reaches the target volume at a known time; the batch is
+    # compared at the time the semibatch before it reached the target volume
+    t_targets = []
+    for part_id in range(len(parts)):
+        if nu_in[part_id] > 0:
+            t_targets.append((VOL_TARGET - vol_0[part_id]) / nu_in[part_id])
         else:
-            vol_0 = 10.  # L
-            cb_0 = 0.025  # mol/L
-            ca_0 = 0.0
-            ca_in = 0.05  # mol/L
-            nu_in = 0.05  # L/s
+            t_targets.append(t_targets[-1])
+    # report at the plotting times and at the target times, all in one integration
+    solve_times = np.union1d(time, t_targets)
+    plot_ids = np.searchsorted(solve_times, time)
+    moles = solve_semibatch_sweep(vol_0, ca_0, cb_0, ca_in, nu_in, solve_times)
 
-        if part == A:
+    xb_parts = []
+    for part_id, part in enumerate(parts):
+        if validate and part == A:
             # show that both methods yield the same solution
-            c_initial_all = [ca_0, cb_0, 0., 0.]
-
-            # def sys_odes_ca(y_vector, time, vol_0, nu_in, ca_in):
-            sol = odeint(sys_odes_ca, c_initial_all, time, args=(vol_0, nu_in, ca_in))
-            ca = sol[:, 0]
-            cb = sol[:, 1]
-            cc = sol[:, 2]
-            cd = sol[:, 3]
-
-            make_fig(name+"_ca"+part, time, ca, y1_label="$C_A$", y2_array=cb, y2_label="$C_B$",
-                     y3_array=cc, y3_label="$C_C$", y4_array=cd, y4_label="$C_D$", x_label="time (s)",
-                     y_label="concentration (mol/L)",
+            c_initial_all = [ca_0[part_id], cb_0[part_id], 0., 0.]
+            sol = cached_odeint(sys_odes_ca, c_initial_all, time,
+                                args=(vol_0[part_id], nu_in[part_id], ca_in[part_id], K_RXN), Dfun=jac_ca)
+            make_fig(name+"_ca"+part, time, sol[:, 0], y1_label="$C_A$", y2_array=sol[:, 1], y2_label="$C_B$",
+                     y3_array=sol[:, 2], y3_label="$C_C$", y4_array=sol[:, 3], y4_label="$C_D$",
+                     x_label="time (s)", y_label="concentration (mol/L)",
                      x_lima=t_min, x_limb=t_max, y_lima=0.0, y_limb=1.0,
                      )
 
-        # def sys_odes_na(y_vector, time, vol_0, nu_in, ca_in):
-        na_0 = ca_0 * vol_0
-        nb_0 = cb_0 * vol_0
-        na_initial_all = [na_0, nb_0, 0., 0.]
-        sol = odeint(sys_odes_na, na_initial_all, time, args=(vol_0, nu_in, ca_in))
-        na = sol[:, 0]
-        nb = sol[:, 1]
-        nc = sol[:, 2]
-        nd = sol[:, 3]
-
-        vol = vol_0 + nu_in * time
-        ca = na / vol
-        cb = nb / vol
-        cc = nc / vol
-        cd = nd / vol
-
-        make_fig(name+"_na"+part, time, ca, y1_label="$C_A$", y2_array=cb, y2_label="$C_B$",
-                 y3_array=cc, y3_label="$C_C$", y4_array=cd, y4_label="$C_D$", x_label="time (s)",
+        part_moles = moles[part_id]
+        conc = part_moles[plot_ids] / (vol_0[part_id] + nu_in[part_id] * time)[:, np.newaxis]
+        make_fig(name+"_na"+part, time, conc[:, 0], y1_label="$C_A$", y2_array=conc[:, 1], y2_label="$C_B$",
+                 y3_array=conc[:, 2], y3_label="$C_C$", y4_array=conc[:, 3], y4_label="$C_D$", x_label="time (s)",
                  y_label="concentration (mol/L)",
                  x_lima=t_min, x_limb=t_max, y_lima=0.0, y_limb=1.00
                  )
 
+        na_0 = ca_0[part_id] * vol_0[part_id]
+        nb_0 = cb_0[part_id] * vol_0[part_id]
         print("Part {}, na_in = {:.2f} moles, nb_in = {:.2f}".format(part, na_0, nb_0))
-        xb_parts.append((nb_0 - nb) / nb_0)
-        vol_15_index = np.nonzero(np.abs(vol-15.0)<0.000001)
-        print("   time at s the conversion of B at V = 15 L, which corresponds to time = {} s, "
-              "and X_B = {:.2f}".format(time[vol_15_index], xb_parts[part_id][500]))
+        x_b = (nb_0 - part_moles[:, 1]) / nb_0
+        xb_parts.append(x_b[plot_ids])
+        t_target = t_targets[part_id]
+        xb_target = x_b[np.searchsorted(solve_times, t_target)]
+        if nu_in[part_id] > 0:
+            print("   V = {:.0f} L at time = {:.1f} s, where X_B = {:.2f}".format(VOL_TARGET, t_target, xb_target))
+        else:
+            print("   V = {:.0f} L throughout; at time = {:.1f} s, X_B = {:.2f}".format(vol_0[part_id], t_target,
+                                                                                      xb_target))
 
     make_fig(name+"_x", time, xb_parts[0], y1_label="$X_B$ original semibatch, $C_{B0} > C_{A_{in}}$",
              y2_array=xb_parts[1], y2_label="$X_B$ batch", color2="red",
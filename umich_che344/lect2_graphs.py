@@ -7,11 +7,14 @@ from __future__ import print_function
 
 import sys
 import numpy as np
-from scipy import interpolate
 from common import make_fig, GOOD_RET
+from rate_data import RateDataModel, SPLINE_CUBIC, SPLINE_QUADRATIC
 
 __author__ = 'hbmayes'
 
+# independent figure functions, for make_all_figs
+FIGURE_JOBS = ('graph_alg_eq', 'graph_points', 'graph_smooth_from_pts')
+
 
 def graph_alg_eq():
     """
@@ -47,10 +50,9 @@ def graph_points():
     design_eq = np.divide(2.0, ra)
     print("Generic example design equation points: {}".format(["{:0.1f}".format(x) for x in design_eq]))
 
-    # cubic spline
+    # quadratic spline
     x_new = np.linspace(0.0, 0.8, 101)
-    # alternately, from interpolation
-    y_interp = interpolate.interp1d(x, design_eq, kind='quadratic')
+    y_interp = RateDataModel(x, design_eq, kind=SPLINE_QUADRATIC)
     make_fig(fig_name, x, design_eq, ls1='o', x2_array=x_new, y2_array=y_interp(x_new),
              x_label=r'conversion (X, unitless)', y_label=r'$\displaystyle\frac{F_{A0}}{-r_A} \left(L\right)$',
              x_lima=0.0, x_limb=0.8, y_lima=0.0, y_limb=1000,
@@ -72,14 +74,15 @@ def graph_smooth_from_pts():
     print("Isom example design equation points: {}".format(design_eq))
 
     # cubic spline
-    tck = interpolate.splrep(x, design_eq, s=0)
+    cubic_interp = RateDataModel(x, design_eq, kind=SPLINE_CUBIC, extrapolate=True)
     x_new = np.linspace(0.0, 0.7, 101)
-    y_new = interpolate.splev(x_new, tck, der=0)
-    # alternately, from interpolation
-    cubic_interp = interpolate.interp1d(x, design_eq, kind='quadratic', fill_value="extrapolate")
-    make_fig(fig_name, x, design_eq, ls1='o', x2_array=x_new, y2_array=y_new,
-             x3_array=x_new, y3_array=cubic_interp(x_new),
-             y1_label="data", y2_label="quadratic", y3_label="cubic",
+    # alternately, a quadratic spline
+    quad_interp = RateDataModel(x, design_eq, kind=SPLINE_QUADRATIC, extrapolate=True)
+    print("PFR volume to reach X = 0.6 (area under the cubic spline): {:.3f} m^3".format(
+        cubic_interp.pfr_volume(0.6)))
+    make_fig(fig_name, x, design_eq, ls1='o', x2_array=x_new, y2_array=cubic_interp(x_new),
+             x3_array=x_new, y3_array=quad_interp(x_new),
+             y1_label="data", y2_label="cubic", y3_label="quadratic",
              x_label=r'conversion (X, unitless)', y_label=r'$\displaystyle\frac{F_{A0}}{-r_A} \left(m^3\right)$',
              x_lima=0.0, x_limb=0.7, y_lima=0.0, y_limb=2.5,
              )
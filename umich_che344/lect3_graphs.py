@@ -7,10 +7,13 @@ from __future__ import print_function
 
 import sys
 import numpy as np
-from common import make_fig, GOOD_RET, eq_3_20, eq_3_23, eq_3_20integrated
+from common import make_fig, GOOD_RET, eq_3_20, eq_3_23, eq_3_20integrated, mb_energy_fraction
 
 __author__ = 'hbmayes'
 
+# independent figure functions, for make_all_figs
+FIGURE_JOBS = ('graph_alg_eq', 'graph_int')
+
 
 def graph_alg_eq():
     """
@@ -26,10 +29,8 @@ def graph_alg_eq():
 
     temps = [300.0, 450.0, 600.0, 750.0, 1000.0]
 
-    # y-axis
-    frac_e = []
-    for temp in temps:
-        frac_e.append(eq_3_20(energy_range, temp))
+    # y-axis; one row per temperature
+    frac_e = eq_3_20(energy_range, np.array(temps)[:, None])
 
     make_fig(fig_name, energy_range, frac_e[0], y1_label=str(temps[0]),
              y2_array=frac_e[1], y2_label=str(temps[1]),
@@ -44,8 +45,10 @@ def graph_alg_eq():
 
 
     x_fill = np.linspace(4.0, 60.0)
-    y_fill = eq_3_20(x_fill, 600.0)
-    y2_fill = eq_3_20(x_fill, 1000.0)
+    y_fill, y2_fill = eq_3_20(x_fill, np.array([[600.0], [1000.0]]))
+    # the shaded areas, exactly
+    for temp, frac in zip([600.0, 1000.0], mb_energy_fraction(x_fill[0], x_fill[-1], np.array([600.0, 1000.0]))):
+        print("At {} K, fraction with {} < E < {} kcal/mol: {:.4f}".format(temp, x_fill[0], x_fill[-1], frac))
     make_fig(fig_name + "fill", energy_range, frac_e[2], y1_label=str(temps[2]), color1="green",
              y2_array=frac_e[4], y2_label=str(temps[4]), color2="purple",
              x_label=r'energy (kcal/mol)', y_label='fraction with E at temp in K',
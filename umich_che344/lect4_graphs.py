@@ -7,9 +7,9 @@ from __future__ import print_function
 
 import sys
 import numpy as np
-from scipy.integrate import odeint
-from scipy.optimize import fsolve
+from umich_che344.instrument import odeint
 from common import make_fig, GOOD_RET
+from vec_solvers import x_eq_2a_to_b
 
 __author__ = 'hbmayes'
 
@@ -26,24 +26,47 @@ def ode(y, t, k, k_c, cao):
     return 2.0 * k * (cao * np.square(1.0-y) - y * 0.5 / k_c)
 
 
+# noinspection PyUnusedLocal
+def ode_jac(y, t, k, k_c, cao):
+    """
+    Analytical derivative of "ode" with respect to y, shaped [1, 1] for use as the odeint "Dfun"
+    Parameters are as for "ode"
+    :return: d(dy_dt)/dy
+    """
+    return np.reshape(2.0 * k * (-2.0 * cao * (1.0-y) - 0.5 / k_c), (1, 1))
+
+
+def batch_model(k=0.2, k_c=20.0, cao=0.2, x0=0.0, t_end=60.0, num_points=1001):
+    """
+    Conversion and concentrations over time in a constant-volume batch reactor for 2A <--> B
+    :param k: rate coefficient, L/mol s
+    :param k_c: equilibrium coefficient, L/mol
+    :param cao: initial concentration of A, mol/L
+    :param x0: initial conversion
+    :param t_end: final time, s
+    :param num_points: number of output times
+    :return: dict with the time, conversion, c_a and c_b arrays and the equilibrium conversion x_eq
+    """
+    time = np.linspace(0.0, t_end, num_points)  # seconds
+    conv = odeint(ode, x0, time, args=(k, k_c, cao), Dfun=ode_jac)[:, 0]
+    # the rate is quadratic in X, so the equilibrium conversion (where it is zero) has a closed form
+    x_eq = x_eq_2a_to_b(k_c, cao, gas=False)
+    return {'time': time, 'conversion': conv, 'c_a': cao * (1.0 - conv), 'c_b': cao * conv * 0.5, 'x_eq': x_eq}
+
+
 def solve_ode():
     """
     Solve single ODE
     """
     fig_name = "lect4"
 
-    k = 0.2  # L/mol s
-    k_c = 20.0  # L/mol
     cao = 0.2  # mol/L
-    x0 = 0.0  # initial conversion
-
     t_start = 0.0
     t_end = 60.0
-    time = np.linspace(t_start, t_end, 1001)  # seconds
-    conv = odeint(ode, x0, time, args=(k, k_c, cao))
-
-    # here, need to add the additional argument of "t" because of how "ode" was set up for "odeint"
-    x_eq = fsolve(ode, 0.5, args=(t_end, k, k_c, cao))
+    model = batch_model(cao=cao, t_end=t_end)
+    time = model['time']
+    conv = model['conversion']
+    x_eq = model['x_eq']
 
     make_fig(fig_name + "_conversion", time, conv,
              x_label=r'time (s)', y_label=r'conversion (unitless)', y1_label=r'X(t)',
@@ -53,11 +76,8 @@ def solve_ode():
              fig_width=8, fig_height=4,
              )
 
-    c_a = cao * (1.0 - conv)
-    c_b = cao * conv * 0.5
-
-    make_fig(fig_name + "_concentration", time, c_a,
-             y1_label="A", y2_array=c_b, y2_label="B", color2="red",
+    make_fig(fig_name + "_concentration", time, model['c_a'],
+             y1_label="A", y2_array=model['c_b'], y2_label="B", color2="red",
              x_label=r'time (s)', y_label=r'concentration (mol/L)',
              x_lima=0.0, x_limb=t_end,
              y_lima=0.0, y_limb=cao,
@@ -8,10 +8,10 @@ from __future__ import print_function
 import sys
 
 import numpy as np
-from scipy.integrate import odeint
-from scipy.optimize import fsolve
 
 from common import make_fig, GOOD_RET
+from umich_che344.ode_cache import cached_odeint
+from vec_solvers import x_eq_2a_to_b
 
 __author__ = 'hbmayes'
 
@@ -35,6 +35,45 @@ def ode(y, t, k, k_c, cao, nu_0, gas=True):
     return 2.0 * k / nu_0 * (cao * np.square((1.0-y)/vol_change) - y * 0.5 / k_c / vol_change)
 
 
+# noinspection PyUnusedLocal
+def ode_jac(y, t, k, k_c, cao, nu_0, gas=True):
+    """
+    Analytical derivative of "ode" with respect to y, shaped [1, 1] for use as the odeint "Dfun"
+    Parameters are as for "ode"
+    :return: d(dy_dt)/dy
+    """
+    if gas:
+        vol_change = 1-0.5*y
+        # d/dy of ((1-y)/vol_change)^2 and of y/vol_change
+        d_sq_term = (np.square(1.0-y) - 2.0 * (1.0-y) * vol_change) / np.power(vol_change, 3)
+        d_lin_term = 1.0 / np.square(vol_change)
+    else:
+        d_sq_term = -2.0 * (1.0-y)
+        d_lin_term = 1.0
+    return np.reshape(2.0 * k / nu_0 * (cao * d_sq_term - 0.5 / k_c * d_lin_term), (1, 1))
+
+
+def pfr_model(k=0.2, k_c=20.0, cao=0.2, nu_0=1.0, x0=0.0, v_end=60.0, num_points=1001, gas=True):
+    """
+    Conversion and concentrations along a PFR for 2A <--> B
+    :param k: rate coefficient, L/mol s
+    :param k_c: equilibrium coefficient, L/mol
+    :param cao: inlet concentration of A, mol/L
+    :param nu_0: inlet volumetric flow rate, L/s
+    :param x0: inlet conversion
+    :param v_end: reactor volume, L
+    :param num_points: number of output volumes
+    :param gas: boolean for a gas-phase reaction (volumetric flow changes with conversion), else liquid phase
+    :return: dict with the volume, conversion, c_a and c_b arrays and the equilibrium conversion x_eq
+    """
+    volume = np.linspace(0.0, v_end, num_points)  # L
+    conv = cached_odeint(ode, x0, volume, args=(k, k_c, cao, nu_0, gas), Dfun=ode_jac)[:, 0]
+    vol_change = 1.0 - 0.5 * conv if gas else 1.0
+    # the rate is quadratic in X, so the equilibrium conversion (where it is zero) has a closed form
+    return {'volume': volume, 'conversion': conv, 'c_a': cao * (1.0 - conv) / vol_change,
+            'c_b': cao * conv * 0.5 / vol_change, 'x_eq': x_eq_2a_to_b(k_c, cao, gas=gas)}
+
+
 # noinspection PyTypeChecker
 def solve_ode():
     """
@@ -50,13 +89,13 @@ def solve_ode():
 
     v_start = 0.0
     v_end = 60.0
-    volume = np.linspace(v_start, v_end, 1001)  # L
-    conv = odeint(ode, x0, volume, args=(k, k_c, cao, nu_0))
-    conv_liq = odeint(ode, x0, volume, args=(k, k_c, cao, nu_0, False))
-
-    # here, need to add the additional argument of "t" because of how "ode" was set up for "odeint"
-    x_eq = fsolve(ode, 0.5, args=(v_end, k, k_c, cao, nu_0))
-    x_eq_liq = fsolve(ode, 0.5, args=(v_end, k, k_c, cao, nu_0, False))
+    gas_model = pfr_model(k, k_c, cao, nu_0, x0, v_end)
+    liq_model = pfr_model(k, k_c, cao, nu_0, x0, v_end, gas=False)
+    volume = gas_model['volume']
+    conv = gas_model['conversion']
+    conv_liq = liq_model['conversion']
+    x_eq = gas_model['x_eq']
+    x_eq_liq = liq_model['x_eq']
 
     make_fig(fig_name + "_conversion", volume, conv,
              x_label=r'volume (L)', y_label=r'conversion (unitless)', y1_label=r'X(V)',
@@ -73,11 +112,10 @@ def solve_ode():
              fig_width=8, fig_height=4,
              )
 
-    vol_change = 1.0 - 0.5 * conv
-    c_a_no_vol = cao * (1.0 - conv_liq)
-    c_b_no_vol = cao * conv_liq * 0.5
-    c_a = cao * (1.0 - conv) / vol_change
-    c_b = cao * conv * 0.5 / vol_change
+    c_a = gas_model['c_a']
+    c_b = gas_model['c_b']
+    c_a_no_vol = liq_model['c_a']
+    c_b_no_vol = liq_model['c_b']
 
     make_fig(fig_name + "_concentration", volume, c_a,
              y1_label="A", y2_array=c_b, y2_label="B", color2="red",
@@ -95,8 +133,8 @@ def solve_ode():
              fig_width=8, fig_height=4,
              )
 
-    conv_2 = odeint(ode, x0, volume, args=(k, k_c, cao, nu_0*0.5))
-    conv_3 = odeint(ode, x0, volume, args=(k, k_c, cao, nu_0*2.0))
+    conv_2 = pfr_model(k, k_c, cao, nu_0*0.5, x0, v_end)['conversion']
+    conv_3 = pfr_model(k, k_c, cao, nu_0*2.0, x0, v_end)['conversion']
     make_fig(fig_name + "_clicker", volume, conv,
              x_label=r'volume (L)', y_label=r'conversion (unitless)', y1_label=r'A) No change',
              y2_array=conv * 2.0, y2_label=r'B) ', y3_array=conv * 0.5, y3_label=r'C) ',
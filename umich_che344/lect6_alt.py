@@ -8,9 +8,14 @@ from __future__ import print_function
 import sys
 import numpy as np
 from common import GOOD_RET, R_J, temp_c_to_k, k_at_new_temp, R_ATM, make_fig
+from vec_solvers import safeguarded_newton, X_MAX, DEF_XTOL
+from levenspiel import LevenspielCurve
 
 __author__ = 'hbmayes'
 
+# cases solved first, every this many, to give initial guesses for the rest in solve_design_eq
+WARM_START_STRIDE = 16
+
 
 def pfr_design_eq(x_out, x_in, vol, nuo, k):
     """
@@ -38,6 +43,77 @@ def cstr_design_eq(x_out, x_in, vol, nuo, k):
     return vol - nuo / k * (x_out - x_in) * (1 + 3 * x_out) / (1 - x_out)
 
 
+def pfr_design_eq_deriv(x_out, x_in, vol, nuo, k):
+    """
+    Derivative of pfr_design_eq with respect to x_out
+    :return: d(residual)/d(x_out)
+    """
+    return -nuo / k * (4.0 / (1 - x_out) - 3.0)
+
+
+def cstr_design_eq_deriv(x_out, x_in, vol, nuo, k):
+    """
+    Derivative of cstr_design_eq with respect to x_out
+    :return: d(residual)/d(x_out)
+    """
+    return -nuo / k * ((1 + 6 * x_out - 3 * x_in) / (1 - x_out) +
+                       (x_out - x_in) * (1 + 3 * x_out) / np.square(1 - x_out))
+
+
+def solve_design_eq(design_eq, design_eq_deriv, x_in, vol, nuo, k, warm_start_stride=WARM_START_STRIDE,
+                    xtol=DEF_XTOL):
+    """
+    Outlet conversions for many reactors at once, by a vectorized bracketed Newton iteration on [x_in, 1).
+    When consecutive cases are similar (e.g. a sweep over volume), every warm_start_stride-th case is solved
+    first and the others start from guesses interpolated between those solutions.
+    :param design_eq: residual function, e.g. pfr_design_eq or cstr_design_eq
+    :param design_eq_deriv: its derivative with respect to x_out, e.g. pfr_design_eq_deriv
+    :param x_in: inlet conversions (unitless); scalar or array
+    :param vol: reactor volumes in L; scalar or array
+    :param nuo: volumetric flows in L/min; scalar or array
+    :param k: rate coefficients in 1/min; scalar or array
+    :param warm_start_stride: spacing of the cases solved first; 0 or None to start all cases from the middle
+                              of their brackets
+    :param xtol: absolute tolerance on the conversion
+    :return: outlet conversions, and a boolean array that is False where a case did not converge (e.g. the
+             conversion is within 1e-12 of 1)
+    """
+    arrays = np.broadcast_arrays(*[np.asarray(val, dtype=float) for val in (x_in, vol, nuo, k)])
+    shape = arrays[0].shape
+    args = [array.ravel() for array in arrays]
+    num_cases = len(args[0])
+
+    x0 = None
+    if warm_start_stride and num_cases > 2 * warm_start_stride:
+        coarse = np.append(np.arange(0, num_cases - 1, warm_start_stride), num_cases - 1)
+        coarse_args = [arg[coarse] for arg in args]
+        x_coarse, _ = safeguarded_newton(design_eq, coarse_args[0], X_MAX, args=coarse_args, dfunc=design_eq_deriv,
+                                         xtol=xtol)
+        x0 = np.interp(np.arange(num_cases), coarse, x_coarse)
+
+    x_out, converged = safeguarded_newton(design_eq, args[0], X_MAX, args=args, dfunc=design_eq_deriv, x0=x0,
+                                          xtol=xtol)
+    return x_out.reshape(shape), converged.reshape(shape)
+
+
+def pfr_outlet_conversion(x_in, vol, nuo, k, warm_start_stride=WARM_START_STRIDE):
+    """
+    Outlet conversions of PFRs from the HW3 problem 1 design equation; see solve_design_eq
+    :return: outlet conversions and convergence flags
+    """
+    return solve_design_eq(pfr_design_eq, pfr_design_eq_deriv, x_in, vol, nuo, k,
+                           warm_start_stride=warm_start_stride)
+
+
+def cstr_outlet_conversion(x_in, vol, nuo, k, warm_start_stride=WARM_START_STRIDE):
+    """
+    Outlet conversions of CSTRs from the HW3 problem 1 design equation; see solve_design_eq
+    :return: outlet conversions and convergence flags
+    """
+    return solve_design_eq(cstr_design_eq, cstr_design_eq_deriv, x_in, vol, nuo, k,
+                           warm_start_stride=warm_start_stride)
+
+
 def r_dis_a(k, cao, x, k_equil):
     """
     rate of consumption (disappearance) of species A for HW3 prob 1
@@ -76,22 +152,17 @@ def prob1a():
     vol = 600.0  # L
     tau = vol / nuo  # s
 
-    # x_in = 0.0
-    # x_out = 0.65
-    x_in = np.zeros(4)
-    x_out = np.empty(4)
-
-    print(x_in)
-
     x_begin = 0.0
     x_end = 0.65
-    x_cstr = np.array([x_begin, x_end])
-    x_pfr = np.linspace(x_end, x_end, 10001)
-    neg_ra = r_dis_a(k, cao, x_pfr, k_equil)
+    # F_A0/-r_A, with its integral for PFR volumes
+    leven = LevenspielCurve(lambda x: r_dis_a(k, cao, x, k_equil), fao, x_end, x_min=x_begin)
+    print("From X = {} to {}: PFR volume = {:.1f} L, CSTR volume = {:.1f} L".format(
+        x_begin, x_end, leven.pfr_volume(x_end), leven.cstr_volume(x_end, x_begin)))
 
-    leven_cstr = np.empty(2)
-    leven_cstr.fill(fao / neg_ra[-1])
-    leven_pfr = fao / neg_ra
+    x_cstr = np.array([x_begin, x_end])
+    x_pfr = np.linspace(x_begin, x_end, 1001)
+    leven_pfr = leven(x_pfr)
+    leven_cstr = np.full(2, leven_pfr[-1])
 
     fig_name = 'lect06_alt'
     volume_limit = 2000
@@ -10,6 +10,7 @@ import sys
 import numpy as np
 
 from common import GOOD_RET, make_fig
+from cstr_cascade import cascade_conversions
 
 __author__ = 'hbmayes'
 
@@ -77,18 +78,14 @@ def prob1a():
     vol = 750.0  # L
     tau = vol / nuo  # s
 
-    # x_in = 0.0
-    # x_out = 0.65
-    x_in = np.zeros(6)
-    x_out = np.zeros(6)
-    cstr_x = np.zeros(6)
-
     print("conversion", (tau * k) / (1 + tau * k))
 
-    for id in [1, 2, 3, 4]:
-        x_in[id+1] = x_out[id]
-        cstr_x = (tau*k)/(1+tau*k)
-    print(x_in)
+    # conversion after each of 5 equal CSTRs in series
+    num_tanks = 5
+    x_tanks, _ = cascade_conversions(lambda x: r_dis_a(k, cao, x), num_tanks, tau, cao)
+    for tank in range(1, num_tanks + 1):
+        print("After tank {}, X = {:.4f} (first-order closed form: {:.4f})".format(
+            tank, x_tanks[tank], 1.0 - 1.0 / (1.0 + tau * k) ** tank))
     #
     # x_cstr = np.array([x_in, x_out])
     # x_pfr = np.linspace(x_in, x_out, 10001)
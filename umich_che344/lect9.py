@@ -9,11 +9,15 @@ references:
 from __future__ import print_function
 import sys
 import numpy as np
-from scipy.integrate import odeint
+from umich_che344.instrument import odeint
 from umich_che344.common import GOOD_RET, make_fig
+from umich_che344.ode_cache import cached_odeint
 
 __author__ = 'hbmayes'
 
+N_STATES = 4  # fa, fb, fc, p
+SWEEP_PARAM_NAMES = ('ka', 'keq', 'kc', 'alpha', 'cto', 'fto')
+
 
 def sys_odes(y_vector, w, ka, keq, kc, alpha, cto, fto):
     # put here any equations you need to calculate the differential equations (R.H.S.s of dy/dW)
@@ -32,33 +36,184 @@ def sys_odes(y_vector, w, ka, keq, kc, alpha, cto, fto):
     return dy_dw
 
 
-def solve_ode_sys():
-    # initial values
-    fa0 = 5.0
-    fb0 = 0.0
-    c0 = 0.0
-    p0 = 1.0
-    # "y" is our system of equations (a vector). "y0" are the initial values. I'm listing "X" first and "p" second
-    y0 = [fa0, fb0, c0, p0]
-
-    ka = 2.0
-    keq = 0.004
-    kc = 8.0
-    cto = 0.2
-    fto = 5.0
-    alpha = 0.015
+def sys_odes_jac(y_vector, w, ka, keq, kc, alpha, cto, fto):
+    """
+    Analytical Jacobian of sys_odes, d(dy/dW)_i / dy_j, for use as the odeint "Dfun"
+    Parameters are as for sys_odes
+    :return: Jacobian as a [4, 4] array
+    """
+    return sys_odes_vec_jac(np.asarray(y_vector, dtype=float).reshape(N_STATES, 1),
+                            w, ka, keq, kc, alpha, cto, fto)[:, :, 0]
+
+
+def sys_odes_vec_jac(y_matrix, w, ka, keq, kc, alpha, cto, fto):
+    """
+    Analytical Jacobian of sys_odes_vec for every case at once
+    Parameters are as for sys_odes_vec
+    :return: Jacobians with shape [n_states, n_states, n_cases]
+    """
+    fa, fb, fc, p = y_matrix
+    ft = fa + fb + fc
+    cb = cto * fb / ft
+    cc = cto * fc / ft
+    # derivatives of the concentrations with respect to each molar flow (pressure does not enter)
+    dft = -cto / np.square(ft)
+    dca = [cto / ft + fa * dft, fa * dft, fa * dft]
+    dcb = [fb * dft, cto / ft + fb * dft, fb * dft]
+    dcc = [fc * dft, fc * dft, cto / ft + fc * dft]
+
+    jac = np.zeros((N_STATES, N_STATES) + np.shape(ft))
+    for j in range(3):
+        dr1 = ka * (dca[j] - (3.0 * cb**2.0 * cc * dcb[j] + cb**3.0 * dcc[j]) / keq)
+        jac[0, j] = -dr1
+        jac[1, j] = 3.0 * dr1 - kc * dcb[j]
+        jac[2, j] = dr1
+        jac[3, j] = -alpha / (2.0 * fto * p)
+    jac[3, 3] = alpha * ft / (2.0 * fto * np.square(p))
+    return jac
+
+
+def sys_odes_vec(y_matrix, w, ka, keq, kc, alpha, cto, fto, out=None):
+    """
+    Vectorized form of sys_odes that evaluates many reactors in one call
+    :param y_matrix: states with shape [n_states, n_cases], rows in the order fa, fb, fc, p
+    :param w: catalyst weight (independent variable); unused because the system is autonomous
+    :param ka: forward rate coefficient; scalar or array of length n_cases (same for the other parameters)
+    :param keq: equilibrium coefficient
+    :param kc: mass transfer coefficient for B through the membrane
+    :param alpha: pressure drop parameter
+    :param cto: total initial concentration
+    :param fto: total initial molar flow rate
+    :param out: optional array with shape [n_states, n_cases] to hold the result
+    :return: dy_dw with shape [n_states, n_cases]
+    """
+    fa, fb, fc, p = y_matrix
+    ft = fa + fb + fc
+    ca = cto * fa / ft
+    cb = cto * fb / ft
+    cc = cto * fc / ft
+    r1 = ka*(ca - cb**3.0 * cc / keq)
+    rb = kc*cb
+    if out is None:
+        out = np.empty(np.shape(y_matrix))
+    out[0] = -r1
+    out[1] = 3.0*r1 - rb
+    out[2] = r1
+    out[3] = -alpha*ft/(2.0*fto*p)
+    return out
+
+
+def _sys_odes_flat(y_flat, w, n_cases, ka, keq, kc, alpha, cto, fto, out):
+    """
+    Adapter so odeint can integrate sys_odes_vec. The flat state vector is stored case by case
+    (fa, fb, fc, p for case 0, then case 1, ...), so the Jacobian is block diagonal with a half-bandwidth
+    of N_STATES - 1, which lets odeint use its banded solver.
+    """
+    sys_odes_vec(y_flat.reshape(n_cases, N_STATES).T, w, ka, keq, kc, alpha, cto, fto, out=out.T)
+    return out.ravel()
+
 
+def _sys_odes_flat_jac(y_flat, w, n_cases, ka, keq, kc, alpha, cto, fto, out):
+    """
+    Banded Jacobian of _sys_odes_flat in the layout odeint expects when ml and mu are given:
+    band[i - j + mu, j] holds d f_i / d y_j
+    """
+    jac = sys_odes_vec_jac(y_flat.reshape(n_cases, N_STATES).T, w, ka, keq, kc, alpha, cto, fto)
+    mu = N_STATES - 1
+    band = np.zeros((2 * mu + 1, n_cases * N_STATES))
+    for i in range(N_STATES):
+        for j in range(N_STATES):
+            band[i - j + mu, j::N_STATES] = jac[i, j]
+    return band
+
+
+def solve_ode_sweep(ka, keq, kc, alpha, cto, fto, y0, w_cat, chunk_size=None, rtol=None, atol=None,
+                    use_jac=True, store=None):
+    """
+    Integrates the membrane PBR for many parameter sets at once with a single odeint call per chunk
+    :param ka: forward rate coefficient(s); all parameters are broadcast against each other
+    :param keq: equilibrium coefficient(s)
+    :param kc: mass transfer coefficient(s) for B through the membrane
+    :param alpha: pressure drop parameter(s)
+    :param cto: total initial concentration(s)
+    :param fto: total initial molar flow rate(s)
+    :param y0: initial values [fa0, fb0, fc0, p0], either shared by all cases or with shape [n_cases, n_states]
+    :param w_cat: catalyst weights at which to report the solution
+    :param chunk_size: maximum number of cases per integrator call (default: all cases in one call). All
+                       cases in a call share step sizes, so chunking keeps one stiff case from slowing the rest
+    :param rtol: relative tolerance passed to odeint
+    :param atol: absolute tolerance passed to odeint
+    :param use_jac: flag to pass the analytical banded Jacobian to odeint instead of finite differences
+    :param store: optional traj_store.TrajectoryStore; if given, each chunk of solutions is appended to it (with
+                  its parameters) as soon as it is solved instead of being kept in memory
+    :return: solutions with shape [n_cases, len(w_cat), n_states], or the list of case ids in the store
+    """
+    params = np.broadcast_arrays(*[np.atleast_1d(np.asarray(param, dtype=float))
+                                   for param in (ka, keq, kc, alpha, cto, fto)])
+    y0 = np.asarray(y0, dtype=float)
+    n_cases = max(len(params[0]), len(np.atleast_2d(y0)))
+    params = [np.broadcast_to(param, (n_cases,)) for param in params]
+    y0 = np.broadcast_to(y0, (n_cases, N_STATES))
+    if chunk_size is None:
+        chunk_size = n_cases
+
+    if store is None:
+        result = np.empty((n_cases, len(w_cat), N_STATES))
+    else:
+        result = []
+    for start in range(0, n_cases, chunk_size):
+        end = min(start + chunk_size, n_cases)
+        num = end - start
+        args = tuple(param[start:end] for param in params)
+        sol = odeint(_sys_odes_flat, y0[start:end].ravel(), w_cat,
+                     args=(num,) + args + (np.empty((num, N_STATES)),),
+                     Dfun=_sys_odes_flat_jac if use_jac else None, ml=N_STATES - 1, mu=N_STATES - 1,
+                     rtol=rtol, atol=atol)
+        sol = sol.reshape(len(w_cat), num, N_STATES).transpose(1, 0, 2)
+        if store is None:
+            result[start:end] = sol
+        else:
+            case_params = [dict(zip(SWEEP_PARAM_NAMES, [param[case_id] for param in args]), y0=y0[start + case_id])
+                           for case_id in range(num)]
+            result.extend(store.append(sol, case_params))
+    return result
+
+
+def membrane_model(fa0=5.0, fb0=0.0, fc0=0.0, p0=1.0, ka=2.0, keq=0.004, kc=8.0, alpha=0.015, cto=0.2, fto=5.0,
+                   w_max=30.0, num_points=1001):
+    """
+    Molar flow rates and pressure along the membrane reactor
+    :param fa0: inlet molar flow rate of A
+    :param fb0: inlet molar flow rate of B
+    :param fc0: inlet molar flow rate of C
+    :param p0: inlet pressure ratio
+    :param ka: rate coefficient of A
+    :param keq: equilibrium coefficient
+    :param kc: mass transfer coefficient of B through the membrane
+    :param alpha: pressure drop parameter
+    :param cto: total inlet concentration
+    :param fto: total inlet molar flow rate
+    :param w_max: final catalyst mass (kg)
+    :param num_points: number of output catalyst masses
+    :return: dict with the w_cat, f_a, f_b, f_c and p arrays
+    """
+    w_cat = np.linspace(0.0, w_max, num_points)
+    # "y" is our system of equations (a vector). "y0" are the initial values.
+    sol = cached_odeint(sys_odes, [fa0, fb0, fc0, p0], w_cat, args=(ka, keq, kc, alpha, cto, fto), Dfun=sys_odes_jac)
+    return {'w_cat': w_cat, 'f_a': sol[:, 0], 'f_b': sol[:, 1], 'f_c': sol[:, 2], 'p': sol[:, 3]}
+
+
+def solve_ode_sys():
     # Give an initial weight through a final weight. We don't know the final weight needed yet; if we guess
     # too small and we don't get the conversion we want, we can always increase it and run the program again
     x_min = 0
     x_max = 30.0
-    w_cat = np.linspace(x_min, x_max, 1001)
-
-    sol = odeint(sys_odes, y0, w_cat, args=(ka, keq, kc, alpha, cto, fto))
-    a_w = sol[:, 0]
-    b_w = sol[:, 1]
-    c_w = sol[:, 2]
-    p_w = sol[:, 3]
+    model = membrane_model(w_max=x_max)
+    w_cat = model['w_cat']
+    a_w = model['f_a']
+    b_w = model['f_b']
+    c_w = model['f_c']
+    p_w = model['p']
 
     name = 'lecture_9'
     make_fig(name+"flows", w_cat, a_w, y1_label="$F_A$(W)", y2_array=b_w, y2_label="$F_B$(W)",
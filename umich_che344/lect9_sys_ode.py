@@ -9,12 +9,15 @@ references:
 from __future__ import print_function
 import sys
 import numpy as np
-from scipy.integrate import odeint
+from umich_che344.instrument import odeint
 from common import make_fig, GOOD_RET
 
 
 __author__ = 'hbmayes'
 
+# same figures as lect9, so make_all_figs does not run this copy
+FIGURE_JOBS = ()
+
 
 def sys_odes(y_vector, w, ka, keq, kc, alpha, cto, fto):
     # put here any equations you need to calculate the differential equations (R.H.S.s of dy/dW)
@@ -0,0 +1,142 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Levenspiel curve (F_A0 / -r_A versus conversion) for one rate law, with its integral precomputed so that PFR
+volumes are lookups instead of a new integration for every figure or design question.
+The range of conversion is split into panels, refined where the curve is steep (e.g. close to the equilibrium
+conversion) until an 8-point Gauss-Legendre rule agrees with the same rule on the two halves of the panel. Each
+panel keeps the integral of the polynomial through its Gauss points, so the volume from the start of the range
+to any conversion is a table lookup plus one polynomial evaluation, for arrays of queries at once.
+"""
+from __future__ import print_function
+import numpy as np
+from numpy.polynomial import legendre
+from umich_che344.common import InvalidDataError
+
+__author__ = 'hbmayes'
+
+GAUSS_ORDER = 8
+DEF_RTOL = 1e-10
+DEF_INIT_PANELS = 8
+DEF_MAX_DEPTH = 30
+
+GAUSS_NODES, GAUSS_WEIGHTS = legendre.leggauss(GAUSS_ORDER)
+# maps values at the Gauss nodes to the Legendre coefficients of the polynomial through them
+NODES_TO_LEG = np.linalg.inv(legendre.legvander(GAUSS_NODES, GAUSS_ORDER - 1))
+
+
+class LevenspielCurve(object):
+    """
+    F_A0 / -r_A for a rate law on [x_min, x_max], with cumulative integrals for PFR volumes.
+    """
+    def __init__(self, rate_func, fao, x_max, args=(), x_min=0.0, rtol=DEF_RTOL, init_panels=DEF_INIT_PANELS,
+                 max_depth=DEF_MAX_DEPTH):
+        """
+        :param rate_func: vectorized rate of disappearance of A as a function of conversion, rate_func(x, *args);
+                          it must be positive on [x_min, x_max], so x_max must be below any equilibrium conversion
+        :param fao: molar flow rate of A at zero conversion
+        :param x_max: highest conversion to be queried
+        :param args: rate law parameters
+        :param x_min: lowest conversion to be queried
+        :param rtol: relative tolerance for the integral over each panel
+        :param init_panels: number of equal panels to start from
+        :param max_depth: maximum number of times a panel is halved; if reached, "converged" is False
+        """
+        if not x_min < x_max:
+            raise InvalidDataError("Expected x_min < x_max, but found x_min = {} and x_max = {}".format(x_min,
+                                                                                                      x_max))
+        self.rate_func = rate_func
+        self.fao = fao
+        self.args = tuple(args)
+        self.x_min = x_min
+        self.x_max = x_max
+        self.converged = True
+
+        lo = np.linspace(x_min, x_max, init_panels + 1)
+        hi = lo[1:]
+        lo = lo[:-1]
+        done_lo, done_hi, done_vals = [], [], []
+        for depth in range(max_depth + 1):
+            mid = 0.5 * (lo + hi)
+            whole = self._gauss_values(lo, hi)
+            left = self._gauss_values(lo, mid)
+            right = self._gauss_values(mid, hi)
+            whole_int = self._integrals(lo, hi, whole)
+            halves_int = self._integrals(lo, mid, left) + self._integrals(mid, hi, right)
+            ok = np.abs(whole_int - halves_int) <= rtol * np.abs(halves_int)
+            if depth == max_depth:
+                self.converged = bool(ok.all())
+                ok[:] = True
+            # keep the (more accurate) halves of the panels that pass
+            done_lo.extend([lo[ok], mid[ok]])
+            done_hi.extend([mid[ok], hi[ok]])
+            done_vals.extend([left[ok], right[ok]])
+            lo, hi = np.concatenate([lo[~ok], mid[~ok]]), np.concatenate([mid[~ok], hi[~ok]])
+            if len(lo) == 0:
+                break
+
+        lo = np.concatenate(done_lo)
+        order = np.argsort(lo)
+        self.panel_lo = lo[order]
+        self.panel_width = np.concatenate(done_hi)[order] - self.panel_lo
+        node_vals = np.concatenate(done_vals)[order]
+        self.cumulative = np.concatenate([[0.0], np.cumsum(self._integrals(self.panel_lo, self.panel_lo +
+                                                                            self.panel_width, node_vals))])
+        # Legendre coefficients (one row per panel) of the integral from the start of the panel, on [-1, 1]
+        self._antiderivs = legendre.legint(node_vals.dot(NODES_TO_LEG.T), lbnd=-1, axis=1)
+
+    def __call__(self, x):
+        """
+        :param x: conversion(s)
+        :return: F_A0 / -r_A at x (volume units)
+        """
+        return self.fao / self.rate_func(np.asarray(x, dtype=float), *self.args)
+
+    @property
+    def num_panels(self):
+        return len(self.panel_lo)
+
+    def _gauss_values(self, lo, hi):
+        rate = self.rate_func(0.5 * (hi - lo)[:, None] * (GAUSS_NODES + 1.0) + lo[:, None], *self.args)
+        if np.any(rate <= 0):
+            raise InvalidDataError("The rate is not positive between conversions {} and {}; x_max must be below "
+                                   "the equilibrium conversion".format(self.x_min, self.x_max))
+        return self.fao / rate
+
+    @staticmethod
+    def _integrals(lo, hi, node_vals):
+        return 0.5 * (hi - lo) * node_vals.dot(GAUSS_WEIGHTS)
+
+    def cumulative_volume(self, x):
+        """
+        :param x: conversion(s) in [x_min, x_max]
+        :return: PFR volume to reach x from x_min
+        """
+        x = np.asarray(x, dtype=float)
+        if np.any((x < self.x_min) | (x > self.x_max)):
+            raise InvalidDataError("Conversions must be between {} and {}".format(self.x_min, self.x_max))
+        flat_x = x.ravel()
+        idx = np.clip(np.searchsorted(self.panel_lo, flat_x, side='right') - 1, 0, self.num_panels - 1)
+        width = self.panel_width[idx]
+        local = 2.0 * (flat_x - self.panel_lo[idx]) / width - 1.0
+        partial = 0.5 * width * legendre.legval(local, self._antiderivs[idx].T, tensor=False)
+        return (self.cumulative[idx] + partial).reshape(x.shape)
+
+    def pfr_volume(self, x_out, x_in=None):
+        """
+        :param x_out: outlet conversion(s)
+        :param x_in: inlet conversion(s); defaults to x_min
+        :return: PFR volume(s), the area under the curve from x_in to x_out
+        """
+        if x_in is None:
+            return self.cumulative_volume(x_out)
+        return self.cumulative_volume(x_out) - self.cumulative_volume(x_in)
+
+    def cstr_volume(self, x_out, x_in=0.0):
+        """
+        :param x_out: outlet conversion(s)
+        :param x_in: inlet conversion(s)
+        :return: CSTR volume(s), the rectangle (x_out - x_in) * F_A0 / -r_A(x_out)
+        """
+        x_out = np.asarray(x_out, dtype=float)
+        return (x_out - x_in) * self(x_out)
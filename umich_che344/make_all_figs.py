@@ -0,0 +1,175 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Regenerates the figures from every lecture script, running the figure jobs in parallel with one worker process
+per core. A lecture module may list its independent figure functions in a module-level FIGURE_JOBS tuple;
+otherwise its main() is run as a single job. Failures are collected and reported without stopping other jobs.
+With --fig_mode record, the scripts only compute: matplotlib is never imported and each job lists the figures
+it would have saved (see plotting). With --instrument, each job also reports its solver counts and phase
+timings (see instrument), and the reports are summed over all jobs.
+"""
+from __future__ import print_function
+import argparse
+import json
+import os
+import pkgutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib import import_module
+from umich_che344 import instrument, plotting
+from umich_che344.constants import GOOD_RET, JOB_ERROR
+
+__author__ = 'hbmayes'
+
+PKG_DIR = os.path.dirname(os.path.abspath(__file__))
+LECTURE_PREFIX = 'lect'
+DEF_JOB = 'main'
+
+
+def _init_worker(fig_mode=plotting.FIG_AGG):
+    """
+    Lecture scripts import "common" as a top-level module, as when run from this folder, and the workers never
+    show figures, so by default use the non-interactive backend
+    :param fig_mode: one of plotting.FIG_MODES
+    """
+    if PKG_DIR not in sys.path:
+        sys.path.insert(0, PKG_DIR)
+    plotting.set_fig_mode(fig_mode)
+
+
+def find_lecture_modules():
+    """
+    :return: sorted list of the lecture module names in this package
+    """
+    return sorted(name for _, name, is_pkg in pkgutil.iter_modules([PKG_DIR])
+                  if name.startswith(LECTURE_PREFIX) and not is_pkg)
+
+
+def find_jobs(module_names):
+    """
+    :param module_names: lecture modules to search
+    :return: list of (module name, function name) tuples; a module that cannot be imported gets its main() job,
+             so that run_job reports the import error with the other results
+    """
+    jobs = []
+    for module_name in module_names:
+        try:
+            module = import_module(module_name)
+        except Exception:
+            jobs.append((module_name, DEF_JOB))
+            continue
+        jobs.extend((module_name, func_name) for func_name in getattr(module, 'FIGURE_JOBS', (DEF_JOB,)))
+    return jobs
+
+
+def run_job(module_name, func_name, instrumented=False):
+    """
+    Runs one figure job, catching any error so it can be reported with the rest of the batch
+    :param module_name: lecture module to import
+    :param func_name: name of the function in that module to call
+    :param instrumented: boolean to flag whether to record the job's solver counts and phase timings
+    :return: dict with the job, its wall time in seconds, the traceback (None on success), in FIG_RECORD mode
+             the names of the figures it would have saved, and, if instrumented, the report from
+             instrument.report
+    """
+    plotting.clear_recorded_figures()
+    if instrumented:
+        instrument.enable()
+        instrument.reset()
+    start = time.time()
+    error = None
+    try:
+        getattr(import_module(module_name), func_name)()
+    except Exception:
+        error = traceback.format_exc()
+    result = {'module': module_name, 'job': func_name, 'seconds': time.time() - start, 'error': error}
+    if plotting.get_fig_mode() == plotting.FIG_RECORD:
+        result['figures'] = [fig['name'] for fig in plotting.recorded_figures() if fig['saved']]
+        plotting.clear_recorded_figures()
+    if instrumented:
+        result['instrument'] = instrument.report('{}.{}'.format(module_name, func_name))
+    return result
+
+
+def run_all(jobs, num_workers=None, instrumented=False, fig_mode=plotting.FIG_AGG):
+    """
+    Runs figure jobs on a process pool
+    :param jobs: list of (module name, function name) tuples
+    :param num_workers: number of processes; defaults to the number of cores
+    :param instrumented: boolean to flag whether to record each job's solver counts and phase timings
+    :param fig_mode: one of plotting.FIG_MODES
+    :return: list of job results, in the order the jobs were given
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    results = {}
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                             initargs=(fig_mode,)) as executor:
+        futures = {executor.submit(run_job, *job, instrumented=instrumented): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                results[job] = future.result()
+            except Exception:
+                # e.g. the worker process died; the pool records this on the future
+                results[job] = {'module': job[0], 'job': job[1], 'seconds': float('nan'),
+                                'error': traceback.format_exc()}
+    return [results[job] for job in jobs]
+
+
+def print_summary(results, wall_time):
+    for result in results:
+        status = 'ok' if result['error'] is None else 'FAILED'
+        print("{:>8.2f} s  {:<6}  {}.{}".format(result['seconds'], status, result['module'], result['job']))
+    failures = [result for result in results if result['error'] is not None]
+    for result in failures:
+        print("\n{}.{} failed:\n{}".format(result['module'], result['job'], result['error']), file=sys.stderr)
+    print("Ran {} figure jobs ({} failed) in {:.2f} s".format(len(results), len(failures), wall_time))
+
+
+def parse_cmdline(argv=None):
+    parser = argparse.ArgumentParser(description='Regenerates the lecture figures in parallel.')
+    parser.add_argument('-m', '--modules', nargs='+', default=None,
+                        help='Lecture modules to run (default: all modules starting with "{}").'.format(
+                            LECTURE_PREFIX))
+    parser.add_argument('-n', '--num_workers', type=int, default=None,
+                        help='Number of worker processes (default: number of cores).')
+    parser.add_argument('-o', '--out_file', default=None,
+                        help='Optional JSON file for the per-job timings and failures.')
+    parser.add_argument('-f', '--fig_mode', choices=plotting.FIG_MODES, default=plotting.FIG_AGG,
+                        help='"{}" (default) to save the figures, or "{}" to only compute, never importing '
+                             'matplotlib.'.format(plotting.FIG_AGG, plotting.FIG_RECORD))
+    parser.add_argument('-i', '--instrument', action='store_true',
+                        help='Record solver counts and phase timings for each job and print their sum.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """ Runs the main program.
+    """
+    args = parse_cmdline(argv)
+    _init_worker(args.fig_mode)
+    module_names = args.modules if args.modules else find_lecture_modules()
+    jobs = find_jobs(module_names)
+
+    start = time.time()
+    results = run_all(jobs, args.num_workers, instrumented=args.instrument, fig_mode=args.fig_mode)
+    print_summary(results, time.time() - start)
+    if args.instrument:
+        reports = [result['instrument'] for result in results if 'instrument' in result]
+        print("\nSolver and figure timings summed over all jobs:")
+        print(instrument.format_report(instrument.aggregate(reports)))
+    if args.out_file:
+        with open(args.out_file, 'w') as out_file:
+            json.dump(results, out_file, indent=2)
+
+    if any(result['error'] is not None for result in results):
+        return JOB_ERROR
+    return GOOD_RET  # success
+
+
+if __name__ == '__main__':
+    status = main()
+    sys.exit(status)
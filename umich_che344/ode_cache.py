@@ -0,0 +1,170 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Persistent on-disk cache of odeint solutions, so that re-running a script does not re-integrate systems that
+have not changed. Solutions are stored as compressed NumPy files, keyed by a hash of the right-hand side source,
+initial values, args, output grid, and odeint options. The least recently used files are removed when the
+cache grows beyond its size limit.
+
+The cache is off unless a directory is given, either as cache_dir or with the CHE344_ODE_CACHE_DIR environment
+variable. The key covers the source of the right-hand side and Jacobian, their default argument values, and the
+module-level constants they name directly, but not functions they call: after editing such a helper, clear the
+cache (or pass the changed values in args).
+"""
+from __future__ import print_function
+import hashlib
+import inspect
+import os
+import numpy as np
+from umich_che344.instrument import odeint, phase
+
+__author__ = 'hbmayes'
+
+DEF_CACHE_DIR = os.environ.get('CHE344_ODE_CACHE_DIR') or None  # None: no caching
+DEF_CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_EXT = '.npz'
+
+
+def _func_fingerprint(func):
+    """
+    Source of a function plus its default argument values and the values of any module-level constants it
+    references, so that editing the function, a default, or a constant such as a rate coefficient changes the
+    cache key. Functions it calls are not included.
+    :param func: function (RHS or Jacobian) to fingerprint
+    :return: string
+    """
+    try:
+        text = inspect.getsource(func)
+    except (IOError, TypeError):
+        text = getattr(func, '__module__', '') + '.' + getattr(func, '__name__', repr(func))
+    code = getattr(func, '__code__', None)
+    if code is not None:
+        for name in code.co_names:
+            value = func.__globals__.get(name)
+            if isinstance(value, (int, float, complex, str, np.ndarray)):
+                text += '\n{}={!r}'.format(name, value)
+    for attr in ('__defaults__', '__kwdefaults__'):
+        defaults = getattr(func, attr, None)
+        if defaults:
+            text += '\n{}={!r}'.format(attr, sorted(defaults.items()) if isinstance(defaults, dict) else defaults)
+    return text
+
+
+def _update_hash(hasher, value):
+    if callable(value):
+        hasher.update(_func_fingerprint(value).encode('utf-8'))
+    elif isinstance(value, np.ndarray) or isinstance(value, (list, tuple)) and \
+            all(isinstance(item, (int, float, np.number)) for item in value):
+        array = np.ascontiguousarray(value, dtype=float)
+        hasher.update(repr(array.shape).encode('utf-8'))
+        hasher.update(array.tobytes())
+    elif isinstance(value, (list, tuple)):
+        hasher.update(type(value).__name__.encode('utf-8'))
+        for item in value:
+            _update_hash(hasher, item)
+    else:
+        hasher.update(repr(value).encode('utf-8'))
+    hasher.update(b'|')
+
+
+def cache_key(func, y0, t, args=(), **kwargs):
+    """
+    Hash identifying one odeint problem
+    :param func: right-hand side, with the odeint signature
+    :param y0: initial values
+    :param t: output grid
+    :param args: extra arguments for func
+    :param kwargs: other odeint keyword arguments (tolerances, Dfun, ...)
+    :return: hex digest string
+    """
+    hasher = hashlib.sha1()
+    for value in (func, y0, t, tuple(args)):
+        _update_hash(hasher, value)
+    for key in sorted(kwargs):
+        hasher.update(key.encode('utf-8'))
+        _update_hash(hasher, kwargs[key])
+    return hasher.hexdigest()
+
+
+def evict(cache_dir=DEF_CACHE_DIR, max_bytes=DEF_CACHE_MAX_BYTES):
+    """
+    Removes the least recently used cached solutions until the cache is no larger than max_bytes
+    :param cache_dir: cache location
+    :param max_bytes: size limit in bytes
+    :return: number of files removed
+    """
+    if cache_dir is None:
+        return 0
+    entries = []
+    for fname in os.listdir(cache_dir):
+        if fname.endswith(CACHE_EXT):
+            path = os.path.join(cache_dir, fname)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(entry[1] for entry in entries)
+    num_removed = 0
+    for mtime, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        num_removed += 1
+    return num_removed
+
+
+def clear_cache(cache_dir=DEF_CACHE_DIR):
+    """
+    Removes all cached solutions
+    :param cache_dir: cache location
+    """
+    if cache_dir is not None and os.path.isdir(cache_dir):
+        evict(cache_dir, max_bytes=-1)
+
+
+def cached_odeint(func, y0, t, args=(), cache_dir=DEF_CACHE_DIR, max_bytes=DEF_CACHE_MAX_BYTES, **kwargs):
+    """
+    Drop-in replacement for odeint that returns a stored solution when the same problem was solved before
+    :param func: right-hand side, with the odeint signature
+    :param y0: initial values
+    :param t: output grid
+    :param args: extra arguments for func
+    :param cache_dir: cache location; None (the default unless CHE344_ODE_CACHE_DIR is set) to always integrate
+    :param max_bytes: size limit for the cache directory
+    :param kwargs: other odeint keyword arguments. With full_output=True, the cache is bypassed.
+    :return: solution array, as from odeint
+    """
+    if cache_dir is None or kwargs.get('full_output'):
+        return odeint(func, y0, t, args=tuple(args), **kwargs)
+
+    path = os.path.join(cache_dir, cache_key(func, y0, t, args, **kwargs) + CACHE_EXT)
+    try:
+        with phase('ode_cache_load'), np.load(path) as data:
+            sol = data['sol']
+        # touching the file marks it as recently used for eviction
+        os.utime(path, None)
+        return sol
+    except (IOError, OSError, KeyError, ValueError):
+        pass
+
+    sol = odeint(func, y0, t, args=tuple(args), **kwargs)
+
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            # another process may have created it in the meantime
+            if not os.path.isdir(cache_dir):
+                raise
+    # write to a temporary name first so a concurrent reader never sees a partial file
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with phase('ode_cache_store'), open(tmp_path, 'wb') as tmp_file:
+        np.savez_compressed(tmp_file, sol=sol)
+    os.replace(tmp_path, path)
+    evict(cache_dir, max_bytes)
+    return sol
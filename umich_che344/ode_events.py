@@ -0,0 +1,113 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Integrates an ODE system until a target is reached (a conversion, volume, pressure, ...) instead of to a guessed
+end point. The right-hand sides keep the odeint signature, func(y, t, *args). The point where the event
+function crosses zero is located by root-finding on the integrator's interpolant, and integration stops there.
+references:
+     https://docs.scipy.org/doc/scipy/reference/generated/scipy.integrate.solve_ivp.html
+"""
+from __future__ import print_function
+from collections import namedtuple
+import numpy as np
+from scipy.integrate import solve_ivp
+from umich_che344.constants import InvalidDataError
+
+__author__ = 'hbmayes'
+
+DEF_RTOL = 1.49012e-8  # odeint's default tolerances
+DEF_ATOL = 1.49012e-8
+
+# t_event and y_event are None when the event was not reached before the end of t_span
+EventResult = namedtuple('EventResult', 't_event y_event t y found')
+
+
+def state_event(index, target, direction=0):
+    """
+    Event for a state reaching a value, e.g. p = p_min
+    :param index: index of the state in y
+    :param target: value of the state at the event
+    :param direction: 0 for any crossing, -1 only while the state decreases, 1 only while it increases
+    :return: event function of (t, y)
+    """
+    def event(t, y):
+        return y[index] - target
+    event.direction = direction
+    return event
+
+
+def conversion_event(index, initial, target):
+    """
+    Event for the conversion of a reactant reaching a value, X = (initial - y[index]) / initial
+    :param index: index in y of the reactant's molar flow rate, moles, or concentration
+    :param initial: its value at zero conversion
+    :param target: conversion at the event
+    :return: event function of (t, y)
+    """
+    def event(t, y):
+        return (initial - y[index]) / initial - target
+    event.direction = 1
+    return event
+
+
+def independent_var_event(func, target, direction=0):
+    """
+    Event for a function of the independent variable alone reaching a value, e.g. the volume of a semibatch
+    reactor, V(t) = V_0 + nu_0 * t, reaching 15 L
+    :param func: function of t
+    :param target: value of func at the event
+    :param direction: 0 for any crossing, -1 only while func decreases, 1 only while it increases
+    :return: event function of (t, y)
+    """
+    def event(t, y):
+        return func(t) - target
+    event.direction = direction
+    return event
+
+
+def integrate_to_event(func, y0, t_span, event, args=(), jac=None, num_points=None, method='LSODA',
+                       rtol=DEF_RTOL, atol=DEF_ATOL):
+    """
+    Integrates from t_span[0] until the event function is zero, or until t_span[1] if that comes first
+    :param func: right-hand side with the odeint signature func(y, t, *args)
+    :param y0: initial values
+    :param t_span: (start, limit) of the independent variable; the limit is only a safeguard
+    :param event: function of (t, y) that is zero at the target, e.g. from state_event or conversion_event; an
+                  optional "direction" attribute restricts which crossings count
+    :param args: extra arguments for func and jac
+    :param jac: optional Jacobian with the odeint "Dfun" signature, jac(y, t, *args)
+    :param num_points: if given, the solution is reported on this many evenly spaced points from the start to
+                       the end point (the event, if found); otherwise at the integrator's steps
+    :param method: solve_ivp method; LSODA is the integrator odeint uses
+    :param rtol: relative tolerance
+    :param atol: absolute tolerance
+    :return: EventResult with the event location (t_event, y_event), the solution grid t, the solution y with
+             shape [len(t), len(y0)] as from odeint, and whether the event was found
+    """
+    def terminal_event(t, y):
+        return event(t, y)
+    terminal_event.terminal = True
+    terminal_event.direction = getattr(event, 'direction', 0)
+
+    def rhs(t, y):
+        return func(y, t, *args)
+
+    ivp_jac = None
+    if jac is not None:
+        def ivp_jac(t, y):
+            return jac(y, t, *args)
+
+    sol = solve_ivp(rhs, t_span, np.atleast_1d(np.asarray(y0, dtype=float)), method=method, jac=ivp_jac,
+                    events=terminal_event, dense_output=num_points is not None, rtol=rtol, atol=atol)
+    if sol.status == -1:
+        raise InvalidDataError("Integration failed: {}".format(sol.message))
+    found = len(sol.t_events[0]) > 0
+    t_event = sol.t_events[0][0] if found else None
+    y_event = sol.y_events[0][0] if found else None
+    if num_points is None:
+        t = sol.t
+        y = sol.y.T
+    else:
+        t = np.linspace(t_span[0], sol.t[-1], num_points)
+        y = sol.sol(t).T
+    return EventResult(t_event, y_event, t, y, found)
@@ -0,0 +1,332 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Figures for the lecture scripts. matplotlib is imported on first use, not with this module, so scripts that
+only compute (or that choose a backend first) do not pay for it.
+The figure mode (one of FIG_MODES, from the CHE344_FIG_MODE environment variable or set_fig_mode) chooses
+what make_fig, save_figure and FigureTemplate do: draw with the configured backend, draw with the
+non-interactive Agg backend, or, for compute-only runs, record what would have been plotted without ever
+importing matplotlib (see recorded_figures).
+"""
+from __future__ import print_function
+import os
+from umich_che344.constants import InvalidDataError
+from umich_che344.instrument import timed
+
+__author__ = 'hbmayes'
+
+# for figures
+DEF_FIG_WIDTH = 10
+DEF_FIG_HEIGHT = 6
+DEF_AXIS_SIZE = 20
+DEF_TICK_SIZE = 15
+DEF_FIG_DIR = './figs/'
+
+# text rendering modes for make_fig
+TEXT_USETEX = 'usetex'  # all text through LaTeX (slowest; the original behavior)
+TEXT_MATHTEXT = 'mathtext'  # matplotlib's built-in mathtext only; never starts LaTeX
+TEXT_AUTO = 'auto'  # mathtext for the strings it can render, LaTeX only for the others
+TEXT_MODES = (TEXT_USETEX, TEXT_MATHTEXT, TEXT_AUTO)
+DEF_TEXT_MODE = os.environ.get('CHE344_TEXT_MODE', TEXT_USETEX)
+# LaTeX commands that mathtext does not know; dropped when a label must be drawn by mathtext
+LATEX_ONLY_COMMANDS = ('\\displaystyle', '\\textstyle')
+
+# figure modes
+FIG_DRAW = 'draw'  # draw and save with matplotlib's configured backend (the original behavior)
+FIG_AGG = 'agg'  # draw and save with the non-interactive Agg backend, e.g. for batch runs without a display
+FIG_RECORD = 'record'  # compute only: never import matplotlib; record each figure's name and data instead
+FIG_MODES = (FIG_DRAW, FIG_AGG, FIG_RECORD)
+DEF_FIG_MODE = os.environ.get('CHE344_FIG_MODE', FIG_DRAW)
+
+
+# FIGURES
+
+_FIG_STATE = {'mode': DEF_FIG_MODE}
+# what make_fig, save_figure and FigureTemplate.plot would have drawn, in FIG_RECORD mode
+_RECORDED_FIGS = []
+# memoized results of mathtext_can_render, as the same labels appear in many figures
+_MATHTEXT_OK = {}
+_MATHTEXT_PARSER = []
+
+
+def set_fig_mode(fig_mode):
+    """
+    :param fig_mode: one of FIG_MODES, for all later figures in this process
+    """
+    if fig_mode not in FIG_MODES:
+        raise InvalidDataError("Unknown fig_mode '{}'; choose from: {}".format(fig_mode, FIG_MODES))
+    _FIG_STATE['mode'] = fig_mode
+
+
+def get_fig_mode():
+    fig_mode = _FIG_STATE['mode']
+    if fig_mode not in FIG_MODES:
+        raise InvalidDataError("Unknown fig_mode '{}'; choose from: {}".format(fig_mode, FIG_MODES))
+    return fig_mode
+
+
+def recorded_figures():
+    """
+    :return: list of dicts, one per figure that would have been saved or drawn in FIG_RECORD mode, with its
+             name, fig_dir, whether it would have been saved, and its curves as (label, x, y) tuples (the arrays
+             are not copied); make_fig records also have the axis labels and any fills as (x, y) tuples
+    """
+    return list(_RECORDED_FIGS)
+
+
+def clear_recorded_figures():
+    del _RECORDED_FIGS[:]
+
+
+def _pyplot():
+    """
+    :return: matplotlib.pyplot, imported on first use, after choosing the Agg backend in FIG_AGG mode
+    """
+    if get_fig_mode() == FIG_AGG:
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def mathtext_can_render(text):
+    """
+    Checks whether matplotlib's built-in mathtext can draw a string, so LaTeX is only needed for the others
+    :param text: label string, possibly with $...$ math
+    :return: boolean
+    """
+    if text not in _MATHTEXT_OK:
+        if not _MATHTEXT_PARSER:
+            from matplotlib.mathtext import MathTextParser
+            _MATHTEXT_PARSER.append(MathTextParser('path'))
+        try:
+            _MATHTEXT_PARSER[0].parse(text)
+            _MATHTEXT_OK[text] = True
+        except ValueError:
+            _MATHTEXT_OK[text] = False
+    return _MATHTEXT_OK[text]
+
+
+def text_for_mode(text, text_mode):
+    """
+    Decides how a label is drawn in the given text mode
+    :param text: label string
+    :param text_mode: one of TEXT_MODES
+    :return: the (possibly simplified) label and a boolean for whether to render it with LaTeX
+    """
+    if text_mode == TEXT_USETEX:
+        return text, True
+    if mathtext_can_render(text):
+        return text, False
+    if text_mode == TEXT_AUTO:
+        return text, True
+    for command in LATEX_ONLY_COMMANDS:
+        text = text.replace(command, '')
+    if mathtext_can_render(text):
+        return text, False
+    # show the raw string rather than fail when the figure is drawn
+    return text.replace('$', r'\$'), False
+
+
+def _apply_text_mode(ax, text_mode):
+    """
+    Sets the rendering of the axis labels and legend entries; tick labels are numbers, which mathtext handles
+    """
+    if text_mode == TEXT_USETEX:
+        return
+    texts = [ax.xaxis.label, ax.yaxis.label]
+    legend = ax.get_legend()
+    if legend is not None:
+        texts.extend(legend.get_texts())
+    for text in texts:
+        label, usetex = text_for_mode(text.get_text(), text_mode)
+        text.set_text(label)
+        text.set_usetex(usetex)
+
+
+@timed('save_figure')
+def save_figure(name, save_fig=True, fig_dir=DEF_FIG_DIR, fig=None, close_fig=True):
+    """
+    Specifies where and if to save a created figure
+    :param name: Name for the file
+    :param save_fig: boolean as to whether to save fig; defaults to true (specify False if not desired)
+    :param fig_dir: location to save; defaults to a "figs" subfolder; can specify a directory such as
+                    './' (current directory)
+    :param fig: figure to save; defaults to the current figure
+    :param close_fig: boolean as to whether to close the figure afterwards, so that long runs do not keep every
+                      figure in memory; specify False to keep drawing on it
+    :return: n/a
+    """
+    if get_fig_mode() == FIG_RECORD:
+        _RECORDED_FIGS.append({'name': name, 'fig_dir': fig_dir, 'saved': bool(save_fig), 'curves': []})
+        return
+    plt = _pyplot()
+    if fig is None:
+        fig = plt.gcf()
+    if save_fig:
+        if not os.path.exists(fig_dir):
+            os.makedirs(fig_dir)
+        fig.savefig(fig_dir + name, bbox_inches='tight')
+    if close_fig:
+        plt.close(fig)
+
+
+@timed('make_fig')
+def make_fig(name, x_array, y1_array, y1_label="", ls1="-", color1="blue",
+             x2_array=None, y2_array=None, y2_label="", ls2='--', color2='orange',
+             x3_array=None, y3_array=None, y3_label="", ls3=':',
+             x4_array=None, y4_array=None, y4_label="", ls4='-.',
+             x5_array=None, y5_array=None, y5_label="", ls5='-', color4='red',
+             x_fill=None, y_fill=None, x2_fill=None, y2_fill=None,
+             fill1_label=None, fill2_label=None,
+             fill_color_1="green", fill_color_2="blue",
+             x_label="", y_label="", x_lima=None, x_limb=None, y_lima=None, y_limb=None, loc=0,
+             fig_width=DEF_FIG_WIDTH, fig_height=DEF_FIG_HEIGHT, axis_font_size=DEF_AXIS_SIZE,
+             tick_font_size=DEF_TICK_SIZE, fig_dir=DEF_FIG_DIR, text_mode=None, save_fig=True, close_fig=True):
+    """
+    Many defaults to it is easy to adjust
+    The text_mode (one of TEXT_MODES) defaults to DEF_TEXT_MODE, which can be set with the CHE344_TEXT_MODE
+    environment variable. LaTeX keeps its own on-disk cache of rendered strings (matplotlib's tex.cache),
+    which is shared by all figures and processes.
+    The figure is closed once saved unless close_fig is False; for many plots with the same layout, see
+    FigureTemplate.
+    With instrumentation enabled (see instrument), building and saving the figure are timed as the "make_fig"
+    and "save_figure" phases.
+    In FIG_RECORD mode nothing is drawn; the call is added to recorded_figures.
+    :return: the figure and its axes, or None, None in FIG_RECORD mode
+    """
+    if text_mode is None:
+        text_mode = DEF_TEXT_MODE
+    if text_mode not in TEXT_MODES:
+        raise InvalidDataError("Unknown text_mode '{}'; choose from: {}".format(text_mode, TEXT_MODES))
+    if get_fig_mode() == FIG_RECORD:
+        curves = [(y1_label, x_array, y1_array)]
+        for label, x_vals, y_vals in ((y2_label, x2_array, y2_array), (y3_label, x3_array, y3_array),
+                                      (y4_label, x4_array, y4_array), (y5_label, x5_array, y5_array)):
+            if y_vals is not None:
+                curves.append((label, x_array if x_vals is None else x_vals, y_vals))
+        fills = [(x_vals, y_vals) for x_vals, y_vals in ((x_fill, y_fill), (x2_fill, y2_fill)) if x_vals is not None]
+        _RECORDED_FIGS.append({'name': name, 'fig_dir': fig_dir, 'saved': bool(save_fig and name is not None),
+                               'curves': curves, 'fills': fills, 'x_label': x_label, 'y_label': y_label})
+        return None, None
+    plt = _pyplot()
+    from matplotlib import rc
+    from matplotlib.patches import Rectangle
+    from matplotlib.ticker import AutoMinorLocator
+    rc('text', usetex=(text_mode == TEXT_USETEX))
+    # a general purpose plotting routine; can plot between 1 and 5 curves
+    fig, ax = plt.subplots(figsize=(fig_width, fig_height))
+    ax.plot(x_array, y1_array, ls1, label=y1_label, linewidth=2, color=color1)
+    if y2_array is not None:
+        if x2_array is None:
+            x2_array = x_array
+        ax.plot(x2_array, y2_array, label=y2_label, ls=ls2, linewidth=2, color=color2)
+    if y3_array is not None:
+        if x3_array is None:
+            x3_array = x_array
+        ax.plot(x3_array, y3_array, label=y3_label, ls=ls3, linewidth=3, color='green')
+    if y4_array is not None:
+        if x4_array is None:
+            x4_array = x_array
+        ax.plot(x4_array, y4_array, label=y4_label, ls=ls4, linewidth=3, color=color4)
+    if y5_array is not None:
+        if x5_array is None:
+            x5_array = x_array
+        ax.plot(x5_array, y5_array, label=y5_label, ls=ls5, linewidth=3, color='purple')
+    ax.set_xlabel(x_label, fontsize=axis_font_size)
+    ax.set_ylabel(y_label, fontsize=axis_font_size)
+    if x_limb is not None:
+        if x_lima is None:
+            x_lima = 0.0
+        ax.set_xlim([x_lima, x_limb])
+
+    if y_limb is not None:
+        if y_lima is None:
+            y_lima = 0.0
+        ax.set_ylim([y_lima, y_limb])
+
+    if x_fill is not None:
+        ax.fill_between(x_fill, y_fill, 0, color=fill_color_1, alpha=0.75)
+
+    if x2_fill is not None:
+        ax.fill_between(x2_fill, y2_fill, 0, color=fill_color_2, alpha=0.5)
+
+    ax.tick_params(labelsize=tick_font_size)
+    ax.xaxis.set_minor_locator(AutoMinorLocator(5))
+    ax.yaxis.set_minor_locator(AutoMinorLocator(5))
+    if len(y1_label) > 0:
+        ax.legend(loc=loc, fontsize=tick_font_size, )
+    if fill1_label and fill2_label:
+        p1 = Rectangle((0, 0), 1, 1, fc=fill_color_1, alpha=0.75)
+        p2 = Rectangle((0, 0), 1, 1, fc=fill_color_2, alpha=0.5)
+        ax.legend([p1, p2], [fill1_label, fill2_label], loc=loc, fontsize=tick_font_size, )
+    ax.xaxis.grid(True, 'minor')
+    ax.yaxis.grid(True, 'minor')
+    ax.xaxis.grid(True, 'major', linewidth=1)
+    ax.yaxis.grid(True, 'major', linewidth=1)
+    _apply_text_mode(ax, text_mode)
+    save_figure(name, save_fig=save_fig, fig_dir=fig_dir, fig=fig, close_fig=close_fig)
+    return fig, ax
+
+
+class FigureTemplate(object):
+    """
+    A figure that is built once by make_fig and then reused for many plots with the same layout: each call to
+    "plot" replaces the line data in place with set_data and saves, rather than building a new figure.
+    Axis labels, limits, fills and legend are those given when the template is created. Use "close" (or a
+    "with" block) when done.
+    """
+    def __init__(self, x_array, y1_array, **kwargs):
+        """
+        :param x_array: x values for the initial plot
+        :param y1_array: y values for the initial plot
+        :param kwargs: any other make_fig keyword arguments; each y#_array given sets up one more line
+        """
+        self.fig_dir = kwargs.pop('fig_dir', DEF_FIG_DIR)
+        if get_fig_mode() == FIG_RECORD:
+            # nothing to draw on; keep the labels for the recorded plots
+            self.fig = self.ax = None
+            num_lines = 1 + sum(kwargs.get('y{}_array'.format(num)) is not None for num in range(2, 6))
+            self.lines = [kwargs.get('y{}_label'.format(num), "") for num in range(1, num_lines + 1)]
+            return
+        kwargs.update(save_fig=False, close_fig=False)
+        self.fig, self.ax = make_fig(None, x_array, y1_array, **kwargs)
+        self.lines = self.ax.get_lines()
+
+    def plot(self, name, x_array, y_arrays, x_arrays=None, save_fig=True):
+        """
+        Replaces the data of every line and saves the figure
+        :param name: Name for the file
+        :param x_array: x values shared by all lines
+        :param y_arrays: list of y values, one per line, in the order y1, y2, ... given to the template
+        :param x_arrays: optional list of x values per line; None entries use x_array
+        :param save_fig: boolean as to whether to save fig
+        """
+        if len(y_arrays) != len(self.lines):
+            raise InvalidDataError("Template has {} lines but {} y arrays were given".format(len(self.lines),
+                                                                                            len(y_arrays)))
+        if self.fig is None:
+            curves = [(label, x_array if x_arrays is None or x_arrays[line_id] is None else x_arrays[line_id],
+                       y_arrays[line_id]) for line_id, label in enumerate(self.lines)]
+            _RECORDED_FIGS.append({'name': name, 'fig_dir': self.fig_dir, 'saved': bool(save_fig),
+                                   'curves': curves})
+            return
+        for line_id, line in enumerate(self.lines):
+            if x_arrays is None or x_arrays[line_id] is None:
+                line.set_data(x_array, y_arrays[line_id])
+            else:
+                line.set_data(x_arrays[line_id], y_arrays[line_id])
+        # only rescales axes without limits given to the template
+        self.ax.relim()
+        self.ax.autoscale_view()
+        save_figure(name, save_fig=save_fig, fig_dir=self.fig_dir, fig=self.fig, close_fig=False)
+
+    def close(self):
+        if self.fig is not None:
+            _pyplot().close(self.fig)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
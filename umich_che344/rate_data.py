@@ -0,0 +1,138 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Smooth models of tabulated rate data (e.g. F_A0/-r_A at a few conversions), fitted once as piecewise polynomials
+and reused. Fits are cached by the data, so rebuilding a model from the same table (as each figure or each
+optimizer step does) costs a dictionary lookup. The antiderivative of the fit is kept too, so the PFR volume over
+any conversion range is an exact evaluation of the piecewise polynomial rather than a numerical integration.
+"""
+from __future__ import print_function
+from collections import OrderedDict
+import numpy as np
+from scipy import interpolate
+from umich_che344.common import InvalidDataError
+
+__author__ = 'hbmayes'
+
+SPLINE_CUBIC = 'cubic'  # not-a-knot cubic spline, as from splrep(x, y, s=0)
+SPLINE_QUADRATIC = 'quadratic'  # quadratic interpolating spline, as from interp1d(x, y, kind='quadratic')
+SPLINE_PCHIP = 'pchip'  # monotone piecewise cubic; no overshoot between the points
+SPLINE_KINDS = (SPLINE_CUBIC, SPLINE_QUADRATIC, SPLINE_PCHIP)
+
+MAX_CACHED_FITS = 256
+# (kind, extrapolate, x bytes, y bytes) -> (spline, antiderivative), least recently used first
+_FIT_CACHE = OrderedDict()
+_CACHE_STATS = {'hits': 0, 'misses': 0}
+
+
+def _fit(x, y, kind, extrapolate):
+    """
+    :return: the interpolating spline and its antiderivative, as scipy PPoly objects
+    """
+    if kind == SPLINE_CUBIC:
+        spline = interpolate.CubicSpline(x, y, bc_type='not-a-knot', extrapolate=extrapolate)
+    elif kind == SPLINE_QUADRATIC:
+        spline = interpolate.PPoly.from_spline(interpolate.make_interp_spline(x, y, k=2), extrapolate=extrapolate)
+    else:
+        spline = interpolate.PchipInterpolator(x, y, extrapolate=extrapolate)
+    return spline, spline.antiderivative()
+
+
+def fit_cache_info():
+    """
+    :return: dict with the number of cached fits and the cache hits and misses so far
+    """
+    return {'size': len(_FIT_CACHE), 'hits': _CACHE_STATS['hits'], 'misses': _CACHE_STATS['misses']}
+
+
+def clear_fit_cache():
+    _FIT_CACHE.clear()
+    _CACHE_STATS['hits'] = 0
+    _CACHE_STATS['misses'] = 0
+
+
+class RateDataModel(object):
+    """
+    Interpolating spline through tabulated values of, e.g., F_A0/-r_A versus conversion
+    """
+    def __init__(self, x, y, kind=SPLINE_CUBIC, extrapolate=False):
+        """
+        :param x: conversions (or other independent values), strictly increasing
+        :param y: tabulated values at x
+        :param kind: one of SPLINE_KINDS
+        :param extrapolate: whether to extend the end polynomials beyond the data; otherwise queries outside
+                            the data give NaN
+        """
+        if kind not in SPLINE_KINDS:
+            raise InvalidDataError("Unknown spline kind '{}'; choose from: {}".format(kind, SPLINE_KINDS))
+        self.x = np.array(x, dtype=float)
+        self.y = np.array(y, dtype=float)
+        if self.x.ndim != 1 or self.x.shape != self.y.shape:
+            raise InvalidDataError("Expected 1D x and y of the same length, but found shapes {} and {}".format(
+                self.x.shape, self.y.shape))
+        if np.any(np.diff(self.x) <= 0):
+            raise InvalidDataError("Expected strictly increasing x values, but found: {}".format(self.x))
+        self.kind = kind
+        self.extrapolate = extrapolate
+
+        key = (kind, bool(extrapolate), self.x.tobytes(), self.y.tobytes())
+        fit = _FIT_CACHE.pop(key, None)
+        if fit is None:
+            _CACHE_STATS['misses'] += 1
+            try:
+                fit = _fit(self.x, self.y, kind, extrapolate)
+            except ValueError as e:
+                raise InvalidDataError("Could not fit a {} spline to {} points: {}".format(kind, len(self.x), e))
+            if len(_FIT_CACHE) >= MAX_CACHED_FITS:
+                _FIT_CACHE.popitem(last=False)
+        else:
+            _CACHE_STATS['hits'] += 1
+        _FIT_CACHE[key] = fit
+        self.spline, self.antiderivative = fit
+
+    @classmethod
+    def from_rates(cls, x, rates, fao, kind=SPLINE_CUBIC, extrapolate=False):
+        """
+        Model of the Levenspiel curve F_A0 / -r_A from measured rates
+        :param x: conversions
+        :param rates: rates of disappearance (-r_A) at those conversions
+        :param fao: molar flow rate of A at zero conversion
+        :param kind: one of SPLINE_KINDS
+        :param extrapolate: whether to extend the end polynomials beyond the data
+        :return: RateDataModel
+        """
+        return cls(x, np.divide(fao, np.asarray(rates, dtype=float)), kind=kind, extrapolate=extrapolate)
+
+    def __call__(self, x_vals, der=0):
+        """
+        :param x_vals: values at which to evaluate the model
+        :param der: order of derivative to return
+        :return: model values (or derivatives)
+        """
+        return self.spline(x_vals, nu=der)
+
+    def integral(self, x_low, x_high):
+        """
+        Exact integral of the model, for arrays of limits that broadcast together
+        :param x_low: lower limit(s)
+        :param x_high: upper limit(s)
+        :return: integral(s) from x_low to x_high
+        """
+        return self.antiderivative(x_high) - self.antiderivative(x_low)
+
+    def pfr_volume(self, x_out, x_in=0.0):
+        """
+        :param x_out: outlet conversion(s)
+        :param x_in: inlet conversion(s)
+        :return: PFR volume(s), for a model of F_A0 / -r_A
+        """
+        return self.integral(x_in, x_out)
+
+    def cstr_volume(self, x_out, x_in=0.0):
+        """
+        :param x_out: outlet conversion(s)
+        :param x_in: inlet conversion(s)
+        :return: CSTR volume(s), for a model of F_A0 / -r_A
+        """
+        x_out = np.asarray(x_out, dtype=float)
+        return (x_out - x_in) * self(x_out)
@@ -0,0 +1,332 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Builds reactor models from a reaction network instead of hand-coding each right-hand side. A network is a list of
+species and of reactions, each given as a dict such as
+    {'stoich': {'A': -1, 'B': 3, 'C': 1}, 'k': 2.0, 'keq': 0.004}
+for the elementary reversible reaction A <--> 3B + C. Rates follow mass action: the forward rate is
+k * prod(C_i ** order_i), with orders defaulting to the reactant coefficients ('orders' overrides them). A
+reaction is reversible if 'k_rev' or 'keq' (k_rev = k / keq) is given, with reverse orders defaulting to the
+product coefficients ('rev_orders' overrides them).
+
+ReactionNetwork.compile returns a CompiledReactor whose rhs and jac have the odeint signature (y, x). The
+right-hand side is the stoichiometry matrix times the rate vector, S @ r, evaluated with arrays set up once, and
+the Jacobian is assembled analytically on a sparsity pattern found when compiling. Reactor types:
+    batch      state: concentrations; dC/dt = S r
+    semibatch  state: moles; V = vol_0 + nu_in t, dN/dt = nu_in C_in + V S r
+    pbr        state: molar flows, plus the pressure ratio p = P/P0 if alpha is given; dF/dW = S r'
+    membrane   as pbr, with species permeating out: dF_i/dW = (S r')_i - kc_i C_i
+Flow reactors are liquid phase (C = F / nu_0) or isothermal gas phase (C_i = C_T0 F_i / F_T p), with
+dp/dW = -alpha F_T / (2 F_T0 p). Unlike lect9.sys_odes, gas-phase concentrations include the pressure ratio.
+"""
+from __future__ import print_function
+import numpy as np
+from scipy import sparse
+from umich_che344.constants import InvalidDataError
+
+__author__ = 'hbmayes'
+
+BATCH = 'batch'
+SEMIBATCH = 'semibatch'
+PBR = 'pbr'
+MEMBRANE = 'membrane'
+REACTOR_TYPES = (BATCH, SEMIBATCH, PBR, MEMBRANE)
+FLOW_REACTORS = (PBR, MEMBRANE)
+PRESSURE = 'p'
+
+
+class ReactionNetwork(object):
+    """
+    Species, stoichiometry and mass-action rate laws of a set of reactions
+    """
+    def __init__(self, species, reactions):
+        """
+        :param species: list of species names; this order is used for all state vectors
+        :param reactions: list of dicts with 'stoich' (dict of species to stoichiometric coefficient, negative
+                          for reactants) and 'k', and optionally 'orders', 'k_rev' or 'keq', and 'rev_orders'
+        """
+        self.species = list(species)
+        if len(set(self.species)) != len(self.species):
+            raise InvalidDataError("Species names must be unique")
+        self.index = {name: idx for idx, name in enumerate(self.species)}
+        self.num_species = len(self.species)
+        self.num_reactions = len(reactions)
+
+        rows, cols, coeffs = [], [], []
+        # each rate term (forward or reverse) is a rate constant times a product of powers of concentrations
+        terms = []
+        for rxn_id, reaction in enumerate(reactions):
+            stoich = self.species_dict(reaction.get('stoich'), 'stoich', rxn_id)
+            if 'k' not in reaction:
+                raise InvalidDataError("Reaction {} has no rate constant 'k'".format(rxn_id))
+            for name, coeff in stoich.items():
+                if coeff != 0:
+                    rows.append(self.index[name])
+                    cols.append(rxn_id)
+                    coeffs.append(float(coeff))
+            orders = reaction.get('orders', {name: -coeff for name, coeff in stoich.items() if coeff < 0})
+            terms.append((rxn_id, float(reaction['k']), self.species_dict(orders, 'orders', rxn_id)))
+            if 'k_rev' in reaction or 'keq' in reaction:
+                k_rev = reaction['k_rev'] if 'k_rev' in reaction else reaction['k'] / reaction['keq']
+                rev_orders = reaction.get('rev_orders', {name: coeff for name, coeff in stoich.items()
+                                                         if coeff > 0})
+                terms.append((rxn_id, -float(k_rev), self.species_dict(rev_orders, 'rev_orders', rxn_id)))
+        self.stoich = sparse.csr_matrix((coeffs, (rows, cols)), shape=(self.num_species, self.num_reactions))
+
+        # padded [num_terms, max_slots] tables of the species and orders in each term; padding points at a
+        # concentration fixed at 1.0 (index num_species) with order 0
+        max_slots = max([len(orders) for _, _, orders in terms] + [1])
+        self._term_rxn = np.array([term[0] for term in terms], dtype=int)
+        self._term_k = np.array([term[1] for term in terms])
+        self._slot_species = np.full((len(terms), max_slots), self.num_species, dtype=int)
+        self._slot_orders = np.zeros((len(terms), max_slots))
+        for term_id, (_, _, orders) in enumerate(terms):
+            for slot, (name, order) in enumerate(sorted(orders.items())):
+                self._slot_species[term_id, slot] = self.index[name]
+                self._slot_orders[term_id, slot] = order
+        self._conc_pad = np.ones(self.num_species + 1)
+        self._build_jac_pattern()
+
+    def species_dict(self, values, key='values', rxn_id=None):
+        """
+        :param values: dict of species name to value
+        :param key: name of the values, for error messages
+        :param rxn_id: reaction number, for error messages
+        :return: the dict, after checking that every name is a species of the network
+        """
+        where = '' if rxn_id is None else ' of reaction {}'.format(rxn_id)
+        if not isinstance(values, dict):
+            raise InvalidDataError("Expected a dict of species to values for '{}'{}".format(key, where))
+        unknown = sorted(set(values) - set(self.index))
+        if unknown:
+            raise InvalidDataError("Unknown species {} in '{}'{}; network species: {}".format(
+                unknown, key, where, self.species))
+        return values
+
+    def vector(self, values, default=0.0):
+        """
+        :param values: dict of species name to value
+        :param default: value for species not in the dict
+        :return: array of the values in species order
+        """
+        result = np.full(self.num_species, default, dtype=float)
+        for name, value in self.species_dict(values).items():
+            result[self.index[name]] = value
+        return result
+
+    def _build_jac_pattern(self):
+        """
+        Finds the nonzero pattern of d(S r)/dC and, for each (term, slot) derivative, where it is added
+        """
+        stoich = self.stoich.tocsc()
+        # (term, slot) pairs with a nonzero order, i.e. each rate term's dependence on one species
+        pair_term, pair_slot = np.nonzero(self._slot_orders)
+        out_rows, out_cols, out_pairs, out_coeffs = [], [], [], []
+        for pair_id, (term_id, slot) in enumerate(zip(pair_term, pair_slot)):
+            rxn_id = self._term_rxn[term_id]
+            start, end = stoich.indptr[rxn_id], stoich.indptr[rxn_id + 1]
+            out_rows.extend(stoich.indices[start:end])
+            out_cols.extend([self._slot_species[term_id, slot]] * (end - start))
+            out_pairs.extend([pair_id] * (end - start))
+            out_coeffs.extend(stoich.data[start:end])
+        # unique (row, col) keys in row-major order are exactly the CSR order
+        keys = np.array(out_rows, dtype=int) * self.num_species + np.array(out_cols, dtype=int)
+        keys, self._jac_pos = np.unique(keys, return_inverse=True)
+        self._jac_indices = keys % self.num_species
+        self._jac_indptr = np.searchsorted(keys // self.num_species, np.arange(self.num_species + 1))
+        self._pair_term = pair_term
+        self._pair_slot = pair_slot
+        self._jac_pairs = np.array(out_pairs, dtype=int)
+        self._jac_coeffs = np.array(out_coeffs, dtype=float)
+
+    def rates(self, conc, out=None):
+        """
+        :param conc: concentrations in species order
+        :param out: optional array of length num_reactions to hold the result
+        :return: net rate of each reaction
+        """
+        self._conc_pad[:-1] = conc
+        powers = self._conc_pad[self._slot_species] ** self._slot_orders
+        term_rates = self._term_k * np.prod(powers, axis=1)
+        if out is None:
+            out = np.empty(self.num_reactions)
+        out[:] = np.bincount(self._term_rxn, weights=term_rates, minlength=self.num_reactions)
+        return out
+
+    def conc_jac(self, conc):
+        """
+        :param conc: concentrations in species order
+        :return: sparse [num_species, num_species] matrix of d(S r)_i / dC_j
+        """
+        self._conc_pad[:-1] = conc
+        slot_conc = self._conc_pad[self._slot_species]
+        powers = slot_conc ** self._slot_orders
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d_powers = np.where(self._slot_orders != 0,
+                                self._slot_orders * slot_conc ** (self._slot_orders - 1.0), 0.0)
+        # derivative of each term with respect to the species in one slot: that slot's power is differentiated
+        pair_vals = d_powers[self._pair_term, self._pair_slot] * self._term_k[self._pair_term]
+        for slot in range(powers.shape[1]):
+            others = self._pair_slot != slot
+            pair_vals[others] *= powers[self._pair_term[others], slot]
+        data = np.bincount(self._jac_pos, weights=self._jac_coeffs * pair_vals[self._jac_pairs],
+                           minlength=len(self._jac_indices))
+        return sparse.csr_matrix((data, self._jac_indices, self._jac_indptr),
+                                 shape=(self.num_species, self.num_species))
+
+    def compile(self, reactor, **params):
+        """
+        :param reactor: one of REACTOR_TYPES
+        :param params: reactor parameters; see CompiledReactor
+        :return: CompiledReactor
+        """
+        return CompiledReactor(self, reactor, **params)
+
+
+class CompiledReactor(object):
+    """
+    Right-hand side and Jacobian of one reactor type for a ReactionNetwork, for use with odeint as
+    odeint(reactor.rhs, y0, x, Dfun=reactor.jac), or with solve_ivp through reactor.jac_sparse
+    """
+    def __init__(self, network, reactor, vol_0=None, nu_in=0.0, c_in=None, nu_0=None, cto=None, fto=None,
+                 alpha=None, kc=None):
+        """
+        :param network: ReactionNetwork
+        :param reactor: one of REACTOR_TYPES
+        :param vol_0: semibatch initial volume
+        :param nu_in: semibatch feed volumetric flow rate
+        :param c_in: semibatch dict of feed concentrations
+        :param nu_0: liquid-phase flow reactor volumetric flow rate
+        :param cto: gas-phase flow reactor total inlet concentration
+        :param fto: gas-phase flow reactor total inlet molar flow rate; needed with alpha
+        :param alpha: gas-phase flow reactor pressure drop parameter; if given, the pressure ratio is the last state
+        :param kc: membrane reactor dict of species to mass transfer coefficient
+        """
+        if reactor not in REACTOR_TYPES:
+            raise InvalidDataError("Unknown reactor type '{}'; choose from: {}".format(reactor, REACTOR_TYPES))
+        given = {name for name, value in (('vol_0', vol_0), ('c_in', c_in), ('nu_0', nu_0), ('cto', cto),
+                                          ('fto', fto), ('alpha', alpha), ('kc', kc)) if value is not None}
+        if nu_in:
+            given.add('nu_in')
+        allowed = {BATCH: set(), SEMIBATCH: {'vol_0', 'nu_in', 'c_in'}, PBR: {'nu_0', 'cto', 'fto', 'alpha'}}
+        allowed[MEMBRANE] = allowed[PBR] | {'kc'}
+        if given - allowed[reactor]:
+            raise InvalidDataError("Parameters {} do not apply to a {} reactor".format(
+                sorted(given - allowed[reactor]), reactor))
+        if reactor == SEMIBATCH and vol_0 is None:
+            raise InvalidDataError("A semibatch reactor needs vol_0")
+        if reactor in FLOW_REACTORS and (nu_0 is None) == (cto is None):
+            raise InvalidDataError("A {} reactor needs either nu_0 (liquid phase) or cto (gas phase)".format(reactor))
+        if alpha is not None and (cto is None or fto is None):
+            raise InvalidDataError("Pressure drop (alpha) needs a gas-phase reactor with cto and fto")
+        if reactor == MEMBRANE and kc is None:
+            raise InvalidDataError("A membrane reactor needs kc")
+
+        self.network = network
+        self.reactor = reactor
+        self.vol_0 = vol_0
+        self.nu_in = nu_in
+        self.feed = nu_in * network.vector(c_in or {})
+        self.nu_0 = nu_0
+        self.cto = cto
+        self.fto = fto
+        self.alpha = alpha
+        self.kc = None if kc is None else network.vector(kc)
+        self.gas = cto is not None
+        num_species = network.num_species
+        self.state_names = network.species + ([PRESSURE] if alpha is not None else [])
+        self.num_states = len(self.state_names)
+        self._conc = np.empty(num_species)
+        self._rates = np.empty(network.num_reactions)
+
+    def conc(self, y, x):
+        """
+        :param y: state vector
+        :param x: independent variable (time or catalyst weight)
+        :return: concentrations in species order (a buffer that is reused on the next call)
+        """
+        flows = y[:self.network.num_species]
+        if self.reactor == BATCH:
+            self._conc[:] = flows
+        elif self.reactor == SEMIBATCH:
+            np.divide(flows, self.vol_0 + self.nu_in * x, out=self._conc)
+        elif self.gas:
+            p = y[-1] if self.alpha is not None else 1.0
+            np.multiply(flows, self.cto * p / np.sum(flows), out=self._conc)
+        else:
+            np.divide(flows, self.nu_0, out=self._conc)
+        return self._conc
+
+    def rhs(self, y, x, out=None):
+        """
+        :param y: state vector
+        :param x: independent variable (time or catalyst weight)
+        :param out: optional array of length num_states to hold the result
+        :return: dy/dx
+        """
+        network = self.network
+        conc = self.conc(y, x)
+        rates = network.rates(conc, out=self._rates)
+        if out is None:
+            out = np.empty(self.num_states)
+        out[:network.num_species] = network.stoich.dot(rates)
+        if self.reactor == SEMIBATCH:
+            out[:network.num_species] *= self.vol_0 + self.nu_in * x
+            out[:network.num_species] += self.feed
+        elif self.reactor == MEMBRANE:
+            out[:network.num_species] -= self.kc * conc
+        if self.alpha is not None:
+            out[-1] = -self.alpha * np.sum(y[:-1]) / (2.0 * self.fto * y[-1])
+        return out
+
+    def jac_sparse(self, y, x):
+        """
+        Analytical Jacobian of rhs. Batch, semibatch and liquid-phase reactors keep the sparsity of the network;
+        in gas-phase reactors the total molar flow couples every flow, so rows with reactions are dense.
+        :param y: state vector
+        :param x: independent variable (time or catalyst weight)
+        :return: sparse [num_states, num_states] matrix of d rhs_i / d y_j
+        """
+        network = self.network
+        conc = self.conc(y, x)
+        jac_c = network.conc_jac(conc)
+        if self.reactor == MEMBRANE:
+            jac_c = jac_c - sparse.diags(self.kc)
+        # semibatch: d(V S r)/dN = V d(S r)/dC / V, so the concentration Jacobian applies directly
+        if self.reactor in (BATCH, SEMIBATCH):
+            return jac_c
+        if not self.gas:
+            return jac_c / self.nu_0
+        return sparse.csr_matrix(self._gas_jac(y, jac_c, conc))
+
+    def jac(self, y, x):
+        """
+        :param y: state vector
+        :param x: independent variable (time or catalyst weight)
+        :return: dense Jacobian of rhs, for the odeint "Dfun"
+        """
+        if self.reactor in FLOW_REACTORS and self.gas:
+            conc = self.conc(y, x)
+            jac_c = self.network.conc_jac(conc)
+            if self.reactor == MEMBRANE:
+                jac_c = jac_c - sparse.diags(self.kc)
+            return self._gas_jac(y, jac_c, conc)
+        return self.jac_sparse(y, x).toarray()
+
+    def _gas_jac(self, y, jac_c, conc):
+        """
+        Chain rule for C_i = C_T0 F_i / F_T p: dC_i/dF_k = C_T0 p / F_T (delta_ik - F_i / F_T), dC_i/dp = C_i / p
+        """
+        num_species = self.network.num_species
+        flows = y[:num_species]
+        f_total = np.sum(flows)
+        p = y[-1] if self.alpha is not None else 1.0
+        jac = np.zeros((self.num_states, self.num_states))
+        jac[:num_species, :num_species] = jac_c.toarray()
+        jac[:num_species, :num_species] -= jac_c.dot(flows / f_total)[:, np.newaxis]
+        jac[:num_species, :num_species] *= self.cto * p / f_total
+        if self.alpha is not None:
+            jac[:num_species, -1] = jac_c.dot(conc / p)
+            jac[-1, :num_species] = -self.alpha / (2.0 * self.fto * p)
+            jac[-1, -1] = self.alpha * f_total / (2.0 * self.fto * p * p)
+        return jac
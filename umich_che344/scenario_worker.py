@@ -0,0 +1,173 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Runs many model scenarios in one long-lived process, so a study pays the interpreter, NumPy and SciPy startup
+once rather than once per scenario. Scenarios are JSON lines, read from files or stdin, such as
+    {"id": "low_k", "model": "lect9", "params": {"ka": 1.0, "w_max": 20.0}, "outputs": ["p"], "final": true}
+where "model" is one of MODELS, "params" override the model's keyword defaults, "outputs" optionally selects
+which results to return, and "final" optionally returns only the last value of each array. One JSON line
+is written per scenario, as soon as it finishes, with the id, status ("ok" or "error"), seconds, and the
+results or the error message. A failed scenario is reported and the rest still run. Figures are never drawn,
+so matplotlib is not imported.
+"""
+from __future__ import print_function
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from importlib import import_module
+import numpy as np
+from umich_che344 import plotting
+from umich_che344.constants import GOOD_RET, SCENARIO_ERROR, InvalidDataError
+
+__author__ = 'hbmayes'
+
+PKG_DIR = os.path.dirname(os.path.abspath(__file__))
+# model name -> (module, function); each function takes keyword parameters and returns a dict of results
+MODELS = {
+    'lect4': ('umich_che344.lect4_graphs', 'batch_model'),
+    'lect5': ('umich_che344.lect5_graphs', 'pfr_model'),
+    'lect9': ('umich_che344.lect9', 'membrane_model'),
+    'lect11': ('umich_che344.lect11_semibatch', 'semibatch_model'),
+}
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+
+
+def get_model(model_name):
+    """
+    :param model_name: one of MODELS
+    :return: the model function; its module is imported on first use and then stays loaded
+    """
+    if model_name not in MODELS:
+        raise InvalidDataError("Unknown model '{}'; choose from: {}".format(model_name, sorted(MODELS)))
+    module_name, func_name = MODELS[model_name]
+    return getattr(import_module(module_name), func_name)
+
+
+def _to_json(value, final=False):
+    """
+    :param value: model result value
+    :param final: boolean to flag whether to return only the last value of arrays
+    :return: value as JSON-serializable lists and numbers, with None for NaN and infinite values
+    """
+    if isinstance(value, (np.ndarray, list, tuple)):
+        value = np.asarray(value)
+        if final and value.ndim > 0:
+            value = value[-1]
+        if value.dtype.kind == 'f' and not np.all(np.isfinite(value)):
+            # NaN and infinity are not valid JSON
+            value = np.where(np.isfinite(value), value, None)
+        return value.tolist()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def run_scenario(scenario):
+    """
+    :param scenario: dict with "model" and optionally "id", "params", "outputs" and "final"
+    :return: dict with the id, model, status, seconds, and the results (status "ok") or error message
+    """
+    start = time.time()
+    result = {'id': scenario.get('id'), 'model': scenario.get('model')}
+    try:
+        model = get_model(scenario.get('model'))
+        results = model(**scenario.get('params', {}))
+        outputs = scenario.get('outputs', sorted(results))
+        missing = [name for name in outputs if name not in results]
+        if missing:
+            raise InvalidDataError("Model '{}' has no outputs {}; choose from: {}".format(
+                scenario['model'], missing, sorted(results)))
+        result['results'] = {name: _to_json(results[name], scenario.get('final', False)) for name in outputs}
+        result['status'] = STATUS_OK
+    except Exception as e:
+        result['status'] = STATUS_ERROR
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+        result['traceback'] = traceback.format_exc()
+    result['seconds'] = time.time() - start
+    return result
+
+
+def iter_scenarios(lines):
+    """
+    :param lines: iterable of JSON lines; blank lines and lines starting with "#" are skipped
+    :return: generator of scenario dicts, or of error results for lines that are not JSON objects
+    """
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            scenario = json.loads(line)
+            if not isinstance(scenario, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            yield {'id': None, 'status': STATUS_ERROR, 'error': "Line {}: {}".format(line_num, e)}
+            continue
+        scenario.setdefault('id', line_num)
+        yield scenario
+
+
+def run_stream(lines, out_stream):
+    """
+    Runs each scenario and writes its result as a JSON line as soon as it finishes
+    :param lines: iterable of JSON lines
+    :param out_stream: writable text stream
+    :return: number of scenarios that failed
+    """
+    num_failed = 0
+    for scenario in iter_scenarios(lines):
+        result = scenario if scenario.get('status') == STATUS_ERROR else run_scenario(scenario)
+        if result['status'] != STATUS_OK:
+            num_failed += 1
+        out_stream.write(json.dumps(result) + '\n')
+        out_stream.flush()
+    return num_failed
+
+
+def parse_cmdline(argv=None):
+    parser = argparse.ArgumentParser(description='Runs model scenarios given as JSON lines in one process, '
+                                                 'streaming one JSON line of results per scenario. '
+                                                 'Models: {}'.format(', '.join(sorted(MODELS))))
+    parser.add_argument('files', nargs='*', default=['-'],
+                        help='Files of scenarios, one JSON object per line (default: stdin, also "-").')
+    parser.add_argument('-o', '--out_file', default=None,
+                        help='File for the results (default: stdout).')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """ Runs the main program.
+    """
+    args = parse_cmdline(argv)
+    # lecture scripts import "common" as a top-level module, as when run from this folder
+    if PKG_DIR not in sys.path:
+        sys.path.insert(0, PKG_DIR)
+    plotting.set_fig_mode(plotting.FIG_RECORD)
+
+    out_stream = sys.stdout if args.out_file is None else open(args.out_file, 'w')
+    num_failed = 0
+    try:
+        for fname in args.files:
+            if fname == '-':
+                num_failed += run_stream(sys.stdin, out_stream)
+            else:
+                with open(fname) as in_file:
+                    num_failed += run_stream(in_file, out_stream)
+    finally:
+        if out_stream is not sys.stdout:
+            out_stream.close()
+
+    if num_failed:
+        return SCENARIO_ERROR
+    return GOOD_RET  # success
+
+
+if __name__ == '__main__':
+    status = main()
+    sys.exit(status)
@@ -0,0 +1,186 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Append-only binary store for many ODE solutions (trajectories) of the same shape, such as the "sol" arrays from
+a parameter sweep. The data is kept on disk, so it does not need to fit in memory:
+    <name>.dat          raw fixed-dtype records, read as a memory map of shape [cases, points, states]
+    <name>.json         dtype, shape, and state names
+    <name>.index.jsonl  one line per case with its case id and parameters
+Appends take an exclusive lock on the data file, so worker processes can append to the same store at once.
+"""
+from __future__ import print_function
+import errno
+import json
+import numbers
+import os
+import numpy as np
+from umich_che344.common import InvalidDataError
+
+try:
+    import fcntl
+except ImportError:
+    # no file locking (e.g. on Windows): only one process should append at a time
+    fcntl = None
+
+__author__ = 'hbmayes'
+
+DATA_EXT = '.dat'
+META_EXT = '.json'
+INDEX_EXT = '.index.jsonl'
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+
+
+class TrajectoryStore(object):
+    """
+    Opens (or creates) a trajectory store. Opening an existing store only needs its name; the shape given when
+    creating it must match if specified again.
+    """
+    def __init__(self, base_name, num_points=None, num_states=None, dtype=np.float64, state_names=None):
+        """
+        :param base_name: path of the store without extension
+        :param num_points: number of points in each trajectory (e.g. len(w_cat)); needed to create a store
+        :param num_states: number of states (columns) in each trajectory; needed to create a store
+        :param dtype: data type of the stored values
+        :param state_names: optional names for the states, so that they can be selected by name
+        """
+        self.data_fname = base_name + DATA_EXT
+        self.meta_fname = base_name + META_EXT
+        self.index_fname = base_name + INDEX_EXT
+        if not os.path.exists(self.meta_fname):
+            if num_points is None or num_states is None:
+                raise InvalidDataError("Store '{}' does not exist; specify num_points and num_states to create "
+                                       "it".format(base_name))
+            self._create(num_points, num_states, dtype, state_names)
+        with open(self.meta_fname) as meta_file:
+            meta = json.load(meta_file)
+        self.num_points = meta['num_points']
+        self.num_states = meta['num_states']
+        self.dtype = np.dtype(meta['dtype'])
+        self.state_names = meta['state_names']
+        if (num_points, num_states) != (None, None) and (num_points, num_states) != (self.num_points,
+                                                                                     self.num_states):
+            raise InvalidDataError("Store '{}' holds trajectories of shape {}, not {}".format(
+                base_name, (self.num_points, self.num_states), (num_points, num_states)))
+        self.record_bytes = self.num_points * self.num_states * self.dtype.itemsize
+
+    def _create(self, num_points, num_states, dtype, state_names):
+        if state_names is not None and len(state_names) != num_states:
+            raise InvalidDataError("Expected {} state names but found {}".format(num_states, len(state_names)))
+        dir_name = os.path.dirname(self.meta_fname)
+        if dir_name and not os.path.isdir(dir_name):
+            try:
+                os.makedirs(dir_name)
+            except OSError:
+                # another process may have created it in the meantime
+                if not os.path.isdir(dir_name):
+                    raise
+        meta = {'num_points': num_points, 'num_states': num_states, 'dtype': np.dtype(dtype).str,
+                'state_names': list(state_names) if state_names is not None else None}
+        # the data file exists before the metadata appears, and the metadata appears complete: it is written to a
+        # temporary file and then linked into place, which fails if another process created the store first
+        open(self.data_fname, 'ab').close()
+        tmp_fname = '{}.{}.tmp'.format(self.meta_fname, os.getpid())
+        with open(tmp_fname, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        try:
+            os.link(tmp_fname, self.meta_fname)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        finally:
+            os.remove(tmp_fname)
+
+    @property
+    def num_cases(self):
+        """
+        Number of complete trajectories stored
+        """
+        return os.path.getsize(self.data_fname) // self.record_bytes
+
+    def append(self, trajectories, params=None):
+        """
+        Adds one trajectory with shape [num_points, num_states], or several with shape
+        [num_cases, num_points, num_states]
+        :param trajectories: array of values; converted to the store's dtype
+        :param params: dict of parameters for a single trajectory, or a list of dicts, one per trajectory
+        :return: list of the case ids assigned
+        """
+        trajectories = np.asarray(trajectories, dtype=self.dtype)
+        if trajectories.ndim == 2:
+            trajectories = trajectories[np.newaxis]
+            params = [params]
+        elif params is None:
+            params = [None] * len(trajectories)
+        if trajectories.shape[1:] != (self.num_points, self.num_states):
+            raise InvalidDataError("Expected trajectories of shape {} but found {}".format(
+                (self.num_points, self.num_states), trajectories.shape[1:]))
+        if len(params) != len(trajectories):
+            raise InvalidDataError("Found {} parameter sets for {} trajectories".format(len(params),
+                                                                                       len(trajectories)))
+        data = np.ascontiguousarray(trajectories).tobytes()
+
+        with open(self.data_fname, 'ab') as data_file:
+            if fcntl is not None:
+                fcntl.flock(data_file, fcntl.LOCK_EX)
+            try:
+                data_file.seek(0, os.SEEK_END)
+                end = data_file.tell()
+                if end % self.record_bytes:
+                    # drop a partial record left by a writer that did not finish
+                    end -= end % self.record_bytes
+                    data_file.truncate(end)
+                first_case = end // self.record_bytes
+                data_file.write(data)
+                data_file.flush()
+                case_ids = list(range(first_case, first_case + len(trajectories)))
+                with open(self.index_fname, 'a') as index_file:
+                    index_file.write(''.join(json.dumps({'case': case_id, 'params': case_params},
+                                                        default=_json_default) + '\n'
+                                             for case_id, case_params in zip(case_ids, params)))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(data_file, fcntl.LOCK_UN)
+        return case_ids
+
+    def trajectories(self):
+        """
+        :return: read-only memory map of all trajectories, shape [num_cases, num_points, num_states]; slicing
+                 it only reads the parts of the file that are used
+        """
+        num_cases = self.num_cases
+        if num_cases == 0:
+            return np.empty((0, self.num_points, self.num_states), dtype=self.dtype)
+        return np.memmap(self.data_fname, dtype=self.dtype, mode='r',
+                         shape=(num_cases, self.num_points, self.num_states))
+
+    def state(self, state):
+        """
+        One state across all cases, without loading the others
+        :param state: state index, or name if state_names were given
+        :return: read-only array view with shape [num_cases, num_points]
+        """
+        if not isinstance(state, numbers.Integral):
+            if not self.state_names or state not in self.state_names:
+                raise InvalidDataError("Unknown state '{}'; state names are: {}".format(state, self.state_names))
+            state = self.state_names.index(state)
+        return self.trajectories()[:, :, state]
+
+    def params(self):
+        """
+        :return: list of parameter dicts (None where none were given), ordered by case id
+        """
+        result = [None] * self.num_cases
+        if os.path.exists(self.index_fname):
+            with open(self.index_fname) as index_file:
+                for line in index_file:
+                    entry = json.loads(line)
+                    if entry['case'] < len(result):
+                        result[entry['case']] = entry['params']
+        return result
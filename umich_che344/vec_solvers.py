@@ -0,0 +1,129 @@
+# !/usr/bin/env python
+# coding=utf-8
+"""
+Vectorized solvers for many scalar equations at once, such as equilibrium conversions over grids of
+parameters, in place of one fsolve call per case
+"""
+from __future__ import print_function
+import numpy as np
+
+__author__ = 'hbmayes'
+
+DEF_XTOL = 1e-12
+DEF_MAX_ITER = 100
+# largest conversion used as an upper bracket, to stay clear of divide-by-zero at X = 1
+X_MAX = 1.0 - 1e-12
+
+
+def safeguarded_newton(func, lo, hi, args=(), dfunc=None, x0=None, xtol=DEF_XTOL, max_iter=DEF_MAX_ITER):
+    """
+    Finds a root of func in each bracket [lo, hi], element by element. Each iteration takes a Newton step (or a
+    secant step, without dfunc) where it stays inside the shrinking bracket and reduces the step size quickly
+    enough, and bisects otherwise, so it converges whenever func changes sign across the bracket. Only cases that
+    have not yet converged are evaluated.
+    :param func: vectorized function func(x, *args)
+    :param lo: lower ends of the brackets (broadcast against hi and args)
+    :param hi: upper ends of the brackets
+    :param args: extra arguments for func and dfunc; scalars or arrays that broadcast with lo and hi
+    :param dfunc: optional derivative dfunc(x, *args); without it, secant slopes are used
+    :param x0: optional initial guesses (e.g. from neighboring cases); defaults to the bracket midpoints
+    :param xtol: absolute tolerance on x
+    :param max_iter: maximum number of iterations
+    :return: roots, and a boolean array that is False where the iteration did not converge or there was no sign
+             change across the bracket
+    """
+    arrays = np.broadcast_arrays(*([lo, hi] + [np.asarray(arg) for arg in args]))
+    shape = arrays[0].shape
+    lo, hi = (np.array(array, dtype=float).ravel() for array in arrays[:2])
+    args = [array.ravel() for array in arrays[2:]]
+    f_lo = np.broadcast_to(func(lo, *args), lo.shape).astype(float)
+    f_hi = np.broadcast_to(func(hi, *args), lo.shape).astype(float)
+    bracketed = np.sign(f_lo) * np.sign(f_hi) <= 0
+    if x0 is None:
+        x = 0.5 * (lo + hi)
+    else:
+        x = np.clip(np.broadcast_to(np.asarray(x0, dtype=float), shape).ravel(), lo, hi)
+    # roots exactly at a bracket end
+    x = np.where(f_lo == 0, lo, np.where(f_hi == 0, hi, x))
+    converged = ~bracketed | (f_lo == 0) | (f_hi == 0)
+
+    # the iteration only works on the cases still active; "x_prev, f_prev" start the secant from a bracket end
+    active = np.flatnonzero(~converged)
+    lo, hi, f_lo, x_act = lo[active], hi[active], f_lo[active], x[active]
+    args = [arg[active] for arg in args]
+    x_prev, f_prev = lo.copy(), f_lo.copy()
+    step_old = hi - lo
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iter):
+            if len(active) == 0:
+                break
+            f_x = np.broadcast_to(func(x_act, *args), x_act.shape)
+            # shrink the brackets to keep the sign change
+            same_as_lo = np.sign(f_x) == np.sign(f_lo)
+            lo = np.where(same_as_lo, x_act, lo)
+            f_lo = np.where(same_as_lo, f_x, f_lo)
+            hi = np.where(same_as_lo, hi, x_act)
+
+            if dfunc is None:
+                slope = (f_x - f_prev) / (x_act - x_prev)
+            else:
+                slope = np.broadcast_to(dfunc(x_act, *args), x_act.shape)
+            step = f_x / slope
+            x_new = x_act - step
+            # a Newton step below the tolerance means x is already the root; after rounding, that step may
+            # point just outside the bracket, so accept it before checking
+            small_step = np.abs(step) <= xtol
+            # as in "rtsafe", bisect when the step leaves the bracket or is not less than half the one before last
+            use_bisect = ~small_step & (~np.isfinite(x_new) | (x_new <= lo) | (x_new >= hi) |
+                                        (np.abs(step) > 0.5 * np.abs(step_old)))
+            x_new = np.where(use_bisect, 0.5 * (lo + hi), x_new)
+            step_old = np.where(use_bisect, hi - lo, step)
+
+            done = (f_x == 0) | small_step | (np.abs(x_new - x_act) <= xtol) | (hi - lo <= xtol)
+            x_new = np.where((f_x == 0) | small_step, x_act, x_new)
+            x[active] = x_new
+            converged[active] = done
+            keep = ~done
+            active = active[keep]
+            x_prev, f_prev = x_act[keep], f_x[keep]
+            x_act, lo, hi, f_lo, step_old = x_new[keep], lo[keep], hi[keep], f_lo[keep], step_old[keep]
+            args = [arg[keep] for arg in args]
+    return x.reshape(shape), (converged & bracketed).reshape(shape)
+
+
+def x_eq_2a_to_b(k_c, cao, gas=True):
+    """
+    Equilibrium conversion of A for 2A <--> B with -r_A = 2k(C_A^2 - C_B/k_c), as in lect4 and lect5, in closed
+    form. With C_A = cao(1-X)/vc and C_B = cao X/(2 vc), where vc = 1 - X/2 for a gas and 1 for a liquid, the rate
+    is zero where
+        gas:    (cao + 1/(4 k_c)) X^2 - (2 cao + 1/(2 k_c)) X + cao = 0
+        liquid:  cao X^2 - (2 cao + 1/(2 k_c)) X + cao = 0
+    and the root in [0, 1) is the smaller one. The rate coefficient k does not change the equilibrium.
+    :param k_c: equilibrium coefficient (L/mol); scalar or array
+    :param cao: initial concentration of A (mol/L); scalar or array
+    :param gas: flag to account for the volume change of the gas-phase reaction; scalar or boolean array
+    :return: equilibrium conversion(s)
+    """
+    k_c = np.asarray(k_c, dtype=float)
+    cao = np.asarray(cao, dtype=float)
+    a = cao + np.where(gas, 0.25 / k_c, 0.0)
+    b = 2.0 * cao + 0.5 / k_c
+    # 2c / (b + sqrt(b^2 - 4ac)) is the smaller root, without cancellation when a*c is small
+    return 2.0 * cao / (b + np.sqrt(b * b - 4.0 * a * cao))
+
+
+def equilibrium_conversion(rate_func, args=(), drate_func=None, x_max=X_MAX, xtol=DEF_XTOL,
+                           max_iter=DEF_MAX_ITER):
+    """
+    Equilibrium conversion for any rate law, vectorized over its arguments: the conversion in [0, x_max] where
+    the rate of disappearance is zero
+    :param rate_func: vectorized rate of disappearance, rate_func(x, *args); positive at X = 0
+    :param args: rate law parameters; scalars or arrays that broadcast together
+    :param drate_func: optional derivative with respect to X, drate_func(x, *args)
+    :param x_max: upper end of the search
+    :param xtol: absolute tolerance on X
+    :param max_iter: maximum number of iterations
+    :return: equilibrium conversions, and a boolean array that is False where the rate does not change sign on
+             [0, x_max] (e.g. irreversible reactions) or the iteration did not converge
+    """
+    return safeguarded_newton(rate_func, 0.0, x_max, args=args, dfunc=drate_func, xtol=xtol, max_iter=max_iter)